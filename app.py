@@ -4,20 +4,29 @@ Streamlit UI for Chart Generation Workflow
 """
 
 import streamlit as st
-import pandas as pd
 import os
+import contextvars
+import threading
+import time
+import uuid
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
 # Import nodes from existing workflow
-from src.Agent.nodes import (
-    get_schema_node, 
-    sql_agent_node, 
-    execute_sql_node, 
-    chart_generation_node
-)
+from src.Agent.nodes import can_prerender_chart, invalidate_cached_sql
+from src.Agent.builder import APPROVAL_NODE, get_session_app
+from src.Agent.checkpointer import get_checkpointer, thread_config
+from src.Agent.streaming import stream_chart, stream_sql
+from src.Cache.sql_cache import get_sql_cache
+from src.DB.result_set import result_to_csv, result_to_dataframe, spill_missing
+from src.Cache.semantic_cache import get_semantic_cache
+from src.Cache.result_cache import get_result_cache
+from src.DB.query_guard import cancel_query
+from src.Model_Provider.llm_scheduler import PRIORITY_BATCH, get_llm_scheduler, request_priority
+from src.Model_Provider.model_router import get_model_router
+from src.Tracing.tracer import current_trace_id, get_trace, span, waterfall_rows
 
 # ============================
 # Page Configuration
@@ -127,8 +136,45 @@ if "sql_result" not in st.session_state:
 if "result_schema" not in st.session_state:
     st.session_state.result_schema = ""
 
+if "schema_fingerprint" not in st.session_state:
+    st.session_state.schema_fingerprint = ""
+
+if "sql_cache_hit" not in st.session_state:
+    st.session_state.sql_cache_hit = False
+
+if "selected_tables" not in st.session_state:
+    st.session_state.selected_tables = []
+
+if "schema_tokens_saved" not in st.session_state:
+    st.session_state.schema_tokens_saved = 0
+
 if "chart_html_path" not in st.session_state:
     st.session_state.chart_html_path = ""
+if "chart_reused" not in st.session_state:
+    st.session_state.chart_reused = False
+
+if "trace_ids" not in st.session_state:
+    st.session_state.trace_ids = []  # (label, trace_id) ຂອງ requests ໃນ session ນີ້
+
+if "sql_repair_history" not in st.session_state:
+    st.session_state.sql_repair_history = []  # SQL ທີ່ຜິດ + Error ທີ່ repair_sql ແກ້ໃຫ້ແລ້ວ
+
+if "sql_job" not in st.session_state:
+    st.session_state.sql_job = None  # Query ທີ່ກຳລັງ run ໃນ background thread
+
+if "chart_job" not in st.session_state:
+    st.session_state.chart_job = None  # Speculative job ທີ່ກຳລັງສ້າງ Chart ລ່ວງໜ້າ (ຫຼັງສະແດງຕາຕະລາງແລ້ວ)
+
+if "speculative_execution" not in st.session_state:
+    # Execute SQL, ສະຫຼຸບຜົນລັບ ແລະ ສ້າງ Template chart ລ່ວງໜ້າ ໃນຂະນະທີ່ຜູ້ໃຊ້ກວດ SQL
+    st.session_state.speculative_execution = (
+        os.getenv("SPECULATIVE_EXECUTION", "0").lower() in ("1", "true", "yes")
+    )
+
+if "thread_id" not in st.session_state:
+    # thread_id ຂອງ Session graph (State ຖືກບັນທຶກໃນ Checkpointer, ຢູ່ໃນ URL ເພື່ອ reload ໄດ້)
+    st.session_state.thread_id = ""
+    st.session_state.restore_thread_id = st.query_params.get("thread", "")
 
 # ============================
 # Helper Functions
@@ -140,13 +186,165 @@ def reset_state():
     st.session_state.sql_script = ""
     st.session_state.sql_result = None
     st.session_state.result_schema = ""
+    st.session_state.schema_fingerprint = ""
+    st.session_state.sql_cache_hit = False
+    st.session_state.selected_tables = []
+    st.session_state.schema_tokens_saved = 0
     st.session_state.chart_html_path = ""
+    st.session_state.chart_reused = False
+    st.session_state.sql_repair_history = []
+    cancel_jobs()
+    discard_session()
+
+def discard_session():
+    """ລຶບ checkpoints ຂອງ thread ປັດຈຸບັນ (ບໍ່ໃຊ້ອີກແລ້ວ)"""
+    if st.session_state.thread_id:
+        try:
+            get_checkpointer().delete_thread(st.session_state.thread_id)
+        except Exception:
+            pass
+    st.session_state.thread_id = ""
+    st.query_params.pop("thread", None)
+
+def restore_session(thread_id: str):
+    """ໂຫຼດ State ຂອງ thread ຈາກ Checkpointer ຫຼັງ reload ໜ້າເວັບ (ບໍ່ run node ໃດໃໝ່)"""
+    snapshot = get_session_app().get_state(thread_config(thread_id))
+    values = snapshot.values
+    if not values.get("sql_script"):
+        return
+    st.session_state.thread_id = thread_id
+    st.session_state.question = values.get("question", "")
+    st.session_state.sql_script = values["sql_script"]
+    st.session_state.result_schema = values.get("result_schema", "")
+    st.session_state.schema_fingerprint = values.get("schema_fingerprint", "")
+    st.session_state.selected_tables = values.get("selected_tables", [])
+    st.session_state.schema_tokens_saved = values.get("schema_tokens_saved", 0)
+    st.session_state.sql_cache_hit = values.get("sql_cache_hit", False)
+    st.session_state.sql_repair_history = values.get("sql_repair_history", [])
+    st.session_state.step = 1
+    # ຢຸດຢູ່ກ່ອນ approve_sql → sql_result (ຖ້າມີ) ແມ່ນຂອງຮອບກ່ອນ, ບໍ່ສະແດງ
+    sql_result = values.get("sql_result")
+    if snapshot.next != (APPROVAL_NODE,) and sql_result and not sql_result.get("error"):
+        st.session_state.sql_result = sql_result
+        st.session_state.step = 2
+        artifact = values.get("chart_artifact")
+        if not snapshot.next and artifact:
+            st.session_state.chart_html_path = artifact["path"]
+            st.session_state.chart_reused = artifact["reused"]
+            st.session_state.step = 3
+
+def remember_trace(label: str):
+    """ເກັບ trace id ຂອງ request ປັດຈຸບັນໄວ້ສະແດງໃນ sidebar"""
+    trace_id = current_trace_id()
+    if trace_id:
+        st.session_state.trace_ids = (st.session_state.trace_ids + [(label, trace_id)])[-10:]
+
+def start_sql_job(thread_id: str, speculative: bool = False) -> dict:
+    """
+    Resume the session graph at execute_sql (+ repair_sql loop) in a background thread so the UI can cancel it.
+    
+    A speculative job starts as soon as the SQL is generated; its result stays hidden until the user
+    clicks Execute, and after a successful query it goes on to summarize the result and pre-render
+    template charts so that Accept is instant too.
+    """
+    job = {
+        "query_id": uuid.uuid4().hex,
+        "result": None,
+        "trace_id": None,
+        "speculative": speculative,
+        "revealed": not speculative,  # ຜົນລັບ speculative ສະແດງເມື່ອຜູ້ໃຊ້ກົດ Execute ເທົ່ານັ້ນ
+        "executed": threading.Event(),
+        "cancelled": threading.Event(),
+        "chart_result": None,
+        "chart_trace_id": None,
+    }
+    
+    def run():
+        app = get_session_app()
+        config = thread_config(thread_id)
+        try:
+            with span("ui.execute_sql", query_id=job["query_id"], speculative=speculative):
+                job["trace_id"] = current_trace_id()
+                # ກັບໄປຈຸດອະນຸມັດ approve_sql (ຄັ້ງທຳອິດ ຫຼື Execute ຊ້ຳຫຼັງ Error) ພ້ອມ query_id ໃໝ່;
+                # Schema ແລະ SQL ມາຈາກ State ທີ່ບັນທຶກໄວ້
+                app.update_state(
+                    config,
+                    {"query_id": job["query_id"], "sql_repair_attempts": 0, "sql_repair_history": []},
+                    as_node="sql_agent",
+                )
+                # resume ຄັ້ງດຽວ: approve_sql → execute_sql (→ repair_sql → execute_sql ... ບໍ່ເກີນ
+                # SQL_REPAIR_MAX_ATTEMPTS ຄັ້ງ ເມື່ອ SQL ຜິດແບບທີ່ LLM ແກ້ໄດ້) → ຢຸດກ່ອນ summarize_result
+                app.invoke(None, config)
+                job["result"] = app.get_state(config).values
+            job["executed"].set()
+            if speculative and not job["cancelled"].is_set():
+                speculate_chart(job, app, config)
+        finally:
+            job["executed"].set()
+            if job["cancelled"].is_set():
+                # ຜູ້ໃຊ້ຍົກເລີກລະຫວ່າງ job run → ລຶບ checkpoints ທີ່ຂຽນຫຼັງ discard_session
+                try:
+                    get_checkpointer().delete_thread(thread_id)
+                except Exception:
+                    pass
+    
+    # ສຳເນົາ context ເພື່ອໃຫ້ span ໃນ thread ເຮັດວຽກຄືກັບ script thread
+    context = contextvars.copy_context()
+    job["thread"] = threading.Thread(target=context.run, args=(run,), daemon=True)
+    job["thread"].start()
+    return job
+
+def speculate_chart(job: dict, app, config: dict):
+    """ສະຫຼຸບຜົນລັບ ແລະ ສ້າງ Chart ລ່ວງໜ້າ (ສະເພາະ Template/Artifact Store) ກ່ອນຜູ້ໃຊ້ກົດ Accept"""
+    values = job["result"] or {}
+    sql_result = values.get("sql_result")
+    if not sql_result or sql_result.get("error"):
+        return
+    # Chart ທີ່ຕ້ອງໃຫ້ LLM ຂຽນ HTML ມີລາຄາແພງ → ລ່ວງໜ້າແຕ່ summarize_result, chart_agent ລໍຖ້າ Accept
+    prerender = can_prerender_chart(values)
+    # ຜູ້ໃຊ້ຍັງບໍ່ໄດ້ຂໍ Chart → LLM call ຢູ່ໃນຄິວຫຼັງ requests ທີ່ມີຄົນລໍຖ້າຢູ່
+    with request_priority(PRIORITY_BATCH), span("ui.speculative_chart", prerender=prerender):
+        job["chart_trace_id"] = current_trace_id()
+        app.invoke(None, config, interrupt_after=None if prerender else ["summarize_result"])
+    snapshot = app.get_state(config)
+    if not snapshot.next:
+        job["chart_result"] = snapshot.values
+
+def finish_chart_job() -> dict | None:
+    """ລໍຖ້າ Speculative chart job ໃຫ້ສຳເລັດ (ກ່ອນ resume thread ດຽວກັນ) ແລະ ສົ່ງຄືນ job ນັ້ນ"""
+    chart_job, st.session_state.chart_job = st.session_state.chart_job, None
+    if chart_job is not None:
+        with st.spinner("🎨 ກຳລັງສ້າງ Chart..."):
+            chart_job["thread"].join()
+        if chart_job["chart_trace_id"]:
+            st.session_state.trace_ids = (
+                st.session_state.trace_ids + [("Generate Chart (speculative)", chart_job["chart_trace_id"])]
+            )[-10:]
+    return chart_job
+
+def cancel_jobs():
+    """ຍົກເລີກ background jobs (Query ແລະ Chart ລ່ວງໜ້າ) ແລະ ຖິ້ມຜົນລັບຂອງມັນ"""
+    for key in ("sql_job", "chart_job"):
+        job, st.session_state[key] = st.session_state[key], None
+        if job is not None:
+            job["cancelled"].set()
+            cancel_query(job["query_id"])
 
 def cancel_action():
     """Cancel and go back to step 0"""
+    cancel_jobs()
     st.session_state.step = 0
     st.session_state.sql_result = None
     st.session_state.chart_html_path = ""
+    st.session_state.chart_reused = False
+    discard_session()
+
+if st.session_state.get("restore_thread_id"):
+    thread_id, st.session_state.restore_thread_id = st.session_state.restore_thread_id, ""
+    try:
+        restore_session(thread_id)
+    except Exception:
+        pass
 
 # ============================
 # Main UI
@@ -177,23 +375,46 @@ with col2:
 # Handle Generate SQL button
 if generate_btn and question_input:
     st.session_state.question = question_input
+    cancel_jobs()
+    discard_session()
+    st.session_state.thread_id = uuid.uuid4().hex
+    st.query_params["thread"] = st.session_state.thread_id
     
-    with st.spinner("⏳ ກຳລັງດຶງ Schema ແລະ ສ້າງ SQL..."):
-        # Step 1: Get schema
-        state = {"question": question_input, "messages": []}
-        schema_result = get_schema_node(state)
-        st.session_state.result_schema = schema_result.get("result_schema", "")
-        
-        # Step 2: Generate SQL
-        state["result_schema"] = st.session_state.result_schema
-        sql_result = sql_agent_node(state)
-        st.session_state.sql_script = sql_result.get("sql_script", "")
-        
-        if st.session_state.sql_script and not st.session_state.sql_script.startswith("--"):
-            st.session_state.step = 1
-            st.rerun()
-        else:
-            st.error("❌ ບໍ່ສາມາດສ້າງ SQL ໄດ້. ກະລຸນາລອງຄຳຖາມໃໝ່.")
+    # ປຸ່ມຢຸດ: ການກົດປຸ່ມຈະ rerun script → stream ຖືກຂັດຈັງຫວະ ແລະ LLM connection ຖືກປິດ
+    st.button("⛔ ຢຸດການສ້າງ SQL", key="stop_sql_stream")
+    status = st.status("⏳ ກຳລັງດຶງ Schema ແລະ ສ້າງ SQL...", expanded=True)
+    sql_preview = status.empty()
+    
+    # get_schema → select_tables → sql_agent (SQL ສະແດງທີລະ token)
+    state = {"question": question_input, "messages": []}
+    with span("ui.generate_sql", question=question_input):
+        remember_trace("Generate SQL")
+        for event in stream_sql(state, thread_id=st.session_state.thread_id):
+            if event.kind == "sql":
+                sql_preview.code(event.text, language="sql")
+            elif event.kind == "node":
+                state.update(event.update)
+                if event.node == "get_schema":
+                    status.update(label="🗂️ ກຳລັງເລືອກ Tables ທີ່ກ່ຽວຂ້ອງ...")
+                elif event.node == "select_tables":
+                    status.update(label="🤖 ກຳລັງສ້າງ SQL...")
+    status.update(label="✅ ສ້າງ SQL ສຳເລັດ", state="complete", expanded=False)
+    
+    st.session_state.result_schema = state.get("result_schema", "")
+    st.session_state.schema_fingerprint = state.get("schema_fingerprint", "")
+    st.session_state.selected_tables = state.get("selected_tables", [])
+    st.session_state.schema_tokens_saved = state.get("schema_tokens_saved", 0)
+    st.session_state.sql_script = state.get("sql_script", "")
+    st.session_state.sql_cache_hit = state.get("sql_cache_hit", False)
+    
+    if st.session_state.sql_script and not st.session_state.sql_script.startswith("--"):
+        st.session_state.step = 1
+        if st.session_state.speculative_execution:
+            # Execute ທັນທີໃນຂະນະທີ່ຜູ້ໃຊ້ກວດ SQL (SQL ຜ່ານ validator ແລະ Query Guard ຄືເກົ່າ)
+            st.session_state.sql_job = start_sql_job(st.session_state.thread_id, speculative=True)
+        st.rerun()
+    else:
+        st.error("❌ ບໍ່ສາມາດສ້າງ SQL ໄດ້. ກະລຸນາລອງຄຳຖາມໃໝ່.")
 
 # ============================
 # Step 2: SQL Display
@@ -204,6 +425,19 @@ if st.session_state.step >= 1 and st.session_state.sql_script:
     
     # Display SQL in code block
     st.code(st.session_state.sql_script, language="sql")
+    if st.session_state.sql_repair_history:
+        st.caption(f"🔧 SQL ຖືກແກ້ອັດຕະໂນມັດ {len(st.session_state.sql_repair_history)} ຄັ້ງ ຫຼັງ Execute ບໍ່ຜ່ານ")
+        with st.expander("ເບິ່ງ SQL ທີ່ຜິດ ແລະ Error"):
+            for attempt in st.session_state.sql_repair_history:
+                st.code(attempt["sql_script"], language="sql")
+                st.caption(f"❌ {attempt['error']}")
+    elif st.session_state.sql_cache_hit:
+        st.caption("⚡ SQL ນີ້ມາຈາກ Cache (ບໍ່ໄດ້ຮຽກ LLM)")
+    elif st.session_state.schema_tokens_saved:
+        st.caption(
+            f"🗂️ ສົ່ງ Schema ສະເພາະ {len(st.session_state.selected_tables)} tables "
+            f"({', '.join(st.session_state.selected_tables)}) · ປະຢັດ ~{st.session_state.schema_tokens_saved} tokens"
+        )
     
     col1, col2, col3 = st.columns([1, 1, 3])
     
@@ -214,24 +448,57 @@ if st.session_state.step >= 1 and st.session_state.sql_script:
         cancel_sql_btn = st.button("🔄 ລອງໃໝ່", use_container_width=True)
     
     if cancel_sql_btn:
+        # ຜູ້ໃຊ້ປະຕິເສດ SQL ທີ່ມາຈາກ Cache → ລຶບອອກ ເພື່ອໃຫ້ສ້າງໃໝ່
+        if st.session_state.sql_cache_hit and st.session_state.schema_fingerprint:
+            invalidate_cached_sql(
+                st.session_state.question,
+                st.session_state.schema_fingerprint,
+                st.session_state.sql_script
+            )
         reset_state()
         st.rerun()
     
     if execute_btn:
-        with st.spinner("⏳ ກຳລັງ Execute SQL..."):
-            state = {
-                "sql_script": st.session_state.sql_script,
-                "messages": []
-            }
-            result = execute_sql_node(state)
-            st.session_state.sql_result = result.get("sql_result", {})
-            
-            if st.session_state.sql_result and not st.session_state.sql_result.get("error"):
-                st.session_state.step = 2
-                st.rerun()
-            else:
-                error_msg = st.session_state.sql_result.get("error", "Unknown error")
-                st.error(f"❌ SQL Error: {error_msg}")
+        if st.session_state.sql_job is None:
+            finish_chart_job()
+            st.session_state.sql_job = start_sql_job(st.session_state.thread_id)
+        else:
+            # Speculative job ເລີ່ມແລ້ວ → ສະແດງຜົນລັບ (ຫຼື ລໍຖ້າສ່ວນທີ່ເຫຼືອ)
+            st.session_state.sql_job["revealed"] = True
+        st.rerun()
+    
+    job = st.session_state.sql_job
+    if job is not None and not job["revealed"]:
+        st.caption("⚡ SQL ກຳລັງ Execute ລ່ວງໜ້າໃນ background (ຜົນລັບສະແດງເມື່ອກົດ Execute SQL)")
+    elif job is not None:
+        if not job["executed"].is_set():
+            st.info("⏳ ກຳລັງ Execute SQL...")
+            if st.button("⛔ ຍົກເລີກ Query", key="cancel_query_btn"):
+                cancel_query(job["query_id"])
+            # Poll ຈົນກວ່າ background thread ຈະສຳເລັດ
+            time.sleep(0.5)
+            st.rerun()
+        
+        st.session_state.sql_job = None
+        if job["trace_id"]:
+            label = "Execute SQL (speculative)" if job["speculative"] else "Execute SQL"
+            st.session_state.trace_ids = (st.session_state.trace_ids + [(label, job["trace_id"])])[-10:]
+        result = job["result"] or {}
+        st.session_state.sql_result = result.get("sql_result", {})
+        if result.get("sql_repair_history"):
+            st.session_state.sql_repair_history = result["sql_repair_history"]
+            st.session_state.sql_cache_hit = False
+        # SQL ທີ່ execute ຈິງ (ອາດຖືກແກ້ ຫຼື ເພີ່ມ `test_visualization.` ໃຫ້ table)
+        st.session_state.sql_script = result.get("sql_script") or st.session_state.sql_script
+        
+        if st.session_state.sql_result and not st.session_state.sql_result.get("error"):
+            st.session_state.step = 2
+            if job["speculative"]:
+                st.session_state.chart_job = job  # Chart ອາດກຳລັງສ້າງລ່ວງໜ້າຢູ່
+            st.rerun()
+        else:
+            error_msg = st.session_state.sql_result.get("error", "Unknown error")
+            st.error(f"❌ SQL Error: {error_msg}")
 
 # ============================
 # Step 3: Table Display with Accept/Cancel
@@ -240,17 +507,38 @@ if st.session_state.step >= 2 and st.session_state.sql_result:
     st.divider()
     st.subheader("3️⃣ ຜົນລັບຈາກ Database")
     
-    rows = st.session_state.sql_result.get("rows", [])
     columns = st.session_state.sql_result.get("columns", [])
     row_count = st.session_state.sql_result.get("row_count", 0)
     
     # Show stats
     st.markdown(f"**📋 ຈຳນວນແຖວ:** {row_count} | **📊 ຈຳນວນ Columns:** {len(columns)}")
+    if st.session_state.sql_result.get("cache_hit"):
+        st.caption(
+            f"⚡ ຜົນລັບນີ້ມາຈາກ Result Cache (ບໍ່ໄດ້ Query Database, "
+            f"ອາຍຸ {st.session_state.sql_result.get('cache_age_s', 0):.0f} ວິນາທີ)"
+        )
+    for warning in st.session_state.sql_result.get("warnings", []):
+        st.warning(f"⚠️ {warning}")
+    if st.session_state.sql_result.get("truncated"):
+        st.warning(f"⚠️ ຜົນລັບຖືກຕັດທີ່ {row_count} ແຖວ (ເກີນຂີດຈຳກັດ). ກະລຸນາເພີ່ມເງື່ອນໄຂໃນຄຳຖາມ.")
+    if spill_missing(st.session_state.sql_result):
+        # Session ທີ່ restore ຫຼັງ spill file ໝົດອາຍຸ → ເຫຼືອພຽງ preview ໃນ State
+        preview_rows = len(next(iter(st.session_state.sql_result.get("data", {}).values()), []))
+        st.warning(
+            f"⚠️ ຂໍ້ມູນເຕັມຂອງຜົນລັບນີ້ໝົດອາຍຸແລ້ວ: ຕາຕະລາງ, CSV ແລະ Chart ມີພຽງ {preview_rows} "
+            f"ແຖວທຳອິດຈາກ {row_count} ແຖວ. ກົດ ▶️ Execute SQL ເພື່ອ Query ໃໝ່."
+        )
     
     # Display as dataframe
-    if rows:
-        df = pd.DataFrame(rows)
+    if row_count:
+        df = result_to_dataframe(st.session_state.sql_result)
         st.dataframe(df, use_container_width=True, height=400)
+        st.download_button(
+            "⬇️ ດາວໂຫຼດ CSV",
+            data=result_to_csv(st.session_state.sql_result),
+            file_name="query_result.csv",
+            mime="text/csv",
+        )
     else:
         st.warning("ບໍ່ມີຂໍ້ມູນ")
     
@@ -269,26 +557,49 @@ if st.session_state.step >= 2 and st.session_state.sql_result:
         st.rerun()
     
     if accept_btn:
-        with st.spinner("🎨 ກຳລັງສ້າງ Chart..."):
-            state = {
-                "question": st.session_state.question,
-                "sql_result": st.session_state.sql_result,
-                "messages": []
-            }
-            chart_result = chart_generation_node(state)
-            final_report = chart_result.get("final_report", "")
-            
-            if "ສຳເລັດ" in final_report or "successfully" in final_report.lower():
-                # Extract path from result
-                # Format: "File 'd:\Pupe\src\Agent\Display\xxx.html' ໄດ້ຖືກສ້າງສຳເລັດແລ້ວ."
-                if "'" in final_report:
-                    path_start = final_report.index("'") + 1
-                    path_end = final_report.index("'", path_start)
-                    st.session_state.chart_html_path = final_report[path_start:path_end]
-                st.session_state.step = 3
-                st.rerun()
-            else:
-                st.error(f"❌ Chart Error: {final_report}")
+        chart_job = finish_chart_job()
+        chart_artifact = ((chart_job or {}).get("chart_result") or {}).get("chart_artifact")
+        if chart_artifact:
+            # Chart ຖືກສ້າງລ່ວງໜ້າແລ້ວໃນຂະນະທີ່ຜູ້ໃຊ້ເບິ່ງຕາຕະລາງ
+            st.session_state.chart_html_path = chart_artifact["path"]
+            st.session_state.chart_reused = chart_artifact["reused"]
+            st.session_state.step = 3
+            st.rerun()
+        
+        # ປຸ່ມຢຸດ: ການກົດປຸ່ມຈະ rerun script → stream ຖືກຂັດຈັງຫວະ ແລະ LLM connection ຖືກປິດ
+        st.button("⛔ ຢຸດການສ້າງ Chart", key="stop_chart_stream")
+        status = st.status("🎨 ກຳລັງສ້າງ Chart...", expanded=True)
+        chart_preview = status.empty()
+        
+        app = get_session_app()
+        config = thread_config(st.session_state.thread_id)
+        # ("chart_agent",): Speculative job ສະຫຼຸບຜົນລັບໄວ້ແລ້ວ → resume ທີ່ chart_agent ເລີຍ
+        if app.get_state(config).next not in (("summarize_result",), ("chart_agent",)):
+            # Chart ຖືກສ້າງແລ້ວ (ກົດຊ້ຳ) → ກັບໄປຈຸດຫຼັງ execute_sql ໂດຍໃຊ້ຜົນລັບເດີມ (ບໍ່ Query ໃໝ່)
+            app.update_state(config, {"sql_result": st.session_state.sql_result}, as_node="execute_sql")
+        # summarize_result → chart_agent resume ຈາກ State ທີ່ບັນທຶກໄວ້ (HTML/ບົດວິເຄາະ ສະແດງທີລະ token)
+        final_report = ""
+        chart_artifact = None
+        with span("ui.generate_chart", rows=st.session_state.sql_result.get("row_count", 0)):
+            remember_trace("Generate Chart")
+            for event in stream_chart(thread_id=st.session_state.thread_id):
+                if event.kind == "html":
+                    chart_preview.code(event.text[-3000:], language="html")
+                    status.update(label=f"🎨 ກຳລັງຂຽນ HTML... ({len(event.text):,} ຕົວອັກສອນ)")
+                elif event.kind == "analysis":
+                    chart_preview.markdown(event.text)
+                elif event.kind == "node" and event.node == "chart_agent":
+                    final_report = event.update.get("final_report", "")
+                    chart_artifact = event.update.get("chart_artifact")
+        status.update(label="🎨 ສ້າງ Chart ສຳເລັດ", state="complete", expanded=False)
+        
+        if chart_artifact:
+            st.session_state.chart_html_path = chart_artifact["path"]
+            st.session_state.chart_reused = chart_artifact["reused"]
+            st.session_state.step = 3
+            st.rerun()
+        else:
+            st.error(f"❌ Chart Error: {final_report}")
 
 # ============================
 # Step 4: Display Embedded Chart
@@ -298,6 +609,8 @@ if st.session_state.step >= 3 and st.session_state.chart_html_path:
     st.subheader("4️⃣ 📊 Chart ທີ່ສ້າງຂຶ້ນ")
     
     st.success(f"✅ Chart ຖືກສ້າງສຳເລັດ: `{st.session_state.chart_html_path}`")
+    if st.session_state.chart_reused:
+        st.caption("⚡ Chart ນີ້ມາຈາກ Artifact Store (ຄຳຖາມ, SQL ແລະ ຜົນລັບດຽວກັນກັບທີ່ເຄີຍສ້າງ)")
     
     # Read and embed HTML
     if os.path.exists(st.session_state.chart_html_path):
@@ -344,8 +657,110 @@ with st.sidebar:
     st.markdown(f"**Question:** {st.session_state.question[:50] + '...' if len(st.session_state.question) > 50 else st.session_state.question or 'N/A'}")
     
     if st.session_state.sql_script:
-        st.markdown("**SQL:** ✅ Generated")
+        st.markdown("**SQL:** ✅ Generated" + (" (⚡ cache)" if st.session_state.sql_cache_hit else ""))
     if st.session_state.sql_result:
-        st.markdown(f"**Rows:** {st.session_state.sql_result.get('row_count', 0)}")
+        st.markdown(
+            f"**Rows:** {st.session_state.sql_result.get('row_count', 0)}"
+            + (" (⚡ cache)" if st.session_state.sql_result.get("cache_hit") else "")
+        )
     if st.session_state.chart_html_path:
         st.markdown("**Chart:** ✅ Created")
+    
+    st.divider()
+    
+    st.markdown("### 🔮 Speculative Execution")
+    st.session_state.speculative_execution = st.toggle(
+        "Execute SQL ແລະ ສ້າງ Chart ລ່ວງໜ້າ",
+        value=st.session_state.speculative_execution,
+        key="speculative_toggle",
+        help="ເລີ່ມ Query, ສະຫຼຸບຜົນລັບ ແລະ Template chart ທັນທີຫຼັງສ້າງ SQL; ຜົນລັບຖືກຖິ້ມຖ້າກົດລອງໃໝ່/Cancel",
+    )
+    
+    st.divider()
+    
+    st.markdown("### ⚡ SQL Cache")
+    cache_stats = get_sql_cache().stats()
+    st.markdown(
+        f"**Hits:** {cache_stats['hits']} | **Misses:** {cache_stats['misses']} | "
+        f"**Entries:** {cache_stats['entries']}"
+    )
+    semantic_stats = get_semantic_cache().stats()
+    st.markdown(
+        f"**Semantic hits:** {semantic_stats['hits']} | "
+        f"**Indexed questions:** {semantic_stats['entries']}"
+    )
+    result_stats = get_result_cache().stats()
+    st.markdown(
+        f"**Result hits:** {result_stats['hits']} | **Misses:** {result_stats['misses']} | "
+        f"**Memory:** {result_stats['bytes'] / 1024 / 1024:.1f}/{result_stats['max_bytes'] / 1024 / 1024:.0f} MB"
+    )
+    
+    st.divider()
+    
+    st.markdown("### 🚦 LLM Rate Limit")
+    scheduler_stats = get_llm_scheduler().stats()
+    if scheduler_stats["models"]:
+        for model_name, model_stats in scheduler_stats["models"].items():
+            st.markdown(
+                f"**{model_name.split('/')[-1]}** · **Queue:** {model_stats['queue_depth']} "
+                f"(max {model_stats['max_queue_depth']}) | **Wait p95:** {model_stats['p95_wait_ms']:,.0f} ms | "
+                f"**429s:** {model_stats['rate_limited']} | "
+                f"**TPM left:** {model_stats['tokens_available']:,}/{model_stats['tpm_limit']:,.0f}"
+            )
+    else:
+        st.caption("ຍັງບໍ່ມີ LLM call")
+    
+    st.divider()
+    
+    st.markdown("### 🪜 SQL Model Routing")
+    router_stats = get_model_router().stats()
+    for model_name, model_stats in router_stats["models"].items():
+        tier = "fast" if model_name == router_stats["fast_model"] else "large"
+        success_rate = model_stats["success_rate"]
+        st.markdown(
+            f"**{model_name.split('/')[-1]}** ({tier}) · **Calls:** {model_stats['calls']} | "
+            f"**Success:** {'-' if success_rate is None else f'{success_rate:.0%}'} | "
+            f"**p95:** {model_stats['p95_latency_ms']:,.0f} ms"
+        )
+    escalations = sum(
+        count for decision, count in router_stats["decisions"].items()
+        if decision.startswith("large:") and decision != "large:routing_disabled"
+    )
+    st.caption(f"Escalations to {router_stats['large_model'].split('/')[-1]}: {escalations}")
+    
+    st.divider()
+    
+    st.markdown("### 🧭 Traces")
+    traces = [(label, get_trace(trace_id)) for label, trace_id in reversed(st.session_state.trace_ids)]
+    traces = [(label, trace) for label, trace in traces if trace is not None]
+    if traces:
+        choice = st.selectbox(
+            "Request",
+            range(len(traces)),
+            format_func=lambda i: f"{traces[i][0]} · {traces[i][1].root.duration_ms:,.0f} ms",
+        )
+        rows = waterfall_rows(traces[choice][1])
+        # Waterfall: ແຕ່ລະ span ເປັນແຖບຈາກ start_ms ຫາ end_ms
+        st.vega_lite_chart(
+            {
+                "data": {"values": rows},
+                "mark": {"type": "bar", "cornerRadius": 2},
+                "encoding": {
+                    "y": {"field": "span", "type": "nominal", "sort": None, "title": None},
+                    "x": {"field": "start_ms", "type": "quantitative", "title": "ms"},
+                    "x2": {"field": "end_ms"},
+                    "color": {"condition": {"test": "datum.error != ''", "value": "#e45756"}, "value": "#4c78a8"},
+                    "tooltip": [
+                        {"field": "span"},
+                        {"field": "duration_ms", "title": "ms"},
+                        {"field": "attributes"},
+                    ],
+                },
+            },
+            use_container_width=True,
+        )
+        with st.expander("Span attributes"):
+            for row in rows:
+                st.caption(f"**{row['span'].strip()}** · {row['duration_ms']} ms · {row['attributes'] or '-'}")
+    else:
+        st.caption("ຍັງບໍ່ມີ trace")
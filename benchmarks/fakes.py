@@ -0,0 +1,251 @@
+"""
+fakes.py - Fake LLM ແລະ SQLite shim ສຳລັບ benchmarks / load tests (ບໍ່ຕ້ອງມີ Groq ຫຼື MariaDB)
+
+- FakeChatModel: ຕອບແບບ deterministic ຕາມປະເພດ Prompt (SQL / ບົດວິເຄາະ / Chart tool call),
+  ຮອງຮັບ streaming, usage_metadata ແລະ latency ທີ່ກຳນົດໄດ້
+- SQLiteShimConnection: connection ທີ່ໜ້າຕາຄື mariadb (cursor(buffered=...), ping,
+  autocommit, thread_id) ເທິງ SQLite file ທີ່ attach ເປັນ test_visualization ແລະ
+  INFORMATION_SCHEMA, ຕັດ SET STATEMENT ... FOR ອອກ, ປອມ EXPLAIN ແລະ ເພີ່ມ functions
+  ຂອງ MariaDB ທີ່ SchemaCatalog ໃຊ້ (CRC32, CONCAT_WS)
+"""
+
+import itertools
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+# ===========================
+# Fake LLM
+# ===========================
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model ທີ່ຕອບຄືເກົ່າທຸກຄັ້ງ (ບໍ່ມີ network)
+
+    Attributes:
+        sql_script: SQL ທີ່ຈະຕອບໃຫ້ SQL Agent (ຫຼື callable(question) → SQL)
+        latency: callable() → ວິນາທີທີ່ຈະລໍຖ້າກ່ອນຕອບ (ຈຳລອງເວລາຂອງ Groq)
+        chunk_size: ຈຳນວນຕົວອັກສອນຕໍ່ chunk ຕອນ stream
+    """
+
+    sql_script: Any = "SELECT 1"
+    latency: Callable[[], float] | None = None
+    chunk_size: int = 16
+    tools_bound: bool = False
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"tools_bound": True})
+
+    def _answer(self, messages) -> AIMessage:
+        prompt = "\n".join(str(message.content) for message in messages)
+        question = str(messages[-1].content)
+        usage = {
+            "input_tokens": max(len(prompt) // 3, 1),
+            "output_tokens": 0,
+            "total_tokens": 0,
+        }
+
+        if "Expert SQL Developer" in prompt:
+            sql = self.sql_script(question) if callable(self.sql_script) else self.sql_script
+            content = json.dumps({"sql_script": sql}, ensure_ascii=False)
+            message = AIMessage(content=content)
+        elif "Data Analyst" in prompt:
+            content = "ຂໍ້ມູນສະແດງໃຫ້ເຫັນແນວໂນ້ມທີ່ເພີ່ມຂຶ້ນ. ຄ່າສູງສຸດຢູ່ໃນຊ່ວງທ້າຍ."
+            message = AIMessage(content=content)
+        else:
+            html = (
+                "<!DOCTYPE html><html><body><canvas id='c'></canvas>"
+                "<script id='chart-data' type='application/json'>__CHART_DATA__</script>"
+                "</body></html>"
+            )
+            args = {"filename": "benchmark_chart.html", "content": html}
+            content = json.dumps(args)
+            message = AIMessage(
+                content="",
+                tool_calls=[{"name": "FileGenerationSchema", "args": args, "id": "call_fake"}],
+            )
+
+        usage["output_tokens"] = max(len(content) // 3, 1)
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        message.usage_metadata = usage
+        return message
+
+    def _sleep(self):
+        if self.latency is not None:
+            delay = self.latency()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._sleep()
+        return ChatResult(generations=[ChatGeneration(message=self._answer(messages))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self._sleep()
+        message = self._answer(messages)
+        if message.tool_calls:
+            text = json.dumps(message.tool_calls[0]["args"])
+        else:
+            text = message.content
+
+        pieces = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or [""]
+        for index, piece in enumerate(pieces):
+            last = index == len(pieces) - 1
+            if message.tool_calls:
+                chunk = AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[{
+                        "name": "FileGenerationSchema" if index == 0 else None,
+                        "args": piece,
+                        "id": "call_fake" if index == 0 else None,
+                        "index": 0,
+                    }],
+                )
+            else:
+                chunk = AIMessageChunk(content=piece)
+            if last:
+                chunk.usage_metadata = message.usage_metadata
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=generation)
+            yield generation
+
+
+def fake_llm_factory(sql_script="SELECT 1", latency: Callable[[], float] | None = None):
+    """
+    Factory ສຳລັບ set_llm_factory()
+    """
+    def factory(model_name: str, temperature: float):
+        return FakeChatModel(sql_script=sql_script, latency=latency)
+    return factory
+
+
+# ===========================
+# SQLite shim ທີ່ໜ້າຕາຄື mariadb
+# ===========================
+
+_SET_STATEMENT_RE = re.compile(r"^\s*SET\s+STATEMENT\s+.+?\s+FOR\s+", re.IGNORECASE | re.DOTALL)
+_EXPLAIN_RE = re.compile(r"^\s*EXPLAIN\s+", re.IGNORECASE)
+_KILL_RE = re.compile(r"^\s*KILL\s+QUERY\s+\d+", re.IGNORECASE)
+_TABLE_REF_RE = re.compile(r"test_visualization\s*\.\s*`?(\w+)`?", re.IGNORECASE)
+
+_thread_ids = itertools.count(1)
+
+
+def _crc32(value) -> int | None:
+    return None if value is None else zlib.crc32(str(value).encode("utf-8"))
+
+
+def _concat_ws(separator, *values) -> str:
+    # ຄືກັບ MariaDB: ຂ້າມຄ່າ NULL
+    return str(separator).join(str(value) for value in values if value is not None)
+
+
+class SQLiteShimCursor:
+    def __init__(self, shim: "SQLiteShimConnection"):
+        self._shim = shim
+        self._cursor = shim._conn.cursor()
+        self._rows: list | None = None
+        self.description = None
+
+    def execute(self, sql: str, params=()):
+        if _KILL_RE.match(sql):
+            self.description, self._rows = None, []
+            return
+        sql = _SET_STATEMENT_RE.sub("", sql)
+        if _EXPLAIN_RE.match(sql):
+            self._explain(_EXPLAIN_RE.sub("", sql))
+            return
+        self._rows = None
+        self._cursor.execute(sql, params)
+        self.description = self._cursor.description
+
+    def _explain(self, sql: str):
+        # ແຖວຕໍ່ table ທີ່ອ້າງເຖິງ (id ດຽວກັນ → guard ຄູນກັນຄືກັບ nested-loop join)
+        self.description = (("id",), ("select_type",), ("table",), ("rows",))
+        self._rows = [
+            (1, "SIMPLE", table, self._shim.row_count(table))
+            for table in dict.fromkeys(_TABLE_REF_RE.findall(sql))
+        ]
+
+    def fetchmany(self, size: int = 1):
+        if self._rows is not None:
+            batch, self._rows = self._rows[:size], self._rows[size:]
+            return batch
+        return self._cursor.fetchmany(size)
+
+    def fetchone(self):
+        batch = self.fetchmany(1)
+        return batch[0] if batch else None
+
+    def fetchall(self):
+        if self._rows is not None:
+            rows, self._rows = self._rows, []
+            return rows
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteShimConnection:
+    """
+    Connection ທີ່ມີ API ທີ່ repo ໃຊ້ຈາກ mariadb (ບໍ່ຄົບທັງໝົດ)
+    """
+
+    def __init__(self, data_path: str, info_path: str, query_latency: float = 0.0):
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.execute(f"ATTACH DATABASE 'file:{data_path}?mode=ro' AS test_visualization")
+        self._conn.execute(f"ATTACH DATABASE 'file:{info_path}?mode=ro' AS INFORMATION_SCHEMA")
+        self._conn.create_function("CRC32", 1, _crc32, deterministic=True)
+        self._conn.create_function("CONCAT_WS", -1, _concat_ws, deterministic=True)
+        self._row_counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.query_latency = query_latency
+        self.autocommit = True
+        self.thread_id = next(_thread_ids)
+
+    def row_count(self, table: str) -> int:
+        with self._lock:
+            if table not in self._row_counts:
+                try:
+                    count = self._conn.execute(
+                        f"SELECT COUNT(*) FROM test_visualization.`{table}`"
+                    ).fetchone()[0]
+                except sqlite3.Error:
+                    count = 0
+                self._row_counts[table] = count
+            return self._row_counts[table]
+
+    def cursor(self, buffered: bool = True, **kwargs):
+        if self.query_latency:
+            time.sleep(self.query_latency)
+        return SQLiteShimCursor(self)
+
+    def ping(self):
+        self._conn.execute("SELECT 1")
+
+    def close(self):
+        self._conn.close()
+
+
+def sqlite_connection_factory(data_path: str, info_path: str, query_latency: float = 0.0):
+    """
+    Factory ສຳລັບ set_connection_factory()
+    """
+    def factory():
+        return SQLiteShimConnection(data_path, info_path, query_latency)
+    return factory
@@ -0,0 +1,87 @@
+"""
+harness.py - ຕິດຕັ້ງ Fake LLM + SQLite shim ແທນ Groq/MariaDB ແລະ reset singletons
+
+ໃຊ້ຮ່ວມກັນລະຫວ່າງ benchmarks (run_benchmarks.py) ແລະ load tests
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Callable
+
+from benchmarks.fakes import fake_llm_factory, sqlite_connection_factory
+from benchmarks.synthetic import SyntheticDatabase
+
+# ຄ່າ env ທີ່ harness ຕັ້ງ (ຖືກຄືນຄ່າເດີມເມື່ອຈົບ)
+_ENV_DEFAULTS = {
+    "SQL_CACHE_PATH": ":memory:",
+    "SCHEMA_CHECK_INTERVAL": "30",
+    "TRACE_RECENT_MAX": "50",
+    # Fake LLM ບໍ່ມີ Rate limit: Scheduler ຍັງເຮັດວຽກ (ວັດ overhead) ແຕ່ບໍ່ throttle
+    "LLM_RPM_LIMIT": "1000000",
+    "LLM_TPM_LIMIT": "1000000000",
+}
+
+
+def reset_singletons():
+    """
+    ລ້າງ singletons ທີ່ຜູກກັບ DB/Schema ເກົ່າ (catalog, schema index, SQL caches)
+    """
+    from src.Agent import table_selector
+    from src.Cache import artifact_store, result_cache, semantic_cache, sql_cache
+    from src.DB import schema_catalog
+    from src.Model_Provider import llm_scheduler, model_router
+
+    schema_catalog._catalog = None
+    llm_scheduler._scheduler = None
+    model_router._router = None
+    table_selector._index = None
+    sql_cache._sql_cache = None
+    semantic_cache._semantic_cache = None
+    result_cache._result_cache = None
+    artifact_store._artifact_store = None
+
+
+@contextmanager
+def fake_environment(
+    database: SyntheticDatabase,
+    sql_script,
+    llm_latency: Callable[[], float] | None = None,
+    query_latency: float = 0.0,
+    env: dict | None = None,
+):
+    """
+    Context manager ທີ່ໃຫ້ Pipeline ທັງໝົດໃຊ້ Fake LLM ແລະ SQLite shim
+
+    Args:
+        database: SyntheticDatabase ຈາກ build_synthetic_database()
+        sql_script: SQL ທີ່ Fake LLM ຈະຕອບ (ຫຼື callable(question) → SQL)
+        llm_latency: callable() → ວິນາທີຕໍ່ LLM call
+        query_latency: ວິນາທີທີ່ເພີ່ມຕໍ່ cursor (ຈຳລອງ network ໄປ DB)
+        env: env ເພີ່ມເຕີມ (ເຊັ່ນ SQL_MAX_ROWS)
+    """
+    from src.DB.db_config import set_connection_factory
+    from src.Model_Provider.llm_config import set_llm_factory
+
+    # Chart HTML ທີ່ benchmark ສ້າງໄປຢູ່ folder ຊົ່ວຄາວ (ບໍ່ປົນກັບ Store ຂອງ app)
+    artifact_dir = tempfile.mkdtemp(prefix="bench_charts_")
+    overrides = {**_ENV_DEFAULTS, "ARTIFACT_STORE_DIR": artifact_dir, **(env or {})}
+    previous = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+
+    set_llm_factory(fake_llm_factory(sql_script, llm_latency))
+    set_connection_factory(sqlite_connection_factory(database.data_path, database.info_path, query_latency))
+    reset_singletons()
+    try:
+        yield
+    finally:
+        set_llm_factory(None)
+        set_connection_factory(None)
+        reset_singletons()
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(artifact_dir, ignore_errors=True)
@@ -0,0 +1,485 @@
+"""
+load_test.py - ຈຳລອງຜູ້ໃຊ້ Streamlit ຫຼາຍຄົນພ້ອມກັນ (Fake LLM + SQLite shim)
+
+ແຕ່ລະ session ເປັນ thread (ຄືກັບ Streamlit ທີ່ໃຫ້ script run ໜຶ່ງ thread ຕໍ່ session)
+ແລະ ເຮັດວຽກຄືກັບ app.py:
+    --mode steps : get_schema → select_tables → sql_agent → (think) → execute_sql
+                   → (think) → summarize_result → chart_agent (ຈັບເວລາແຕ່ລະ node)
+    --mode graph : get_agent_app().invoke(...) ເທື່ອດຽວ
+
+ສຳລັບແຕ່ລະລະດັບ concurrency ຈະລາຍງານ throughput, latency (p50/p95), queueing delay
+(ເວລາທີ່ວັດໄດ້ຈິງໃນຄິວຂອງ LLMScheduler + ການລໍຖ້າ checkout ຈາກ connection pool),
+ການໃຊ້ connections (high-water mark ຂອງ pool), memory ຕໍ່ session ແລະ ຈຸດອີ່ມຕົວ (saturation point).
+
+Usage:
+    python -m benchmarks.load_test --concurrency 1 4 16 64 --llm-latency lognormal:0.8:0.5
+    python -m benchmarks.load_test --mode graph --mix aggregate=0.5,full_scan=0.3,top_n=0.2 --repeat-ratio 0.4
+"""
+
+import argparse
+import json
+import math
+import random
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from loguru import logger
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.harness import fake_environment
+from benchmarks.synthetic import build_synthetic_database
+
+
+DEFAULT_WORKDIR = ROOT / ".cache" / "benchmarks"
+
+# ປະເພດຄຳຖາມ → (ຄຳຖາມ template, SQL ທີ່ Fake LLM ຕອບ)
+QUESTION_KINDS = {
+    "aggregate": (
+        "ຍອດຂາຍລວມແຕ່ລະມື້ ຂອງ sales ປີ {n}",
+        "SELECT sale_date, SUM(amount) AS total_amount FROM test_visualization.sales "
+        "GROUP BY sale_date ORDER BY sale_date",
+    ),
+    "full_scan": (
+        "ລາຍການ sales ທັງໝົດ ພ້ອມ amount ປີ {n}",
+        "SELECT id, sale_date, province, product, amount FROM test_visualization.sales ORDER BY id",
+    ),
+    "top_n": (
+        "10 ແຂວງທີ່ມີຍອດຂາຍ sales ສູງສຸດ ປີ {n}",
+        "SELECT province, SUM(amount) AS total_amount FROM test_visualization.sales "
+        "GROUP BY province ORDER BY total_amount DESC LIMIT 10",
+    ),
+}
+
+STEP_NODES = ("get_schema", "select_tables", "sql_agent", "execute_sql", "summarize_result", "chart_agent")
+
+
+# ===========================
+# Distributions ແລະ Question mix
+# ===========================
+
+def parse_latency(spec: str):
+    """
+    ແປງ spec ຂອງ LLM latency ເປັນ sampler (ວິນາທີ)
+
+    ຮູບແບບ:
+        const:0.5            ຄົງທີ່
+        uniform:0.2:1.0      ສະເໝີກັນລະຫວ່າງ min ແລະ max
+        lognormal:0.8:0.5    median ແລະ sigma (ຫາງຍາວຄືກັບ latency ຂອງ API ຈິງ)
+        exp:0.5              exponential ທີ່ມີຄ່າສະເລ່ຍ 0.5
+    """
+    kind, _, rest = spec.partition(":")
+    params = [float(p) for p in rest.split(":") if p]
+    rng = random.Random(7)
+    lock = threading.Lock()
+
+    if kind == "const":
+        value = params[0] if params else 0.0
+        return lambda: value
+    if kind == "uniform":
+        low, high = params
+        sample = lambda: rng.uniform(low, high)
+    elif kind == "lognormal":
+        median, sigma = params
+        sample = lambda: rng.lognormvariate(math.log(median), sigma)
+    elif kind == "exp":
+        sample = lambda: rng.expovariate(1.0 / params[0])
+    else:
+        raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sampler():
+        with lock:
+            return sample()
+    return sampler
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """
+    "aggregate=0.6,full_scan=0.2,top_n=0.2" → weights
+    """
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in QUESTION_KINDS:
+            raise ValueError(f"Unknown question kind '{name}' (choose from {', '.join(QUESTION_KINDS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+class QuestionMix:
+    """
+    ສຸ່ມຄຳຖາມຕາມ weights; repeat_ratio = ສັດສ່ວນຄຳຖາມທີ່ຊ້ຳກັບຄຳຖາມທີ່ນິຍົມ (ໄດ້ cache hit)
+    """
+
+    def __init__(self, weights: dict[str, float], repeat_ratio: float, seed: int = 42):
+        self.kinds = list(weights)
+        self.weights = [weights[k] for k in self.kinds]
+        self.repeat_ratio = repeat_ratio
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def next(self) -> tuple[str, str]:
+        with self._lock:
+            kind = self._rng.choices(self.kinds, self.weights)[0]
+            if self._rng.random() < self.repeat_ratio:
+                n = 0  # ຄຳຖາມຍອດນິຍົມ (ຄືກັນທຸກຄັ້ງ)
+            else:
+                self._counter += 1
+                n = 1000 + self._counter
+        return kind, QUESTION_KINDS[kind][0].format(n=n)
+
+
+def sql_for_question(question: str) -> str:
+    """
+    SQL ທີ່ Fake LLM ຕອບສຳລັບຄຳຖາມ (ຈັບຄູ່ຕາມ template)
+    """
+    for template, sql in QUESTION_KINDS.values():
+        if template.split("{n}")[0] in question:
+            return sql
+    return QUESTION_KINDS["aggregate"][1]
+
+
+# ===========================
+# Session
+# ===========================
+
+def _deep_sizeof(obj, seen=None) -> int:
+    """
+    ຂະໜາດ (bytes) ໂດຍປະມານຂອງ state ທີ່ session ເກັບໄວ້ (ຄືກັບ st.session_state)
+    """
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def run_session(question: str, mode: str, think_time: float) -> tuple[dict, dict]:
+    """
+    ຈຳລອງ session ໜຶ່ງ (ຄຳຖາມດຽວ ຕັ້ງແຕ່ສ້າງ SQL ຈົນໄດ້ Chart)
+
+    Returns:
+        tuple: (ເວລາຂອງແຕ່ລະ node ເປັນ ms, state ສຸດທ້າຍ)
+    """
+    from src.Agent import nodes
+    from src.Agent.builder import get_agent_app
+
+    state = {"question": question, "messages": []}
+    timings = {}
+    if mode == "graph":
+        started = time.perf_counter()
+        state.update(get_agent_app().invoke(state))
+        timings["graph"] = (time.perf_counter() - started) * 1000
+        return timings, state
+
+    functions = {
+        "get_schema": nodes.get_schema_node,
+        "select_tables": nodes.select_tables_node,
+        "sql_agent": nodes.sql_agent_node,
+        "execute_sql": nodes.execute_sql_node,
+        "summarize_result": nodes.summarize_result_node,
+        "chart_agent": nodes.chart_generation_node,
+    }
+    for name in STEP_NODES:
+        # ຜູ້ໃຊ້ກວດ SQL ກ່ອນກົດ Execute ແລະ ເບິ່ງຜົນກ່ອນສ້າງ Chart
+        if name in ("execute_sql", "summarize_result") and think_time:
+            time.sleep(think_time)
+        started = time.perf_counter()
+        state.update(functions[name](state) or {})
+        timings[name] = (time.perf_counter() - started) * 1000
+    return timings, state
+
+
+class PoolMonitor:
+    """
+    ເກັບຕົວຢ່າງການໃຊ້ connection pool ທຸກໆ interval ວິນາທີ (thread ແຍກ) ສຳລັບຄ່າສະເລ່ຍ;
+    ຄ່າສູງສຸດອ່ານຈາກ max_in_use ຂອງ pool ເພາະການສຸ່ມຕົວຢ່າງພາດ checkout ທີ່ສັ້ນກວ່າ interval
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples: list[int] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        from src.DB.db_config import get_db_pool
+        while not self._stop.is_set():
+            self.samples.append(get_db_pool().stats()["in_use"])
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def run_level(concurrency: int, args, mix: QuestionMix) -> dict:
+    """
+    Run sessions ພ້ອມກັນ concurrency ອັນ (closed loop) ເປັນເວລາ args.duration ວິນາທີ
+    """
+    from src.DB.db_config import get_db_pool
+    from src.Model_Provider.llm_scheduler import get_llm_scheduler
+
+    get_db_pool().reset_peak()
+    get_llm_scheduler().reset_stats()
+    pool_before = get_db_pool().stats()
+    deadline = time.monotonic() + args.duration
+    lock = threading.Lock()
+    session_ms: list[float] = []
+    node_ms: dict[str, list[float]] = {}
+    state_bytes: list[int] = []
+    errors = 0
+
+    def worker():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            _, question = mix.next()
+            started = time.perf_counter()
+            try:
+                timings, state = run_session(question, args.mode, args.think_time)
+                failed = bool((state.get("sql_result") or {}).get("error")) or str(
+                    state.get("final_report", "")
+                ).startswith("Error")
+            except Exception as e:
+                logger.debug(f"Session failed: {e}")
+                timings, state, failed = {}, {}, True
+            elapsed = (time.perf_counter() - started) * 1000
+            size = _deep_sizeof(state)
+            with lock:
+                session_ms.append(elapsed)
+                state_bytes.append(size)
+                errors += failed
+                for name, value in timings.items():
+                    node_ms.setdefault(name, []).append(value)
+
+    started = time.perf_counter()
+    with PoolMonitor() as monitor, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    pool_after = get_db_pool().stats()
+    waits = pool_after["waits"] - pool_before["waits"]
+    checkouts = pool_after["checkouts"] - pool_before["checkouts"]
+    wait_total = pool_after["wait_time_total"] - pool_before["wait_time_total"]
+    sessions = len(session_ms)
+    llm = _llm_queue_stats(get_llm_scheduler().stats())
+    # Queueing delay ຕໍ່ session: ເວລາທີ່ລໍຖ້າໃນຄິວຂອງ LLMScheduler + ລໍຖ້າ connection ຈາກ pool
+    queue_delay_ms = (llm["total_wait_ms"] + wait_total * 1000) / sessions if sessions else 0.0
+
+    return {
+        "concurrency": concurrency,
+        "sessions": sessions,
+        "errors": errors,
+        "throughput_per_s": round(sessions / wall, 3) if wall else 0.0,
+        "p50_ms": round(_percentile(session_ms, 0.50), 2),
+        "p95_ms": round(_percentile(session_ms, 0.95), 2),
+        "queue_delay_ms": round(queue_delay_ms, 2),
+        "llm": llm,
+        "nodes": {
+            name: {"p50_ms": round(_percentile(values, 0.50), 2), "p95_ms": round(_percentile(values, 0.95), 2)}
+            for name, values in node_ms.items()
+        },
+        "pool": {
+            "max_size": pool_after["max_size"],
+            "checkouts": checkouts,
+            "waits": waits,
+            "wait_ratio": round(waits / checkouts, 4) if checkouts else 0.0,
+            "mean_wait_ms": round(wait_total / waits * 1000, 2) if waits else 0.0,
+            "mean_checkout_wait_ms": round(wait_total / checkouts * 1000, 2) if checkouts else 0.0,
+            "connections_created": pool_after["created"] - pool_before["created"],
+            "max_in_use": pool_after["max_in_use"],
+            "mean_in_use": round(statistics.fmean(monitor.samples), 2) if monitor.samples else 0.0,
+        },
+        "state_kb_per_session": round(statistics.fmean(state_bytes) / 1024, 2) if state_bytes else 0.0,
+    }
+
+
+def _llm_queue_stats(scheduler_stats: dict) -> dict:
+    """
+    ລວມເວລາລໍຖ້າໃນຄິວຂອງທຸກ models (ຫຼັງ reset_stats ຕອນເລີ່ມລະດັບ); p95 = model ທີ່ຊ້າທີ່ສຸດ
+    """
+    models = scheduler_stats["models"].values()
+    calls = sum(model["calls"] for model in models)
+    total_wait_ms = sum(model["total_wait_ms"] for model in models)
+    return {
+        "calls": calls,
+        "rate_limited": scheduler_stats["rate_limited"],
+        "total_wait_ms": round(total_wait_ms, 2),
+        "mean_wait_ms": round(total_wait_ms / calls, 2) if calls else 0.0,
+        "p95_wait_ms": max((model["p95_wait_ms"] for model in models), default=0.0),
+        "max_queue_depth": max((model["max_queue_depth"] for model in models), default=0),
+    }
+
+
+def measure_memory(concurrency: int, args, mix: QuestionMix) -> float:
+    """
+    Peak memory (tracemalloc) ຂອງ sessions ທີ່ run ພ້ອມກັນຮອບດຽວ ÷ concurrency (MB ຕໍ່ session)
+
+    ແຍກຈາກ run_level ເພາະ tracemalloc ເຮັດໃຫ້ latency ບິດເບືອນ
+    """
+    questions = [mix.next()[1] for _ in range(concurrency)]
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(lambda q: run_session(q, args.mode, 0.0), questions))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round((peak - baseline) / concurrency / (1024 * 1024), 3)
+
+
+def find_saturation(
+    levels: list[dict],
+    min_gain: float = 0.1,
+    min_efficiency: float = 0.5,
+    latency_factor: float = 2.0,
+) -> dict | None:
+    """
+    ຈຸດອີ່ມຕົວ: ລະດັບທຳອິດທີ່ throughput ເພີ່ມຂຶ້ນໜ້ອຍກວ່າ min_gain, ເພີ່ມບໍ່ທັນ concurrency
+    (scaling efficiency < min_efficiency), p95 ເກີນ latency_factor ເທົ່າຂອງລະດັບທຳອິດ ຫຼື ມີ errors
+    """
+    if not levels:
+        return None
+    base_p95 = levels[0]["p95_ms"] or 1.0
+    for previous, level in zip(levels, levels[1:]):
+        reasons = []
+        gain = level["throughput_per_s"] / previous["throughput_per_s"] if previous["throughput_per_s"] else 0.0
+        efficiency = gain / (level["concurrency"] / previous["concurrency"])
+        if gain < 1 + min_gain:
+            reasons.append("throughput plateau")
+        elif efficiency < min_efficiency:
+            reasons.append(f"scaling efficiency {efficiency:.0%}")
+        if level["p95_ms"] > base_p95 * latency_factor:
+            reasons.append(f"p95 > {latency_factor:g}x baseline")
+        if level["errors"]:
+            reasons.append(f"{level['errors']} failed sessions")
+        if reasons:
+            return {
+                "concurrency": level["concurrency"],
+                "last_good_concurrency": previous["concurrency"],
+                "reasons": reasons,
+            }
+    return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent Streamlit sessions against the agent")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level")
+    parser.add_argument("--mode", choices=["steps", "graph"], default="steps")
+    parser.add_argument("--llm-latency", default="lognormal:0.8:0.5",
+                        help="const:S | uniform:MIN:MAX | lognormal:MEDIAN:SIGMA | exp:MEAN")
+    parser.add_argument("--db-latency", type=float, default=0.002, help="Seconds added per DB cursor")
+    parser.add_argument("--mix", default="aggregate=0.6,full_scan=0.2,top_n=0.2", help="Question kind weights")
+    parser.add_argument("--repeat-ratio", type=float, default=0.3, help="Share of repeated (cacheable) questions")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds a user pauses between steps")
+    parser.add_argument("--tables", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--pool-size", type=int, default=10, help="DB_POOL_MAX_SIZE for the run")
+    parser.add_argument("--no-result-cache", action="store_true", help="Disable the executed-SQL result cache")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show application logs")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level="DEBUG" if args.verbose else "WARNING",
+        filter=lambda record: record["name"] != __name__,
+    )
+    logger.add(sys.stderr, level="INFO", filter=lambda record: record["name"] == __name__)
+    args.workdir.mkdir(parents=True, exist_ok=True)
+
+    database = build_synthetic_database(str(args.workdir), args.tables, args.rows, seed=args.seed)
+    mix = QuestionMix(parse_mix(args.mix), args.repeat_ratio, seed=args.seed)
+    env = {
+        "DB_POOL_MAX_SIZE": str(args.pool_size),
+        "DB_POOL_TIMEOUT": str(max(30.0, args.duration * 3)),
+        "RESULT_SPILL_DIR": str(args.workdir / "spill"),
+        "TRACE_EXPORT_PATH": str(args.workdir / "traces.jsonl"),
+        "RESULT_CACHE_ENABLED": "0" if args.no_result_cache else "1",
+    }
+
+    levels = []
+    with fake_environment(
+        database,
+        sql_for_question,
+        llm_latency=parse_latency(args.llm_latency),
+        query_latency=args.db_latency,
+        env=env,
+    ):
+        # Warm-up: ໂຫຼດ Schema catalog/index ກ່ອນ (ບໍ່ໃຫ້ cold start ປົນກັບລະດັບທຳອິດ)
+        run_session(mix.next()[1], args.mode, 0.0)
+        for concurrency in args.concurrency:
+            level = run_level(concurrency, args, mix)
+            if not args.no_memory:
+                level["memory_mb_per_session"] = measure_memory(concurrency, args, mix)
+            levels.append(level)
+            pool = level["pool"]
+            memory = level.get("memory_mb_per_session")
+            logger.info(
+                f"👥 c={concurrency:<4} sessions={level['sessions']:<5} "
+                f"{level['throughput_per_s']:.2f}/s p50={level['p50_ms']:.0f}ms p95={level['p95_ms']:.0f}ms "
+                f"queue={level['queue_delay_ms']:.0f}ms/session "
+                f"llm_wait p95={level['llm']['p95_wait_ms']:.0f}ms pool_wait={pool['mean_wait_ms']:.0f}ms "
+                f"({pool['wait_ratio']:.0%} of checkouts) in_use max={pool['max_in_use']}/{pool['max_size']} "
+                f"state={level['state_kb_per_session']:.0f}KB "
+                f"mem={'n/a' if memory is None else f'{memory:.2f}MB'}/session errors={level['errors']}"
+            )
+
+    saturation = find_saturation(levels)
+    if saturation:
+        logger.warning(
+            f"📈 Saturation at concurrency {saturation['concurrency']} "
+            f"(last good: {saturation['last_good_concurrency']}): {', '.join(saturation['reasons'])}"
+        )
+    else:
+        logger.success("✅ No saturation within the tested concurrency levels")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        report = {"config": {k: str(v) for k, v in vars(args).items()}, "levels": levels, "saturation": saturation}
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        logger.info(f"💾 Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+run_benchmarks.py - Benchmark ແຕ່ລະ Node ແລະ Graph ເຕັມ ໂດຍບໍ່ຕ້ອງມີ Groq ຫຼື MariaDB
+
+ວັດ p50/p95 latency, throughput ແລະ peak memory (tracemalloc) ຕໍ່ຂະໜາດ Schema
+(ຈຳນວນ tables) ແລະ ຂະໜາດ Result set (ຈຳນວນແຖວ). ຜົນລັບບັນທຶກເປັນ JSON ແລະ
+ປຽບທຽບກັບ baseline ໄດ້ (exit code 1 ເມື່ອຊ້າລົງເກີນ threshold) ສຳລັບ CI.
+
+Usage:
+    python -m benchmarks.run_benchmarks --tables 10 100 --rows 10 10000 --output bench.json
+    python -m benchmarks.run_benchmarks --quick --compare bench.json --threshold 0.25
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from loguru import logger
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.harness import fake_environment
+from benchmarks.synthetic import build_synthetic_database
+
+
+DEFAULT_WORKDIR = ROOT / ".cache" / "benchmarks"
+
+BENCHMARK_SQL = (
+    "SELECT sale_date, SUM(amount) AS total_amount "
+    "FROM test_visualization.sales GROUP BY sale_date ORDER BY sale_date"
+)
+# SQL ທີ່ດຶງທຸກແຖວ (ວັດ execute/summarize ຕາມຂະໜາດ result set)
+FULL_SCAN_SQL = "SELECT id, sale_date, province, amount FROM test_visualization.sales ORDER BY id"
+
+QUESTIONS = [
+    "ຍອດຂາຍລວມແຕ່ລະມື້ ຂອງ sales",
+    "ສະແດງ sales amount ຕາມ sale_date",
+    "ແນວໂນ້ມຍອດຂາຍ (sales) ແຕ່ລະວັນ",
+]
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _measure(fn, iterations: int, warmup: int) -> dict:
+    """
+    ຮຽກ fn() ຫຼາຍຮອບ ແລ້ວສະຫຼຸບ latency/throughput; peak memory ວັດແຍກອີກຮອບ
+    (tracemalloc ເຮັດໃຫ້ຊ້າລົງ ຈຶ່ງບໍ່ລວມກັບການວັດເວລາ)
+    """
+    for i in range(warmup):
+        fn(i)
+
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(warmup + i)
+        samples.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn(warmup + iterations)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(samples, 0.50), 3),
+        "p95_ms": round(_percentile(samples, 0.95), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "throughput_per_s": round(iterations / elapsed, 2) if elapsed else 0.0,
+        "peak_mem_mb": round(peak / (1024 * 1024), 3),
+    }
+
+
+def _benchmark_size(table_count: int, rows: int, args) -> list[dict]:
+    from src.Agent.builder import get_agent_app
+    from src.Agent.nodes import (
+        chart_generation_node,
+        execute_sql_node,
+        get_schema_node,
+        select_tables_node,
+        sql_agent_node,
+        summarize_result_node,
+    )
+
+    database = build_synthetic_database(str(args.workdir), table_count, rows, seed=args.seed)
+    spill_dir = tempfile.mkdtemp(prefix="spill_", dir=args.workdir)
+    latency = (lambda: args.llm_latency) if args.llm_latency else None
+    env = {
+        "SQL_MAX_ROWS": str(max(rows, 1)),
+        "SQL_MAX_BYTES": str(4 * 1024 * 1024 * 1024),
+        "RESULT_SPILL_DIR": spill_dir,
+        "TRACE_EXPORT_PATH": str(Path(args.workdir) / "traces.jsonl"),
+        # ວັດການ execute ຈິງ (ບໍ່ແມ່ນ Result Cache)
+        "RESULT_CACHE_ENABLED": "0",
+    }
+
+    results = []
+    try:
+        with fake_environment(database, BENCHMARK_SQL, llm_latency=latency, env=env):
+            # State ຕັ້ງຕົ້ນທີ່ແຕ່ລະ node ຕ້ອງການ
+            base = {"question": QUESTIONS[0], "messages": []}
+            base.update(get_schema_node(base))
+            base.update(select_tables_node(base))
+            full_scan = {**base, "sql_script": FULL_SCAN_SQL}
+            full_scan.update(execute_sql_node(full_scan))
+            if full_scan["sql_result"].get("error"):
+                raise RuntimeError(f"Benchmark query failed: {full_scan['sql_result']['error']}")
+            grouped = {**base, "sql_script": BENCHMARK_SQL}
+            grouped.update(execute_sql_node(grouped))
+            grouped.update(summarize_result_node(grouped))
+
+            app = get_agent_app()
+
+            def question(i: int) -> str:
+                # ຕົວເລກຕ່າງກັນ → ບໍ່ hit SQL/semantic cache (ວັດເສັ້ນທາງທີ່ຮຽກ LLM)
+                return f"{QUESTIONS[i % len(QUESTIONS)]} ປີ {2000 + i}"
+
+            targets = {
+                "node.get_schema": lambda i: get_schema_node(base),
+                "node.select_tables": lambda i: select_tables_node(base),
+                "node.sql_agent": lambda i: sql_agent_node({**base, "question": question(i)}),
+                "node.execute_sql": lambda i: execute_sql_node({**base, "sql_script": FULL_SCAN_SQL}),
+                "node.summarize_result": lambda i: summarize_result_node(full_scan),
+                # ຄຳຖາມຕ່າງກັນ → ບໍ່ hit Artifact Store (ວັດການສ້າງ Chart ແທ້)
+                "node.chart_agent": lambda i: chart_generation_node({**grouped, "question": question(i)}),
+                "graph.invoke": lambda i: app.invoke({"question": question(i), "messages": []}),
+            }
+            for name, fn in targets.items():
+                if args.only and not any(name.endswith(only) for only in args.only):
+                    continue
+                stats = _measure(fn, args.iterations, args.warmup)
+                stats.update({"target": name, "tables": table_count, "rows": rows})
+                results.append(stats)
+                logger.info(
+                    f"⏱️ tables={table_count:<5} rows={rows:<8} {name:<22} "
+                    f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms "
+                    f"{stats['throughput_per_s']:.1f}/s peak={stats['peak_mem_mb']:.1f}MB"
+                )
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+    return results
+
+
+def compare(results: list[dict], baseline: list[dict], threshold: float, min_delta_ms: float) -> list[str]:
+    """
+    ປຽບທຽບ p95 ແລະ peak memory ກັບ baseline
+
+    Returns:
+        list[str]: ລາຍການ regressions (ວ່າງ = ຜ່ານ)
+    """
+    previous = {(r["target"], r["tables"], r["rows"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        old = previous.get((result["target"], result["tables"], result["rows"]))
+        if old is None:
+            continue
+        label = f"{result['target']} (tables={result['tables']}, rows={result['rows']})"
+        p95, old_p95 = result["p95_ms"], old["p95_ms"]
+        # ບໍ່ນັບການປ່ຽນແປງນ້ອຍກວ່າ min_delta_ms (noise ຂອງ node ທີ່ໄວຫຼາຍ)
+        if p95 > old_p95 * (1 + threshold) and p95 - old_p95 > min_delta_ms:
+            regressions.append(f"{label}: p95 {old_p95:.2f}ms → {p95:.2f}ms")
+        peak, old_peak = result["peak_mem_mb"], old["peak_mem_mb"]
+        if peak > old_peak * (1 + threshold) and peak - old_peak > 1.0:
+            regressions.append(f"{label}: peak memory {old_peak:.1f}MB → {peak:.1f}MB")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the chart agent with a fake LLM and SQLite")
+    parser.add_argument("--tables", type=int, nargs="+", default=[10, 100, 1000], help="Schema sizes")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 10_000, 1_000_000], help="Result set sizes")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--only", nargs="+", help="Run only these targets (e.g. execute_sql graph.invoke)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per LLM call")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", type=Path, default=DEFAULT_WORKDIR, help="Where synthetic DBs are cached")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore p95 changes smaller than this")
+    parser.add_argument("--quick", action="store_true", help="Small sizes for CI (10/100 tables, 10/10k rows)")
+    parser.add_argument("--verbose", action="store_true", help="Show application logs")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.tables, args.rows, args.iterations = [10, 100], [10, 10_000], min(args.iterations, 10)
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level="DEBUG" if args.verbose else "WARNING",
+        filter=lambda record: record["name"] != __name__,
+    )
+    logger.add(sys.stderr, level="INFO", filter=lambda record: record["name"] == __name__)
+    args.workdir.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    for table_count in args.tables:
+        for rows in args.rows:
+            results.extend(_benchmark_size(table_count, rows, args))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "iterations": args.iterations,
+            "llm_latency": args.llm_latency,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        logger.info(f"💾 Results written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            for line in regressions:
+                logger.error(f"📉 Regression: {line}")
+            return 1
+        logger.success(f"✅ No regressions against {args.compare} (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+semantic_pairs.py - ຊຸດຄູ່ຄຳຖາມພາສາລາວທີ່ຕິດປ້າຍໄວ້ ສຳລັບເລືອກ SEMANTIC_CACHE_THRESHOLD
+
+ແຕ່ລະຄູ່ (ຄຳຖາມທີ່ຢູ່ໃນ Cache, ຄຳຖາມໃໝ່, paraphrase?):
+- paraphrase = True: SQL ຂອງຄຳຖາມທຳອິດຕອບຄຳຖາມທີສອງໄດ້ ຕ້ອງເປັນ Cache hit
+- paraphrase = False: ຄວາມໝາຍຕ່າງກັນ (entity, ຕົວເລກ, ຊ່ວງເວລາ, ທິດທາງ) ຕ້ອງເປັນ Cache miss
+
+ແຕ່ລະຄູ່ຖືກວັດໃນ namespace ຂອງຕົນເອງ ໂດຍ Cache ມີທຸກຄຳຖາມທຳອິດ (IDF ຄືກັບ Cache ທີ່ໃຊ້ງານແທ້).
+Semantic hit ທີ່ຜິດແພງກວ່າ miss (SQL ຜິດ vs ຮຽກ LLM ໜຶ່ງຄັ້ງ) ຈຶ່ງເລືອກ threshold ທີ່ບໍ່ມີ
+false positive ເລີຍ ແລະ ຫ່າງຈາກຄູ່ທີ່ບໍ່ແມ່ນ paraphrase ທີ່ໄດ້ຄະແນນສູງສຸດ (~0.41) ພໍສົມຄວນ → 0.5.
+
+Usage:
+    python -m benchmarks.semantic_pairs
+    python -m benchmarks.semantic_pairs --thresholds 0.5 0.6 0.7 --verbose
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.Cache.semantic_cache import SemanticCache
+
+
+PAIRS = [
+    # Paraphrase: ຄຳສຸພາບ, ຄຳເຊື່ອມ, ລຳດັບຄຳ ແລະ ຍະຫວ່າງຕ່າງກັນ
+    ("ຍອດຂາຍແຕ່ລະແຂວງ", "ສະແດງຍອດຂາຍແຕ່ລະແຂວງ", True),
+    ("ຍອດຂາຍແຕ່ລະແຂວງ", "ຂໍເບິ່ງຍອດຂາຍຂອງແຕ່ລະແຂວງແດ່", True),
+    ("ຍອດຂາຍລວມແຕ່ລະແຂວງ", "ຍອດຂາຍລວມ ແຍກຕາມແຂວງ", True),
+    ("ຈຳນວນລູກຄ້າແຕ່ລະເດືອນ", "ສະແດງຈຳນວນລູກຄ້າໃນແຕ່ລະເດືອນ", True),
+    ("ຈຳນວນລູກຄ້າແຕ່ລະເດືອນ", "ຢາກຮູ້ຈຳນວນລູກຄ້າແຕ່ລະເດືອນ", True),
+    ("ລາຍຮັບຂອງແຕ່ລະສິນຄ້າ", "ລາຍຮັບແຕ່ລະສິນຄ້າ", True),
+    ("ລາຍຮັບຂອງແຕ່ລະສິນຄ້າ", "ລາຍຮັບ ຂອງ ສິນຄ້າ ແຕ່ລະອັນ", True),
+    ("ສິນຄ້າທີ່ຂາຍດີທີ່ສຸດ 5 ອັນດັບ", "ສະແດງ 5 ອັນດັບສິນຄ້າທີ່ຂາຍດີທີ່ສຸດ", True),
+    ("ຍອດຂາຍແຕ່ລະມື້ໃນປີ 2024", "ຂໍຍອດຂາຍແຕ່ລະມື້ ປີ 2024", True),
+    ("ລາຄາສະເລ່ຍຂອງສິນຄ້າແຕ່ລະປະເພດ", "ລາຄາສະເລ່ຍສິນຄ້າແຕ່ລະປະເພດ", True),
+    ("ຂໍ້ມູນຍອດຂາຍທັງໝົດ", "ສະແດງຂໍ້ມູນຍອດຂາຍທັງໝົດ", True),
+    ("ຍອດຂາຍຂອງພະນັກງານແຕ່ລະຄົນ", "ຍອດຂາຍແຕ່ລະພະນັກງານ", True),
+    ("ແນວໂນ້ມຍອດຂາຍແຕ່ລະເດືອນ", "ສະແດງແນວໂນ້ມຂອງຍອດຂາຍແຕ່ລະເດືອນແດ່", True),
+    ("ລູກຄ້າທີ່ຊື້ຫຼາຍທີ່ສຸດ", "ລູກຄ້າຄົນໃດຊື້ຫຼາຍທີ່ສຸດ", True),
+    ("ສະແດງ sales amount ຕາມ sale_date", "sales amount ຕາມ sale_date", True),
+    ("ຍອດຂາຍລວມແຕ່ລະມື້ ຂອງ sales", "ຍອດຂາຍລວມແຕ່ລະມື້ຂອງ sales ແດ່", True),
+    # Non-paraphrase: entity ຕ່າງກັນ (guard)
+    ("ຍອດຂາຍແຕ່ລະແຂວງ", "ຍອດຂາຍແຕ່ລະສິນຄ້າ", False),
+    ("ຍອດຂາຍແຕ່ລະແຂວງ", "ຍອດຂາຍແຕ່ລະເມືອງ", False),
+    ("ຈຳນວນລູກຄ້າແຕ່ລະເດືອນ", "ຈຳນວນລູກຄ້າແຕ່ລະປີ", False),
+    ("ຈຳນວນລູກຄ້າແຕ່ລະເດືອນ", "ຈຳນວນຜູ້ໃຊ້ແຕ່ລະເດືອນ", False),
+    ("ລາຍຮັບຂອງແຕ່ລະສິນຄ້າ", "ກຳໄລຂອງແຕ່ລະສິນຄ້າ", False),
+    ("ລູກຄ້າທີ່ຊື້ຫຼາຍທີ່ສຸດ", "ລູກຄ້າທີ່ຊື້ໜ້ອຍທີ່ສຸດ", False),
+    ("ຍອດຂາຍເດືອນນີ້", "ຍອດຂາຍເດືອນກ່ອນ", False),
+    ("ຍອດຂາຍມື້ນີ້", "ຍອດຂາຍມື້ວານ", False),
+    ("ສະແດງ sales amount ຕາມ sale_date", "ສະແດງ sales amount ຕາມ province", False),
+    # Non-paraphrase: ຕົວເລກຕ່າງກັນ (guard)
+    ("ສິນຄ້າທີ່ຂາຍດີທີ່ສຸດ 5 ອັນດັບ", "ສິນຄ້າທີ່ຂາຍດີທີ່ສຸດ 10 ອັນດັບ", False),
+    ("ຍອດຂາຍແຕ່ລະມື້ໃນປີ 2024", "ຍອດຂາຍແຕ່ລະມື້ໃນປີ 2023", False),
+    # Non-paraphrase: entities ຄືກັນ ແຕ່ຄຳຖາມຕ່າງກັນ (threshold ຕ້ອງຕັດ)
+    ("ຍອດຂາຍແຕ່ລະແຂວງ", "ແຂວງໃດມີຍອດຂາຍເພີ່ມຂຶ້ນ", False),
+    ("ຈຳນວນລູກຄ້າແຕ່ລະເດືອນ", "ລູກຄ້າໃໝ່ທີ່ລົງທະບຽນແຕ່ລະເດືອນມີຈັກຄົນ ຈຳນວນ", False),
+    ("ລາຍຮັບຂອງແຕ່ລະສິນຄ້າ", "ສິນຄ້າໃດບໍ່ມີລາຍຮັບ", False),
+    ("ຂໍ້ມູນຍອດຂາຍທັງໝົດ", "ສົມທຽບຍອດຂາຍກັບເປົ້າໝາຍ", False),
+    ("ຍອດຂາຍຂອງພະນັກງານແຕ່ລະຄົນ", "ພະນັກງານທີ່ລາອອກແລ້ວມີຍອດຂາຍ", False),
+    ("ແນວໂນ້ມຍອດຂາຍແຕ່ລະເດືອນ", "ເດືອນທີ່ຍອດຂາຍຫຼຸດລົງ", False),
+    ("ລາຄາສະເລ່ຍຂອງສິນຄ້າແຕ່ລະປະເພດ", "ສິນຄ້າປະເພດໃດລາຄາແພງ ສະເລ່ຍ", False),
+]
+
+
+def evaluate(thresholds: list[float], verbose: bool = False) -> list[dict]:
+    """
+    Precision/Recall ຂອງ SemanticCache (similarity + guard) ຕໍ່ threshold
+    """
+    # threshold -1: ທຸກ lookup ສົ່ງ similarity ກັບມາ ຍົກເວັ້ນຄູ່ທີ່ guard ປະຕິເສດ
+    cache = SemanticCache(threshold=-1.0)
+    for index, (cached, _, _) in enumerate(PAIRS):
+        cache.add(cached, f"pair-{index}", "m", f"SQL {index}")
+
+    similarities = []
+    for index, (_, question, _) in enumerate(PAIRS):
+        match = cache.lookup(question, f"pair-{index}", "m")
+        similarities.append(match.similarity if match else None)  # None = guard ປະຕິເສດ
+
+    if verbose:
+        for (cached, question, paraphrase), similarity in zip(PAIRS, similarities):
+            score = "guard" if similarity is None else f"{similarity:.3f}"
+            print(f"{'✅' if paraphrase else '❌'} {score:>6}  {cached} | {question}")
+
+    rows = []
+    for threshold in thresholds:
+        tp = fp = fn = 0
+        for (_, _, paraphrase), similarity in zip(PAIRS, similarities):
+            hit = similarity is not None and similarity >= threshold
+            tp += hit and paraphrase
+            fp += hit and not paraphrase
+            fn += paraphrase and not hit
+        rows.append({
+            "threshold": threshold,
+            "precision": tp / (tp + fp) if tp + fp else 1.0,
+            "recall": tp / (tp + fn) if tp + fn else 0.0,
+            "false_positives": fp,
+        })
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tune SEMANTIC_CACHE_THRESHOLD on labelled Lao question pairs")
+    parser.add_argument(
+        "--thresholds", type=float, nargs="+",
+        default=[0.4, 0.45, 0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9],
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show the similarity of every pair")
+    args = parser.parse_args(argv)
+
+    paraphrases = sum(paraphrase for _, _, paraphrase in PAIRS)
+    print(f"{len(PAIRS)} pairs ({paraphrases} paraphrases, {len(PAIRS) - paraphrases} different questions)")
+    for row in evaluate(args.thresholds, args.verbose):
+        print(
+            f"threshold {row['threshold']:.2f}: precision {row['precision']:.2f}, "
+            f"recall {row['recall']:.2f}, false positives {row['false_positives']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
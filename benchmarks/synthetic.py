@@ -0,0 +1,171 @@
+"""
+synthetic.py - ສ້າງ Schema test_visualization ແລະ ຂໍ້ມູນສັງເຄາະ (SQLite) ທີ່ seed ຄົງທີ່
+
+- N tables (10-1000) ທີ່ມີຊື່/columns ຄ້າຍກັບ Schema ຈິງ + Foreign Keys
+- Fact table "sales" ທີ່ມີຈຳນວນແຖວຕາມທີ່ຕ້ອງການ (10-1M) ສຳລັບວັດ execute/chart
+- INFORMATION_SCHEMA (TABLES, COLUMNS, KEY_COLUMN_USAGE) ທີ່ SchemaCatalog ອ່ານ
+"""
+
+import datetime
+import os
+import random
+import sqlite3
+from dataclasses import dataclass
+
+
+SCHEMA_NAME = "test_visualization"
+
+_ENTITIES = [
+    "customer", "product", "order", "invoice", "payment", "employee", "branch",
+    "province", "district", "supplier", "shipment", "warehouse", "category",
+    "campaign", "contract", "account", "ticket", "device", "vehicle", "project",
+]
+_PROVINCES = ["ນະຄອນຫຼວງວຽງຈັນ", "ຫຼວງພະບາງ", "ສະຫວັນນະເຂດ", "ຈຳປາສັກ", "ວຽງຈັນ", "ອຸດົມໄຊ"]
+_PRODUCTS = ["ເຂົ້າ", "ກາເຟ", "ນ້ຳດື່ມ", "ເບຍ", "ໂທລະສັບ", "ຄອມພິວເຕີ", "ລົດຈັກ", "ປຸ໋ຍ"]
+
+
+@dataclass(frozen=True)
+class SyntheticDatabase:
+    """
+    Path ຂອງ SQLite files ທີ່ສ້າງແລ້ວ
+    """
+    data_path: str
+    info_path: str
+    table_count: int
+    sales_rows: int
+
+
+def _table_specs(table_count: int, rng: random.Random) -> list[tuple[str, list[tuple[str, str, str]], list[str]]]:
+    """
+    (ຊື່ table, [(column, data_type, column_key)], [FK target tables])
+    """
+    specs = [(
+        "sales",
+        [
+            ("id", "int", "PRI"),
+            ("sale_date", "date", ""),
+            ("province", "varchar", ""),
+            ("product", "varchar", ""),
+            ("amount", "decimal", ""),
+            ("quantity", "int", ""),
+        ],
+        [],
+    )]
+    names = ["sales"]
+    for index in range(table_count - 1):
+        entity = _ENTITIES[index % len(_ENTITIES)]
+        name = entity if index < len(_ENTITIES) else f"{entity}_{index // len(_ENTITIES)}"
+        columns = [("id", "int", "PRI"), ("name", "varchar", ""), ("created_at", "datetime", "")]
+        for extra in range(rng.randint(2, 6)):
+            columns.append((f"{entity}_metric_{extra}", rng.choice(["int", "decimal", "varchar"]), ""))
+        fks = []
+        if names and rng.random() < 0.5:
+            target = rng.choice(names)
+            columns.append((f"{target}_id", "int", "MUL"))
+            fks.append(target)
+        specs.append((name, columns, fks))
+        names.append(name)
+    return specs
+
+
+def build_synthetic_database(directory: str, table_count: int, sales_rows: int, seed: int = 42) -> SyntheticDatabase:
+    """
+    ສ້າງ SQLite files ສຳລັບ schema ຂະໜາດ table_count ແລະ sales ຂະໜາດ sales_rows
+
+    Args:
+        directory: Folder ທີ່ຈະເກັບ files
+        table_count: ຈຳນວນ tables ທັງໝົດ (ລວມ sales)
+        sales_rows: ຈຳນວນແຖວຂອງ table sales
+        seed: Random seed (ຜົນລັບຄືກັນທຸກຄັ້ງ)
+
+    Returns:
+        SyntheticDatabase: path ຂອງ data ແລະ INFORMATION_SCHEMA
+    """
+    os.makedirs(directory, exist_ok=True)
+    data_path = os.path.join(directory, f"data_{table_count}_{sales_rows}.sqlite3")
+    info_path = os.path.join(directory, f"info_v2_{table_count}.sqlite3")
+    rng = random.Random(seed)
+    specs = _table_specs(table_count, rng)
+
+    if not os.path.exists(info_path):
+        _build_information_schema(info_path, specs)
+    if not os.path.exists(data_path):
+        _build_data(data_path, specs, sales_rows, rng)
+
+    return SyntheticDatabase(data_path, info_path, table_count, sales_rows)
+
+
+def _build_information_schema(path: str, specs):
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(
+        """
+        CREATE TABLE TABLES (TABLE_SCHEMA, TABLE_NAME, CREATE_TIME, UPDATE_TIME, TABLE_COMMENT);
+        CREATE TABLE COLUMNS (TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, COLUMN_TYPE,
+                              IS_NULLABLE, COLUMN_KEY, COLUMN_COMMENT, ORDINAL_POSITION);
+        CREATE TABLE KEY_COLUMN_USAGE (TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, CONSTRAINT_NAME,
+                                       ORDINAL_POSITION, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME);
+        """
+    )
+    created = "2025-01-01 00:00:00"
+    for name, columns, fks in specs:
+        comment = "ຍອດຂາຍ" if name == "sales" else ""
+        conn.execute("INSERT INTO TABLES VALUES (?, ?, ?, NULL, ?)", (SCHEMA_NAME, name, created, comment))
+        conn.executemany(
+            "INSERT INTO COLUMNS VALUES (?, ?, ?, ?, ?, ?, ?, '', ?)",
+            [
+                (SCHEMA_NAME, name, col, data_type, data_type, "NO" if key == "PRI" else "YES", key, position)
+                for position, (col, data_type, key) in enumerate(columns, start=1)
+            ],
+        )
+        for target in fks:
+            conn.execute(
+                "INSERT INTO KEY_COLUMN_USAGE VALUES (?, ?, ?, ?, 1, ?, 'id')",
+                (SCHEMA_NAME, name, f"{target}_id", f"fk_{name}_{target}", target),
+            )
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, path)
+
+
+def _build_data(path: str, specs, sales_rows: int, rng: random.Random):
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    for name, columns, _ in specs:
+        column_sql = ", ".join(f"`{col}`" for col, _, _ in columns)
+        conn.execute(f"CREATE TABLE `{name}` ({column_sql})")
+
+    start = datetime.date(2020, 1, 1)
+    batch = []
+    for row_id in range(1, sales_rows + 1):
+        batch.append((
+            row_id,
+            (start + datetime.timedelta(days=row_id % 1500)).isoformat(),
+            _PROVINCES[row_id % len(_PROVINCES)],
+            _PRODUCTS[(row_id * 7) % len(_PRODUCTS)],
+            round(rng.uniform(10, 5000), 2),
+            rng.randint(1, 50),
+        ))
+        if len(batch) >= 50000:
+            conn.executemany("INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?)", batch)
+            batch = []
+    if batch:
+        conn.executemany("INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?)", batch)
+
+    # tables ອື່ນມີຂໍ້ມູນເລັກນ້ອຍ (ພຽງພໍສຳລັບ EXPLAIN/ຕົວຢ່າງຄ່າ)
+    for name, columns, _ in specs[1:]:
+        placeholders = ", ".join("?" for _ in columns)
+        conn.executemany(
+            f"INSERT INTO `{name}` VALUES ({placeholders})",
+            [tuple(row_id if i == 0 else f"{name}-{row_id}" for i in range(len(columns))) for row_id in range(1, 11)],
+        )
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, path)
@@ -0,0 +1,148 @@
+"""
+async_nodes.py - Async variants ຂອງ Nodes ໃນ nodes.py
+
+- LLM calls ໃຊ້ ainvoke (ບໍ່ບລັອກ event loop ໃນລະຫວ່າງລໍຖ້າ Groq)
+- ງານທີ່ບລັອກ (MariaDB, SQLite cache, ຂຽນ file, pandas) ຖືກສົ່ງໄປ thread pool
+  ດ້ວຍ asyncio.to_thread ເພາະ MariaDB Connector/Python ບໍ່ມີ async API
+
+Logic ທັງໝົດ (cache, parse, template) ໃຊ້ຮ່ວມກັບ sync nodes, ຈຶ່ງໃຫ້ຜົນລັບຄືກັນ.
+"""
+
+import asyncio
+import json
+import time
+
+from loguru import logger
+
+from src.Agent.state import AgentState
+from src.Agent.nodes import (
+    CHART_AGENT_PROMPT,
+    CHART_ANALYSIS_PROMPT,
+    REPAIR_SQL_PROMPT,
+    SQL_AGENT_PROMPT,
+    _chart_analysis_inputs,
+    _chart_llm,
+    _fallback_analysis,
+    _parse_sql_response,
+    _prepare_chart,
+    _prepare_sql,
+    _repair_inputs,
+    _repair_route,
+    _repair_update,
+    _retry_generation,
+    _route_sql,
+    _sql_error,
+    _sql_inputs,
+    _sql_update,
+    _write_template_chart,
+    _write_tool_call_chart,
+    execute_sql_node,
+    get_schema_node,
+    select_tables_node,
+    summarize_result_node,
+)
+from src.Model_Provider.llm_config import get_router_llm
+from src.Model_Provider.model_router import RoutingDecision, get_model_router, large_model
+
+
+async def aget_schema_node(state: AgentState) -> dict:
+    return await asyncio.to_thread(get_schema_node, state)
+
+
+async def aselect_tables_node(state: AgentState) -> dict:
+    return await asyncio.to_thread(select_tables_node, state)
+
+
+async def _ainvoke_sql_llm(decision: RoutingDecision, prompt, inputs: dict) -> str:
+    started = time.perf_counter()
+    sql_script = ""
+    try:
+        llm = get_router_llm(model_name=decision.model_name, temperature=0.0)
+        response = await (prompt | llm).ainvoke(inputs)
+        sql_script = _parse_sql_response(response.content)
+        return sql_script
+    finally:
+        get_model_router().record_call(
+            decision.model_name, (time.perf_counter() - started) * 1000, ok=bool(sql_script)
+        )
+
+
+async def asql_agent_node(state: AgentState) -> dict:
+    logger.info("🤖 Generating SQL (async, JSON Mode)...")
+
+    ready, schema_fingerprint = await asyncio.to_thread(_prepare_sql, state)
+    if ready:
+        return ready
+
+    try:
+        decision = await asyncio.to_thread(_route_sql, state)
+        inputs = _sql_inputs(state)
+        try:
+            sql_script, error = await _ainvoke_sql_llm(decision, SQL_AGENT_PROMPT, inputs), None
+        except Exception as e:
+            sql_script, error = "", e
+        if not sql_script:
+            escalated = _retry_generation(decision, error)
+            if escalated is not None:
+                decision = escalated
+                sql_script = await _ainvoke_sql_llm(decision, SQL_AGENT_PROMPT, inputs)
+
+        return await asyncio.to_thread(_sql_update, state, schema_fingerprint, sql_script, decision.model_name)
+
+    except Exception as e:
+        return _sql_error(e)
+
+
+async def aexecute_sql_node(state: AgentState) -> dict:
+    return await asyncio.to_thread(execute_sql_node, state)
+
+
+async def arepair_sql_node(state: AgentState) -> dict:
+    attempt = state.get("sql_repair_attempts", 0) + 1
+    logger.info(f"🔧 Repairing SQL (async, attempt {attempt})...")
+
+    decision = _repair_route(state)
+    try:
+        inputs = await asyncio.to_thread(_repair_inputs, state)
+        repaired_sql = await _ainvoke_sql_llm(decision, REPAIR_SQL_PROMPT, inputs)
+    except Exception as e:
+        logger.error(f"❌ Error repairing SQL: {e}")
+        repaired_sql = ""
+
+    return await asyncio.to_thread(_repair_update, state, repaired_sql, decision.model_name)
+
+
+async def asummarize_result_node(state: AgentState) -> dict:
+    return await asyncio.to_thread(summarize_result_node, state)
+
+
+async def achart_generation_node(state: AgentState) -> dict:
+    logger.info("🎨 Executing Chart Agent Node (async): Generating HTML/JS...")
+
+    question = state.get("question", "")
+    ready_report, spec, result_summary, artifact_key = await asyncio.to_thread(_prepare_chart, state)
+    if ready_report:
+        return ready_report
+
+    if spec:
+        try:
+            llm = get_router_llm(model_name=large_model(), temperature=0.1, purpose="chart")
+            chain = CHART_ANALYSIS_PROMPT | llm
+            response = await chain.ainvoke(_chart_analysis_inputs(question, spec, result_summary))
+            analysis_text = response.content
+        except Exception as e:
+            analysis_text = _fallback_analysis(spec, e)
+        return await asyncio.to_thread(_write_template_chart, question, spec, analysis_text, artifact_key)
+
+    logger.info("🤖 Unusual result shape, asking LLM to generate the full chart HTML...")
+    try:
+        chart_generator = CHART_AGENT_PROMPT | _chart_llm()
+        response = await chart_generator.ainvoke({
+            "question": question,
+            "result_summary": json.dumps(result_summary, ensure_ascii=False)
+        })
+        return await asyncio.to_thread(_write_tool_call_chart, response, state["sql_result"], artifact_key)
+
+    except Exception as e:
+        logger.error(f"❌ Error in Chart Agent Node: {e}")
+        return {"final_report": f"Error: Chart Agent failed with exception: {str(e)}"}
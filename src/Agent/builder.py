@@ -2,46 +2,212 @@
 builder.py - ສ້າງ LangGraph Workflow
 
 ໂຄງສ້າງ Workflow:
-1. get_schema → sql_agent → execute_sql → END
+1. get_schema → select_tables → sql_agent → execute_sql → summarize_result → chart_agent → END
+2. execute_sql ທີ່ Error ແບບແກ້ໄດ້ → repair_sql → execute_sql (ບໍ່ເກີນ SQL_REPAIR_MAX_ATTEMPTS ຄັ້ງ)
+
+get_agent_app(async_nodes=True) ສ້າງ graph ດຽວກັນດ້ວຍ async nodes ສຳລັບ ainvoke/astream
+(worker ດຽວຮັບໄດ້ຫຼາຍຄຳຖາມພ້ອມກັນ ໂດຍບໍ່ຕ້ອງມີ thread ຕໍ່ request).
+get_step_app(SQL_STEPS / CHART_STEPS) ສ້າງ subgraph ສຳລັບ stream ທີລະຂັ້ນ.
+get_session_app() ແມ່ນ Pipeline ເຕັມທີ່ມີ Checkpointer (SqliteSaver) ແລະ ຢຸດລໍຖ້າຜູ້ໃຊ້ອະນຸມັດ
+ກ່ອນ approve_sql (node ເປົ່າລະຫວ່າງ sql_agent → execute_sql) ແລະ ກ່ອນ summarize_result
+(UI resume ດ້ວຍ thread_id ຂອງ session); repair_sql → execute_sql ບໍ່ຢຸດ ຈຶ່ງ resume ຄັ້ງດຽວ
+ແລ່ນ repair loop ຈົນຈົບ. sql_result ໃນ State ຂອງມັນເກັບພຽງ preview + spill_path.
+
+Graph ແຕ່ລະແບບຖືກ compile ຄັ້ງດຽວຕໍ່ Process ແລ້ວໃຊ້ຊ້ຳ.
 """
 
+import functools
+import threading
+
 from langgraph.graph import StateGraph, END
 from loguru import logger
 
+from src.Agent.checkpointer import get_checkpointer
 from src.Agent.state import AgentState
-from src.Agent.nodes import get_schema_node, sql_agent_node, execute_sql_node, chart_generation_node
+from src.DB.result_set import spill_preview
+from src.Tracing.tracer import traced_node
+from src.Agent.nodes import (
+    get_schema_node,
+    select_tables_node,
+    sql_agent_node,
+    execute_sql_node,
+    summarize_result_node,
+    chart_generation_node,
+    repair_sql_node,
+    route_after_execute,
+    route_after_repair,
+)
+from src.Agent.async_nodes import (
+    aget_schema_node,
+    aselect_tables_node,
+    asql_agent_node,
+    aexecute_sql_node,
+    asummarize_result_node,
+    achart_generation_node,
+    arepair_sql_node,
+)
+
+
+# ລຳດັບຂອງ Nodes ໃນ Pipeline: name → (sync node, async node)
+PIPELINE = {
+    "get_schema": (get_schema_node, aget_schema_node),
+    "select_tables": (select_tables_node, aselect_tables_node),
+    "sql_agent": (sql_agent_node, asql_agent_node),
+    "execute_sql": (execute_sql_node, aexecute_sql_node),
+    "summarize_result": (summarize_result_node, asummarize_result_node),
+    "chart_agent": (chart_generation_node, achart_generation_node),
+}
+
+# Node ທີ່ບໍ່ຢູ່ໃນລຳດັບຫຼັກ: ຖືກເອີ້ນຜ່ານ conditional edge ຫຼັງ execute_sql ເທົ່ານັ້ນ
+REPAIR_NODE = ("repair_sql", (repair_sql_node, arepair_sql_node))
+
+# Step subgraphs (stream ທີລະຂັ້ນ ໂດຍບໍ່ມີ Checkpointer)
+SQL_STEPS = ("get_schema", "select_tables", "sql_agent")
+CHART_STEPS = ("summarize_result", "chart_agent")
+
+# Node ເປົ່າກ່ອນ execute_sql ໃນ Session graph: ຢຸດສະເພາະຕອນເຂົ້າ execute_sql ຄັ້ງທຳອິດ
+# (interrupt_before ທີ່ execute_sql ເອງຈະຢຸດທຸກຮອບຂອງ repair_sql → execute_sql ນຳ)
+APPROVAL_NODE = "approve_sql"
+
+# ຈຸດທີ່ Session graph ຢຸດລໍຖ້າຜູ້ໃຊ້ (ກວດ SQL ກ່ອນ execute, ກວດຕາຕະລາງກ່ອນສ້າງ Chart)
+APPROVAL_POINTS = (APPROVAL_NODE, "summarize_result")
+
+_compiled: dict[tuple, object] = {}
+_compiled_lock = threading.Lock()
 
 
-def _build_workflow():
+def _compact_result(node):
+    """
+    ຫໍ່ execute_sql ຂອງ graph ທີ່ມີ Checkpointer ໃຫ້ສົ່ງ sql_result ທີ່ spill ແລ້ວ (preview + spill_path)
+    """
+    @functools.wraps(node)
+    def wrapper(state, *args, **kwargs):
+        update = node(state, *args, **kwargs)
+        if isinstance(update, dict) and update.get("sql_result"):
+            update = {**update, "sql_result": spill_preview(update["sql_result"])}
+        return update
+    return wrapper
+
+
+def _approve_sql_node(state: AgentState) -> dict:
+    """
+    ຈຸດອະນຸມັດ SQL (ບໍ່ປ່ຽນ State): ຜູ້ໃຊ້ກົດ Execute → resume ຜ່ານ node ນີ້ໄປ execute_sql
+    """
+    return {}
+
+
+def _build_workflow(async_nodes: bool = False, steps=None, checkpointed: bool = False):
     """
     ສ້າງ workflow graph
+
+    Args:
+        async_nodes: ໃຊ້ async variants (ainvoke + thread pool ສຳລັບ DB)
+        steps: ຊື່ nodes ທີ່ຕ້ອງການ (ຕາມລຳດັບ), None = Pipeline ເຕັມ
+        checkpointed: State ຖືກບັນທຶກລົງ Checkpointer (sql_result ເກັບພຽງ preview + spill_path,
+            ມີ approve_sql ກ່ອນ execute_sql ໃຫ້ interrupt)
     """
+    steps = list(steps or PIPELINE)
+    if checkpointed and "execute_sql" in steps:
+        steps.insert(steps.index("execute_sql"), APPROVAL_NODE)
     workflow = StateGraph(AgentState)
     
     # ເພີ່ມ Nodes
-    workflow.add_node("get_schema", get_schema_node)
-    workflow.add_node("sql_agent", sql_agent_node)
-    workflow.add_node("execute_sql", execute_sql_node)
-    workflow.add_node("chart_agent", chart_generation_node)
+    for name in steps:
+        if name == APPROVAL_NODE:
+            workflow.add_node(name, _approve_sql_node)
+            continue
+        sync_node, async_node = PIPELINE[name]
+        node = async_node if async_nodes else sync_node
+        if checkpointed and name == "execute_sql" and not async_nodes:
+            node = _compact_result(node)
+        # ທຸກ node ຖືກຫໍ່ດ້ວຍ span (wall time + metrics ຂອງ node)
+        workflow.add_node(name, traced_node(name, node))
     
     # ຕັ້ງຄ່າ Entry Point
-    workflow.set_entry_point("get_schema")
+    workflow.set_entry_point(steps[0])
     
     # Edges
-    workflow.add_edge("get_schema", "sql_agent")
-    workflow.add_edge("sql_agent", "execute_sql")
-    workflow.add_edge("execute_sql", "chart_agent")
-    workflow.add_edge("chart_agent", END)
+    for current, following in zip(steps, steps[1:] + [END]):
+        if current == "execute_sql":
+            _add_repair_loop(workflow, following, async_nodes)
+        else:
+            workflow.add_edge(current, following)
     
     logger.info("✅ Workflow graph built successfully")
     
     return workflow
 
 
-def get_agent_app():
+def _add_repair_loop(workflow: StateGraph, following: str, async_nodes: bool):
     """
-    ດຶງ agent app
+    execute_sql → (Error ແກ້ໄດ້) repair_sql → execute_sql, ບໍ່ດັ່ງນັ້ນ → following
     """
-    workflow = _build_workflow()
-    app = workflow.compile()
+    name, (sync_node, async_node) = REPAIR_NODE
+    workflow.add_node(name, traced_node(name, async_node if async_nodes else sync_node))
+    workflow.add_conditional_edges(
+        "execute_sql",
+        route_after_execute,
+        {"repair_sql": name, "continue": following},
+    )
+    workflow.add_conditional_edges(
+        name,
+        route_after_repair,
+        {"execute_sql": "execute_sql", "continue": following},
+    )
+
+
+def _get_compiled(key: tuple, compile_fn):
+    """
+    Compile graph ຄັ້ງດຽວຕໍ່ key ແລ້ວໃຊ້ຊ້ຳ (compiled graph ບໍ່ມີ state ຂອງ request ຈຶ່ງໃຊ້ຮ່ວມກັນໄດ້)
+    """
+    app = _compiled.get(key)
+    if app is None:
+        with _compiled_lock:
+            app = _compiled.get(key)
+            if app is None:
+                app = compile_fn()
+                _compiled[key] = app
     return app
+
+
+def get_agent_app(async_nodes: bool = False):
+    """
+    ດຶງ agent app
+
+    Args:
+        async_nodes: True = graph ສຳລັບ await app.ainvoke(...) / app.astream(...)
+    """
+    return _get_compiled(
+        ("pipeline", async_nodes),
+        lambda: _build_workflow(async_nodes=async_nodes).compile(),
+    )
+
+
+def get_step_app(steps, async_nodes: bool = False):
+    """
+    ດຶງ graph ສະເພາະບາງຂັ້ນຕອນ (ເຊັ່ນ SQL_STEPS, CHART_STEPS)
+    """
+    steps = tuple(steps)
+    return _get_compiled(
+        ("steps", steps, async_nodes),
+        lambda: _build_workflow(async_nodes=async_nodes, steps=steps).compile(),
+    )
+
+
+def get_session_app():
+    """
+    ດຶງ Pipeline ເຕັມທີ່ບັນທຶກ State ລົງ Checkpointer ຕາມ thread_id ແລະ ຢຸດກ່ອນ APPROVAL_POINTS
+
+    Example:
+        config = thread_config(thread_id)
+        app.invoke({"question": q, "messages": []}, config)  # → ຢຸດກ່ອນ approve_sql
+        app.invoke(None, config)                             # → execute_sql (+ repair loop) → ຢຸດກ່ອນ summarize_result
+        app.invoke(None, config)                             # → Chart
+    """
+    return _get_compiled(
+        ("session",),
+        lambda: _build_workflow(checkpointed=True).compile(
+            checkpointer=get_checkpointer(),
+            interrupt_before=list(APPROVAL_POINTS),
+        ),
+    )
@@ -0,0 +1,341 @@
+"""
+chart_engine.py - ສ້າງ Chart HTML ຈາກ Template ໂດຍບໍ່ຕ້ອງໃຫ້ LLM ຂຽນ Code
+
+ເລືອກປະເພດ Chart ຈາກປະເພດ ແລະ ຈຳນວນຄ່າທີ່ແຕກຕ່າງ (cardinality) ຂອງ columns:
+- Column ເວລາ (date/datetime/ປີ/ເດືອນ) + ຕົວເລກ → Line Chart
+- Category ≤ 6 ແຖວ + ຕົວເລກ 1 column (ບໍ່ຕິດລົບ) → Pie (Doughnut) Chart
+- Category ≤ 15 ແຖວ → Bar Chart
+- Category > 15 ແຖວ → Horizontal Bar Chart
+- ຮູບແບບອື່ນໆ → ໃຫ້ LLM ສ້າງ HTML ເອງ (fallback)
+"""
+
+import html
+import json
+import re
+from dataclasses import dataclass, field
+from string import Template
+
+import pandas as pd
+
+from src.DB.result_set import iter_rows, result_to_dataframe
+
+
+PIE_MAX_ROWS = 6
+BAR_MAX_ROWS = 15
+MAX_CATEGORIES = 2000
+MAX_SERIES = 6
+
+# ຄຳໃນຊື່ column ທີ່ບົ່ງບອກວ່າເປັນເວລາ (ຕ້ອງເປັນຄຳເຕັມ: sale_date, orderMonth ແຕ່ບໍ່ແມ່ນ runtime, update_count)
+_TIME_WORDS = {"date", "datetime", "time", "timestamp", "year", "month", "week", "day", "period"}
+# ພາສາລາວບໍ່ມີຕົວແຍກຄຳ → ກວດແບບ substring
+_LAO_TIME_RE = re.compile(r"ປີ|ເດືອນ|ວັນທີ|ອາທິດ")
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+_NAME_SPLIT_RE = re.compile(r"[^0-9a-z]+")
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}(-\d{2})?([T ]\d{2}:\d{2}(:\d{2})?.*)?$")
+
+PALETTE = [
+    "#667eea", "#764ba2", "#00c9a7", "#ff6b6b", "#ffa94d",
+    "#4dabf7", "#f06595", "#94d82d", "#845ef7", "#20c997",
+]
+
+
+@dataclass
+class ChartSpec:
+    """
+    ລາຍລະອຽດ Chart ທີ່ເລືອກໄດ້ຈາກ sql_result
+    """
+    chart_type: str  # "bar", "horizontal_bar", "line", "pie"
+    label_column: str
+    value_columns: list[str]
+    labels: list = field(default_factory=list)
+    series: dict[str, list] = field(default_factory=dict)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.labels)
+
+
+def _has_time_name(name: str) -> bool:
+    tokens = _NAME_SPLIT_RE.split(_CAMEL_RE.sub(r"\1_\2", name).lower())
+    return bool(_TIME_WORDS.intersection(tokens)) or bool(_LAO_TIME_RE.search(name))
+
+
+def _is_temporal(name: str, values: pd.Series) -> bool:
+    non_null = values.dropna()
+    if non_null.empty:
+        return False
+    if pd.api.types.is_datetime64_any_dtype(non_null):
+        return True
+    if pd.api.types.is_integer_dtype(non_null):
+        # ເຊັ່ນ: year = 2023, month = 1..12
+        return _has_time_name(name)
+    if pd.api.types.is_object_dtype(non_null) or pd.api.types.is_string_dtype(non_null):
+        sample = non_null.astype(str).head(20)
+        return bool(sample.map(lambda v: bool(_ISO_DATE_RE.match(v))).all())
+    return False
+
+
+def _is_numeric(values: pd.Series) -> bool:
+    non_null = values.dropna()
+    if non_null.empty or pd.api.types.is_bool_dtype(non_null):
+        return False
+    if pd.api.types.is_numeric_dtype(non_null):
+        return True
+    # Decimal ຈາກ MariaDB ມາເປັນ object
+    converted = pd.to_numeric(non_null, errors="coerce")
+    return bool(converted.notna().all())
+
+
+def classify_columns(df: pd.DataFrame) -> dict[str, str]:
+    """
+    ຈັດປະເພດ columns: "temporal", "numeric" ຫຼື "categorical"
+    """
+    kinds = {}
+    for col in df.columns:
+        if _is_temporal(col, df[col]):
+            kinds[col] = "temporal"
+        elif _is_numeric(df[col]):
+            kinds[col] = "numeric"
+        else:
+            kinds[col] = "categorical"
+    return kinds
+
+
+def infer_chart_spec(sql_result: dict) -> ChartSpec | None:
+    """
+    ເລືອກປະເພດ Chart ຈາກ columns ຂອງ sql_result
+
+    Args:
+        sql_result: ຜົນລັບຈາກ execute_sql_node
+
+    Returns:
+        ChartSpec | None: None ຖ້າຮູບແບບຂໍ້ມູນບໍ່ເໝາະກັບ Template (ໃຫ້ໃຊ້ LLM ແທນ)
+    """
+    columns = sql_result.get("columns") or []
+    if len(columns) < 2 or not sql_result.get("row_count"):
+        return None
+
+    df = result_to_dataframe(sql_result)
+
+    kinds = classify_columns(df)
+    temporal = [c for c in columns if kinds[c] == "temporal"]
+    numeric = [c for c in columns if kinds[c] == "numeric"]
+    categorical = [c for c in columns if kinds[c] == "categorical"]
+
+    # ຕ້ອງມີ label 1 column (ເວລາ ຫຼື category) ແລະ ຄ່າຕົວເລກຢ່າງໜ້ອຍ 1 column
+    if temporal:
+        label_column = temporal[0]
+        if len(temporal) > 1 or categorical:
+            return None
+    elif len(categorical) == 1:
+        label_column = categorical[0]
+    elif not categorical and len(numeric) >= 2:
+        # ເຊັ່ນ: id/ລະຫັດ + ຄ່າ → ໃຊ້ column ທຳອິດເປັນ label
+        label_column = numeric.pop(0)
+    else:
+        return None
+
+    value_columns = numeric[:MAX_SERIES]
+    if not value_columns or len(numeric) > MAX_SERIES:
+        return None
+
+    if temporal:
+        df = df.sort_values(label_column, kind="stable")
+        chart_type = "line"
+    else:
+        if df[label_column].nunique(dropna=False) != len(df) or len(df) > MAX_CATEGORIES:
+            # label ຊ້ຳກັນ ຫຼື ຫຼາຍເກີນໄປ → ບໍ່ແມ່ນຮູບແບບ category ທຳມະດາ
+            return None
+        values = pd.to_numeric(df[value_columns[0]], errors="coerce")
+        if len(value_columns) == 1 and len(df) <= PIE_MAX_ROWS and (values.fillna(0) >= 0).all():
+            chart_type = "pie"
+        elif len(df) > BAR_MAX_ROWS:
+            chart_type = "horizontal_bar"
+        else:
+            chart_type = "bar"
+
+    labels = df[label_column].astype(str).tolist()
+    series = {
+        col: [None if pd.isna(v) else float(v) for v in pd.to_numeric(df[col], errors="coerce")]
+        for col in value_columns
+    }
+    return ChartSpec(
+        chart_type=chart_type,
+        label_column=label_column,
+        value_columns=value_columns,
+        labels=labels,
+        series=series,
+    )
+
+
+_HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="lo">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>$title</title>
+<style>
+    @import url('https://fonts.cdnfonts.com/css/phetsarath-ot');
+    * { box-sizing: border-box; }
+    body {
+        margin: 0;
+        padding: 24px;
+        font-family: 'Phetsarath OT', sans-serif;
+        background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+        color: #e9ecef;
+    }
+    .card {
+        background: rgba(255, 255, 255, 0.05);
+        border: 1px solid rgba(255, 255, 255, 0.1);
+        border-radius: 16px;
+        padding: 20px;
+        margin-bottom: 20px;
+    }
+    h1 { font-size: 22px; margin: 0 0 8px 0; color: #a8b4ff; }
+    .meta { font-size: 13px; color: #adb5bd; }
+    .chart-container {
+        position: relative;
+        height: 600px;
+        overflow: auto;
+    }
+    .chart-inner { position: relative; height: ${canvas_height}px; min-width: 100%; }
+    .analysis p { line-height: 1.8; margin: 0 0 10px 0; }
+</style>
+</head>
+<body>
+<div class="card">
+    <h1>$title</h1>
+    <div class="meta">$meta</div>
+</div>
+<div class="card chart-container">
+    <div class="chart-inner"><canvas id="chart"></canvas></div>
+</div>
+<div class="card analysis">
+    <h1>📈 ບົດວິເຄາະ</h1>
+    $analysis
+</div>
+<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+<script id="chart-data" type="application/json">$chart_data</script>
+<script>
+    const spec = JSON.parse(document.getElementById('chart-data').textContent);
+    Chart.defaults.font.family = "'Phetsarath OT', sans-serif";
+    Chart.defaults.color = '#e9ecef';
+    const isPie = spec.type === 'doughnut';
+    new Chart(document.getElementById('chart'), {
+        type: spec.type,
+        data: { labels: spec.labels, datasets: spec.datasets },
+        options: {
+            indexAxis: spec.indexAxis,
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: { legend: { display: isPie || spec.datasets.length > 1 } },
+            scales: isPie ? {} : {
+                x: { grid: { color: 'rgba(255,255,255,0.08)' } },
+                y: { grid: { color: 'rgba(255,255,255,0.08)' } }
+            }
+        }
+    });
+</script>
+</body>
+</html>
+""")
+
+
+def _chart_payload(spec: ChartSpec) -> dict:
+    if spec.chart_type == "pie":
+        values = spec.series[spec.value_columns[0]]
+        datasets = [{
+            "label": spec.value_columns[0],
+            "data": values,
+            "backgroundColor": [PALETTE[i % len(PALETTE)] for i in range(len(values))],
+        }]
+        return {"type": "doughnut", "labels": spec.labels, "datasets": datasets, "indexAxis": "x"}
+
+    datasets = []
+    for i, col in enumerate(spec.value_columns):
+        color = PALETTE[i % len(PALETTE)]
+        dataset = {"label": col, "data": spec.series[col], "backgroundColor": color, "borderColor": color}
+        if spec.chart_type == "line":
+            dataset.update({"fill": False, "tension": 0.3, "pointRadius": 2 if spec.row_count > 100 else 4})
+        else:
+            dataset["borderRadius"] = 6
+        datasets.append(dataset)
+
+    return {
+        "type": "line" if spec.chart_type == "line" else "bar",
+        "labels": spec.labels,
+        "datasets": datasets,
+        "indexAxis": "y" if spec.chart_type == "horizontal_bar" else "x",
+    }
+
+
+def _analysis_html(analysis_text: str) -> str:
+    paragraphs = [p.strip() for p in (analysis_text or "").split("\n") if p.strip()]
+    return "\n    ".join(f"<p>{html.escape(p)}</p>" for p in paragraphs)
+
+
+def render_chart_html(spec: ChartSpec, question: str, analysis_text: str) -> str:
+    """
+    ສ້າງ HTML ທີ່ສົມບູນ (Chart.js + Font Phetsarath OT + Scroll Container)
+
+    Args:
+        spec: ChartSpec ຈາກ infer_chart_spec
+        question: ຄຳຖາມຕົ້ນສະບັບ (ໃຊ້ເປັນຫົວຂໍ້)
+        analysis_text: ບົດວິເຄາະສັ້ນໆ (plain text)
+
+    Returns:
+        str: HTML code
+    """
+    if spec.chart_type == "horizontal_bar":
+        # ໃຫ້ແຕ່ລະແຖວສູງ ~28px, Container ຈະ scroll ເມື່ອເກີນ 600px
+        canvas_height = max(560, spec.row_count * 28)
+    else:
+        canvas_height = 560
+
+    chart_data = _script_safe_json(_chart_payload(spec))
+
+    return _HTML_TEMPLATE.substitute(
+        title=html.escape(question or "Chart"),
+        meta=html.escape(f"{spec.row_count} ແຖວ · {spec.label_column} → {', '.join(spec.value_columns)}"),
+        canvas_height=canvas_height,
+        analysis=_analysis_html(analysis_text),
+        chart_data=chart_data,
+    )
+
+
+DATA_PLACEHOLDER = "__CHART_DATA__"
+
+
+def _script_safe_json(data) -> str:
+    # ປ້ອງກັນ </script> ໃນຂໍ້ມູນ
+    return json.dumps(data, ensure_ascii=False, default=str).replace("</", "<\\/")
+
+
+def inject_chart_data(content: str, sql_result: dict) -> str:
+    """
+    ໃສ່ຂໍ້ມູນເຕັມຂອງ sql_result ເຂົ້າ HTML ທີ່ LLM ສ້າງ ເປັນ JSON blob
+    (<script id="chart-data" type="application/json">) ແທນທີ່ LLM ຈະຂຽນຂໍ້ມູນຄືນເອງ
+
+    Args:
+        content: HTML ຈາກ LLM (ຄວນມີ __CHART_DATA__ placeholder)
+        sql_result: ຜົນລັບຈາກ execute_sql_node
+
+    Returns:
+        str: HTML ທີ່ມີຂໍ້ມູນເຕັມ
+    """
+    columns = sql_result.get("columns") or []
+    data = {
+        "columns": columns,
+        "rows": [list(row) for row in iter_rows(sql_result)],
+    }
+    data_json = _script_safe_json(data)
+
+    if DATA_PLACEHOLDER in content:
+        return content.replace(DATA_PLACEHOLDER, data_json)
+
+    blob = f'<script id="chart-data" type="application/json">{data_json}</script>\n'
+    if "<script" in content:
+        # ຕ້ອງຢູ່ກ່ອນ script ທີ່ອ່ານຂໍ້ມູນ
+        index = content.index("<script")
+        return content[:index] + blob + content[index:]
+    return content + blob
@@ -0,0 +1,97 @@
+"""
+checkpointer.py - Checkpointer (SqliteSaver) ຂອງ LangGraph ສຳລັບ Session ໃນ UI
+
+State ຂອງແຕ່ລະ Session ຖືກບັນທຶກຫຼັງທຸກ node ຕາມ thread_id ເພື່ອໃຫ້ຂັ້ນຕໍ່ໄປ
+(Execute SQL, Generate Chart) resume ຈາກ State ທີ່ບັນທຶກໄວ້ໄດ້ ໂດຍບໍ່ຕ້ອງດຶງ Schema
+ຫຼື ສ້າງ SQL ໃໝ່ (ລວມທັງຫຼັງ Streamlit rerun ຫຼື reload ໜ້າເວັບ)
+
+Threads ທີ່ບໍ່ໄດ້ໃຊ້ເກີນ CHECKPOINT_TTL ວິນາທີຖືກລຶບຕອນເປີດ Checkpointer. TTL ບໍ່ເກີນ
+RESULT_SPILL_TTL ເພາະ State ເກັບພຽງ preview + spill_path ຂອງຜົນລັບ (ເບິ່ງ spill_preview)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+from loguru import logger
+
+from src.DB.result_set import spill_ttl
+
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    ".cache",
+    "checkpoints.sqlite3",
+)
+
+
+def thread_config(thread_id: str) -> dict:
+    """
+    Config ຂອງ LangGraph ສຳລັບ thread (session) ໜຶ່ງ
+    """
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def checkpoint_ttl() -> float:
+    """
+    ອາຍຸຂອງ threads (CHECKPOINT_TTL ວິນາທີ) ບໍ່ເກີນອາຍຸຂອງ spill files
+    """
+    return min(float(os.getenv("CHECKPOINT_TTL", str(spill_ttl()))), spill_ttl())
+
+
+def _cleanup_expired_threads(saver: SqliteSaver, conn: sqlite3.Connection):
+    ttl = checkpoint_ttl()
+    cutoff = time.time() - ttl
+    # ຕາຕະລາງ checkpoints ບໍ່ມີ column ເວລາ → ອ່ານ ts ຈາກ checkpoint ລ່າສຸດຂອງແຕ່ລະ thread
+    expired = []
+    for (thread_id,) in conn.execute("SELECT DISTINCT thread_id FROM checkpoints").fetchall():
+        latest = saver.get_tuple(thread_config(thread_id))
+        created = latest.checkpoint.get("ts") if latest else None
+        if created and _iso_to_epoch(created) < cutoff:
+            expired.append(thread_id)
+    for thread_id in expired:
+        saver.delete_thread(thread_id)
+    if expired:
+        logger.info(f"🧹 Removed {len(expired)} expired checkpoint threads")
+
+
+def _iso_to_epoch(value: str) -> float:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return time.time()
+
+
+_checkpointer: SqliteSaver | None = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> SqliteSaver:
+    """
+    ດຶງ SqliteSaver ທີ່ໃຊ້ຮ່ວມກັນທັງ Process (path ຈາກ CHECKPOINT_PATH)
+
+    Returns:
+        SqliteSaver: Checkpointer instance
+    """
+    global _checkpointer
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None:
+                path = os.getenv("CHECKPOINT_PATH", DEFAULT_CHECKPOINT_PATH)
+                if path != ":memory:":
+                    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                # Streamlit script thread ແລະ background thread ຂອງ Execute SQL ໃຊ້ connection ຮ່ວມກັນ
+                # (SqliteSaver ມີ lock ຂອງມັນເອງ)
+                conn = sqlite3.connect(path, check_same_thread=False)
+                saver = SqliteSaver(conn)
+                saver.setup()
+                try:
+                    _cleanup_expired_threads(saver, conn)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not clean up old checkpoints: {e}")
+                _checkpointer = saver
+                logger.info(f"💾 Checkpointer ready: {path}")
+    return _checkpointer
@@ -1,77 +1,104 @@
+import json
+import os
+import time
+import uuid
 from loguru import logger
 from langchain_core.prompts import ChatPromptTemplate
 from src.Agent.state import AgentState
-from src.Agent.router_schema import RouterSchema
-from src.DB.db_config import get_db_connection
+from src.DB.db_config import get_db_pool, get_pooled_connection
+from src.DB.result_set import empty_result, fetch_columnar
+from src.DB.query_guard import QueryRejected, guard_query, register_query, unregister_query
+from src.DB.schema_catalog import get_schema_catalog
+from src.DB.sql_validator import SQLValidationError, ValidatedQuery, validate_sql
 from src.Model_Provider.llm_config import get_router_llm
-from src.Agent.tools import FileGenerationSchema, write_chart_file
+from src.Model_Provider.model_router import TIER_FAST, RoutingDecision, get_model_router, large_model
+from src.Agent.tools import FileGenerationSchema
+from src.Agent.chart_engine import ChartSpec, infer_chart_spec, inject_chart_data, render_chart_html
+from src.Agent.result_summary import estimate_tokens, summarize_result
+from src.Agent.table_selector import get_schema_index
+from src.Cache.sql_cache import get_sql_cache
+from src.Cache.semantic_cache import get_semantic_cache
+from src.Cache.result_cache import get_result_cache, result_cache_enabled
+from src.Cache.artifact_store import ChartArtifact, chart_artifact_key, get_artifact_store
+from src.Tracing.tracer import add_metric, set_attribute
+
+
+# Namespace ຂອງ SQL cache: SQL ຈາກທຸກ tier ຂອງ ModelRouter ໃຊ້ Cache ຮ່ວມກັນ
+# (SQL ທີ່ execute ບໍ່ຜ່ານຖືກລຶບອອກ ຈຶ່ງເຫຼືອແຕ່ SQL ທີ່ໃຊ້ໄດ້)
+SQL_MODEL_NAME = "moonshotai/kimi-k2-instruct-0905"
+
+
+def invalidate_cached_sql(question: str, schema_fingerprint: str, sql_script: str):
+    """
+    ລຶບ SQL ທີ່ໃຊ້ບໍ່ໄດ້ອອກຈາກທັງ SQL cache ແລະ semantic cache
+    """
+    try:
+        get_sql_cache().invalidate(question, schema_fingerprint, SQL_MODEL_NAME)
+        get_semantic_cache().remove_sql(sql_script, schema_fingerprint, SQL_MODEL_NAME)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not invalidate cached SQL: {e}")
 
 
 def get_schema_node(state: AgentState) -> dict:
     """
     Node ສຳລັບດຶງຂໍ້ມູນ tables ທັງໝົດຈາກ schema test_visualization
     (ບໍ່ລວມ records - ຈະໃຫ້ AI execute SQL ເອງ)
+
+    ໃຊ້ SchemaCatalog ທີ່ Cache ໄວ້ທັງ Process, ຈຶ່ງແຕະ DB ສະເພາະເມື່ອ Schema ອາດຈະປ່ຽນ.
     """
     logger.info("📊 Executing Get Schema Node: Fetching all tables from test_visualization...")
     
-    connection = None
-    result_text = ""
-    
     try:
-        # 1. ເຊື່ອມຕໍ່ Database
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        # 2. ດຶງລາຍຊື່ tables ທັງໝົດຈາກ schema test_visualization
-        cursor.execute("""
-            SELECT TABLE_NAME 
-            FROM INFORMATION_SCHEMA.TABLES 
-            WHERE TABLE_SCHEMA = 'test_visualization'
-        """)
-        tables = cursor.fetchall()
+        snapshot = get_schema_catalog().get_snapshot()
         
-        if not tables:
-            result_text = "ບໍ່ພົບ tables ໃນ schema test_visualization"
+        if not snapshot.tables:
+            result_text = f"ບໍ່ພົບ tables ໃນ schema {snapshot.schema_name}"
             logger.warning(result_text)
             return {"result_schema": result_text}
         
-        # 3. ວົນລູບດຶງ structure ຂອງແຕ່ລະ table (ບໍ່ດຶງ records)
-        result_text = f"=== Schema: test_visualization ===\n"
-        result_text += f"ຈຳນວນ Tables: {len(tables)}\n\n"
+        logger.success(f"✅ Schema fetched successfully: {len(snapshot.tables)} tables")
+        return {
+            "result_schema": snapshot.schema_text,
+            "schema_fingerprint": snapshot.fingerprint
+        }
         
-        for (table_name,) in tables:
-            result_text += f"--- Table: {table_name} ---\n"
-            
-            # ດຶງ columns ຂອງ table
-            cursor.execute(f"""
-                SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_KEY
-                FROM INFORMATION_SCHEMA.COLUMNS 
-                WHERE TABLE_SCHEMA = 'test_visualization' 
-                AND TABLE_NAME = '{table_name}'
-            """)
-            columns = cursor.fetchall()
-            
-            result_text += "Columns:\n"
-            for col_name, data_type, is_nullable, col_key in columns:
-                key_info = f" [{col_key}]" if col_key else ""
-                null_info = "NULL" if is_nullable == "YES" else "NOT NULL"
-                result_text += f"  - {col_name}: {data_type} ({null_info}){key_info}\n"
-            
-            result_text += "\n"
+    except Exception as e:
+        logger.error(f"❌ Error fetching schema: {e}")
+        return {"result_schema": f"Error: {str(e)}"}
 
-            print("result_text: ", result_text)
-        
-        cursor.close()
-        connection.close()
+
+def select_tables_node(state: AgentState) -> dict:
+    """
+    Node ສຳລັບເລືອກສະເພາະ tables ທີ່ກ່ຽວຂ້ອງກັບຄຳຖາມ (top-k + FK neighbours)
+    ເພື່ອຫຼຸດ tokens ຂອງ Schema ໃນ Prompt ຂອງ SQL Agent
+    """
+    logger.info("🗂️ Selecting relevant tables for the question...")
+    
+    question = state.get("question", "")
+    if not question or not state.get("schema_fingerprint"):
+        return {}
+    
+    try:
+        snapshot = get_schema_catalog().get_snapshot()
+        selection = get_schema_index(snapshot).select(question)
         
-        logger.success(f"✅ Schema fetched successfully: {len(tables)} tables")
-        return {"result_schema": result_text}
+        if selection.fallback:
+            logger.info("🗂️ No confident table match, using the full schema")
+        else:
+            logger.success(
+                f"✅ Selected {len(selection.tables)}/{len(snapshot.tables)} tables "
+                f"({', '.join(selection.tables)}), saved ~{selection.tokens_saved} tokens"
+            )
+        return {
+            "result_schema": selection.schema_text,
+            "selected_tables": list(selection.tables),
+            "schema_tokens_saved": selection.tokens_saved,
+        }
         
     except Exception as e:
-        logger.error(f"❌ Error fetching schema: {e}")
-        if connection:
-            connection.close()
-        return {"result_schema": f"Error: {str(e)}"}
+        logger.error(f"❌ Error selecting tables: {e}")
+        # ໃຊ້ Schema ເຕັມທີ່ get_schema_node ສົ່ງມາ
+        return {}
 
 
 # ===========================
@@ -117,46 +144,175 @@ Format Output:
 
 
 
-def sql_agent_node(state: AgentState) -> dict:
-    logger.info("🤖 Generating SQL (JSON Mode)...")
+def _lookup_cached_sql(question: str, schema_fingerprint: str) -> str | None:
+    """
+    ກວດ SQL cache ແລະ semantic cache (ຄຳຖາມດຽວກັນ/ໃກ້ຄຽງ + Schema ດຽວກັນ + Model ດຽວກັນ)
+    """
+    try:
+        cached_sql = get_sql_cache().get(question, schema_fingerprint, SQL_MODEL_NAME)
+        if cached_sql:
+            logger.success("⚡ SQL cache hit")
+            set_attribute("cache.sql", "exact")
+            return cached_sql
+        
+        # ຄຳຖາມທີ່ຄວາມໝາຍໃກ້ຄຽງກັນ (paraphrase)
+        match = get_semantic_cache().lookup(question, schema_fingerprint, SQL_MODEL_NAME)
+        if match:
+            logger.success(
+                f"🧠 Semantic cache hit (similarity={match.similarity:.3f}): {match.matched_question}"
+            )
+            # ບໍ່ບັນທຶກລົງ SQL cache (exact): ຖ້າ match ຜິດ SQL ຜິດຈະຄ້າງຢູ່ຈົນໝົດ TTL
+            set_attribute("cache.sql", "semantic")
+            set_attribute("cache.semantic_similarity", round(match.similarity, 4))
+            return match.sql_script
+    except Exception as e:
+        logger.warning(f"⚠️ SQL cache lookup failed: {e}")
+    set_attribute("cache.sql", "miss")
+    return None
+
+
+def _remember_sql(question: str, schema_fingerprint: str, sql_script: str):
+    """
+    ບັນທຶກ SQL ທີ່ LLM ສ້າງລົງທັງ SQL cache ແລະ semantic cache
+    """
+    try:
+        get_sql_cache().put(question, schema_fingerprint, SQL_MODEL_NAME, sql_script)
+        get_semantic_cache().add(question, schema_fingerprint, SQL_MODEL_NAME, sql_script)
+    except Exception as e:
+        logger.warning(f"⚠️ SQL cache write failed: {e}")
+
+
+def _parse_sql_response(raw_content: str) -> str:
+    """
+    ແຍກ sql_script ອອກຈາກ JSON ທີ່ LLM ຕອບກັບມາ
+    """
+    logger.debug(f"Raw LLM Output: {raw_content}")
     
+    # ຖ້າ Model ຫຼົງສົ່ງ \' ມາ, ເຮົາຈະແທນທີ່ມັນດ້ວຍ ' ທຳມະດາ
+    if "\\'" in raw_content:
+        logger.warning("⚠️ Detected escaped single quotes. Fixing...")
+        raw_content = raw_content.replace("\\'", "'")
+    
+    # ລຶບ markdown ```json ... ``` ຖ້າມີຕິດມາ
+    raw_content = raw_content.strip().strip('`').replace('json', '', 1).strip()
+    
+    parser = JsonOutputParser()
+    parsed_data = parser.parse(raw_content)
+    return parsed_data.get("sql_script", "")
+
+
+def _route_sql(state: AgentState) -> RoutingDecision:
+    """
+    ເລືອກ model ຕາມຄວາມສັບຊ້ອນຂອງ Schema ທີ່ຈະສົ່ງໃຫ້ LLM
+    """
+    tables = state.get("selected_tables") or []
+    table_count = len(tables) if tables else len(get_schema_catalog().get_snapshot().tables)
+    return get_model_router().route_sql(table_count, estimate_tokens(state.get("result_schema", "")))
+
+
+def _invoke_sql_llm(decision: RoutingDecision, prompt: ChatPromptTemplate, inputs: dict) -> str:
+    """
+    ສ້າງ/ແກ້ SQL ດ້ວຍ model ທີ່ Router ເລືອກ ແລະ ບັນທຶກ latency ລົງສະຖິຕິຂອງ model
+    """
+    started = time.perf_counter()
+    sql_script = ""
+    try:
+        llm = get_router_llm(model_name=decision.model_name, temperature=0.0)
+        response = (prompt | llm).invoke(inputs)
+        sql_script = _parse_sql_response(response.content)
+        return sql_script
+    finally:
+        get_model_router().record_call(
+            decision.model_name, (time.perf_counter() - started) * 1000, ok=bool(sql_script)
+        )
+
+
+def _escalate_generation(decision: RoutingDecision, error: Exception | None) -> RoutingDecision | None:
+    """
+    model ນ້ອຍສ້າງ SQL ບໍ່ໄດ້ → ລອງໃໝ່ດ້ວຍ model ໃຫຍ່ (None = ບໍ່ມີ tier ທີ່ສູງກວ່າ)
+    """
+    if decision.tier != TIER_FAST:
+        return None
+    logger.warning(f"⚠️ Fast SQL model {decision.model_name} failed ({error or 'empty SQL'}), escalating...")
+    return get_model_router().escalate("generation_error")
+
+
+def _retry_generation(decision: RoutingDecision, error: Exception | None) -> RoutingDecision | None:
+    """
+    ຕັດສິນໃຈຫຼັງ LLM ສ້າງ SQL ບໍ່ໄດ້: RoutingDecision ຂອງ model ທີ່ຈະລອງໃໝ່, None = ຍອມຮັບ SQL ເປົ່າ,
+    raise error ເດີມຖ້າບໍ່ມີ tier ທີ່ສູງກວ່າ
+    """
+    escalated = _escalate_generation(decision, error)
+    if escalated is None and error is not None:
+        raise error
+    return escalated
+
+
+def _prepare_sql(state: AgentState) -> tuple[dict | None, str]:
+    """
+    ກວດ input ແລະ Cache ກ່ອນຮຽກ LLM
+
+    Returns:
+        (state update ທີ່ພ້ອມແລ້ວ (input ບໍ່ຄົບ ຫຼື Cache hit) ຫຼື None, schema_fingerprint ສຳລັບ Cache)
+    """
     question = state.get("question", "")
     schema = state.get("result_schema", "")
+    schema_fingerprint = state.get("schema_fingerprint", "")
     
     if not question or not schema:
-        return {"sql_script": ""}
+        return {"sql_script": ""}, schema_fingerprint
+    
+    if schema_fingerprint:
+        cached_sql = _lookup_cached_sql(question, schema_fingerprint)
+        if cached_sql:
+            return {"sql_script": cached_sql, "sql_cache_hit": True, "sql_model": ""}, schema_fingerprint
+    return None, schema_fingerprint
 
-    try:
-        llm = get_router_llm(model_name="moonshotai/kimi-k2-instruct-0905", temperature=0.0)
-        
-        chain = SQL_AGENT_PROMPT | llm
-        
-        response = chain.invoke({
-            "schema": schema,
-            "question": question
-        })
-        
-        raw_content = response.content
-        logger.debug(f"Raw LLM Output: {raw_content}")
+
+def _sql_update(state: AgentState, schema_fingerprint: str, sql_script: str, model_name: str) -> dict:
+    """
+    ບັນທຶກ SQL ທີ່ LLM ສ້າງລົງ Cache ແລະ ສ້າງ state update ຂອງ sql_agent
+    """
+    if schema_fingerprint and sql_script:
+        _remember_sql(state.get("question", ""), schema_fingerprint, sql_script)
+    return {"sql_script": sql_script, "sql_cache_hit": False, "sql_model": model_name}
+
+
+def _sql_inputs(state: AgentState) -> dict:
+    return {"schema": state.get("result_schema", ""), "question": state.get("question", "")}
+
+
+def _sql_error(error: Exception) -> dict:
+    logger.error(f"❌ Error: {error}")
+    # ກໍລະນີ Parse ບໍ່ໄດ້ແທ້ໆ ໃຫ້ລອງສົ່ງ raw content ກັບໄປເບິ່ງ (ຫຼື return error)
+    return {"sql_script": f"-- Error parsing SQL: {str(error)}"}
+
+
+def sql_agent_node(state: AgentState) -> dict:
+    logger.info("🤖 Generating SQL (JSON Mode)...")
     
-        # ຖ້າ Model ຫຼົງສົ່ງ \' ມາ, ເຮົາຈະແທນທີ່ມັນດ້ວຍ ' ທຳມະດາ
-        if "\\'" in raw_content:
-            logger.warning("⚠️ Detected escaped single quotes. Fixing...")
-            raw_content = raw_content.replace("\\'", "'")
-        
-        # ລຶບ markdown ```json ... ``` ຖ້າມີຕິດມາ
-        raw_content = raw_content.strip().strip('`').replace('json', '', 1).strip()
+    # ກວດ Cache ກ່ອນຮຽກ LLM
+    ready, schema_fingerprint = _prepare_sql(state)
+    if ready:
+        return ready
 
-        parser = JsonOutputParser()
-        parsed_data = parser.parse(raw_content)
+    try:
+        decision = _route_sql(state)
+        inputs = _sql_inputs(state)
+        try:
+            sql_script, error = _invoke_sql_llm(decision, SQL_AGENT_PROMPT, inputs), None
+        except Exception as e:
+            sql_script, error = "", e
+        if not sql_script:
+            escalated = _retry_generation(decision, error)
+            if escalated is not None:
+                decision = escalated
+                sql_script = _invoke_sql_llm(decision, SQL_AGENT_PROMPT, inputs)
         
-        sql_script = parsed_data.get("sql_script", "")
-        return {"sql_script": sql_script}
+        return _sql_update(state, schema_fingerprint, sql_script, decision.model_name)
 
     except Exception as e:
-        logger.error(f"❌ Error: {e}")
-        # ກໍລະນີ Parse ບໍ່ໄດ້ແທ້ໆ ໃຫ້ລອງສົ່ງ raw content ກັບໄປເບິ່ງ (ຫຼື return error)
-        return {"sql_script": f"-- Error parsing SQL: {str(e)}"}
+        return _sql_error(e)
 
 
 # ===========================
@@ -170,63 +326,328 @@ def execute_sql_node(state: AgentState) -> dict:
     logger.info("🚀 Executing SQL Query...")
     
     sql_script = state.get("sql_script", "")
-
-    print("sql_script: ", sql_script)
     
     if not sql_script or sql_script.startswith("--"):
         logger.warning("⚠️ No valid SQL script to execute")
-        return {"sql_result": {"error": "No valid SQL script", "columns": [], "rows": []}}
+        return {"sql_result": empty_result("No valid SQL script")}
     
-    connection = None
+    query_id = state.get("query_id") or uuid.uuid4().hex
+    cancelled = False
     try:
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        cursor.execute(sql_script)
-        
-        # ດຶງຊື່ columns
-        columns = [desc[0] for desc in cursor.description] if cursor.description else []
-        
-        # ດຶງ rows ທັງໝົດ
-        rows = cursor.fetchall()
-        
-        # ແປງ rows ເປັນ list of dicts ເພື່ອງ່າຍຕໍ່ການໃຊ້ງານ
-        result_data = []
-        for row in rows:
-            row_dict = {}
-            for i, col in enumerate(columns):
-                value = row[i]
-                # ແປງ types ທີ່ບໍ່ serializable ໃຫ້ເປັນ string
-                if hasattr(value, 'isoformat'):  # datetime, date
-                    value = value.isoformat()
-                elif isinstance(value, bytes):
-                    value = value.decode('utf-8', errors='replace')
-                row_dict[col] = value
-            result_data.append(row_dict)
+        # ກວດ table/column ກັບ Schema ໃນ memory ກ່ອນ (ບໍ່ເສຍ round trip ໄປ MariaDB)
+        validated = _validate_sql(sql_script)
+        executable_sql = validated.sql if validated else sql_script
         
-        cursor.close()
-        connection.close()
+        # SELECT ດຽວກັນທີ່ເຄີຍ run (ແລະ tables ບໍ່ມີການປ່ຽນແປງ) → ໃຊ້ຜົນລັບທີ່ Cache ໄວ້
+        table_versions = _result_cache_versions(validated)
+        if table_versions is not None:
+            cached = _lookup_cached_result(executable_sql, table_versions)
+            if cached is not None:
+                _record_sql_outcome(state, ok=True)
+                if validated.rewritten:
+                    return {"sql_result": cached, "sql_script": validated.sql}
+                return {"sql_result": cached}
         
-        logger.success(f"✅ SQL executed successfully: {len(result_data)} rows returned")
-        return {
-            "sql_result": {
-                "columns": columns,
-                "rows": result_data,
-                "row_count": len(result_data)
-            }
-        }
+        with get_pooled_connection() as connection:
+            # ກວດ SQL (SELECT ເທົ່ານັ້ນ, EXPLAIN, LIMIT, max_statement_time) ກ່ອນ execute
+            guarded = guard_query(executable_sql, connection)
+            for warning in guarded.warnings:
+                logger.warning(f"⚠️ {warning}")
+            
+            # Unbuffered cursor: ດຶງຂໍ້ມູນເປັນ batch ແທນການໂຫຼດທັງໝົດເຂົ້າ memory
+            cursor = connection.cursor(buffered=False)
+            register_query(query_id, connection)
+            try:
+                cursor.execute(guarded.executable_sql)
+                add_metric("db.round_trips")
+                sql_result = fetch_columnar(cursor)
+            except Exception:
+                cursor.close()
+                raise
+            finally:
+                cancelled = unregister_query(query_id)
+            
+            if sql_result["truncated"]:
+                # ຍັງມີ rows ທີ່ບໍ່ໄດ້ອ່ານຄ້າງຢູ່ → ປິດ connection ຖິ້ມແທນການອ່ານສ່ວນທີ່ເຫຼືອ
+                get_db_pool().discard_on_release(connection)
+            else:
+                cursor.close()
         
+        if guarded.warnings:
+            sql_result["warnings"] = guarded.warnings
+        if guarded.estimated_rows is not None:
+            sql_result["estimated_rows"] = guarded.estimated_rows
+        if sql_result["truncated"]:
+            logger.warning(f"⚠️ Result truncated at {sql_result['row_count']} rows (row/byte cap)")
+        logger.success(f"✅ SQL executed successfully: {sql_result['row_count']} rows returned")
+        _record_sql_outcome(state, ok=True)
+        if table_versions is not None:
+            _remember_result(executable_sql, validated.tables, table_versions, sql_result)
+        if validated and validated.rewritten:
+            return {"sql_result": sql_result, "sql_script": validated.sql}
+        return {"sql_result": sql_result}
+    
+    except QueryRejected as e:
+        logger.error(f"🛡️ SQL rejected: {e}")
+        _invalidate_failed_sql(state, sql_script)
+        sql_result = empty_result(str(e))
+        sql_result["repairable"] = True
+        # validation = Schema ໃນ memory, guard = Query Guard (SELECT ເທົ່ານັ້ນ, EXPLAIN)
+        sql_result["error_stage"] = "validation" if isinstance(e, SQLValidationError) else "guard"
+        _record_sql_outcome(state, ok=False, stage=sql_result["error_stage"])
+        return {"sql_result": sql_result}
+    
     except Exception as e:
+        if cancelled:
+            logger.warning(f"⛔ Query {query_id} was cancelled by the user")
+            return {"sql_result": empty_result("Query ຖືກຍົກເລີກໂດຍຜູ້ໃຊ້")}
         logger.error(f"❌ Error executing SQL: {e}")
-        if connection:
-            connection.close()
-        return {
-            "sql_result": {
-                "error": str(e),
-                "columns": [],
-                "rows": []
-            }
-        }
+        _invalidate_failed_sql(state, sql_script)
+        sql_result = empty_result(str(e))
+        # Error ຂອງຕົວ SQL ເອງ (syntax, column ບໍ່ມີ, ...) → ໃຫ້ repair_sql ແກ້ໄດ້
+        sql_result["repairable"] = getattr(e, "errno", None) in REPAIRABLE_ERRNOS
+        sql_result["error_stage"] = "execution"
+        _record_sql_outcome(state, ok=False, stage="execution")
+        return {"sql_result": sql_result}
+
+
+def _record_sql_outcome(state: AgentState, ok: bool, stage: str | None = None):
+    """
+    ບັນທຶກຜົນຂອງ SQL ລົງສະຖິຕິຂອງ model ທີ່ສ້າງມັນ (SQL ຈາກ Cache ບໍ່ຖືກນັບ)
+    """
+    model_name = state.get("sql_model")
+    if model_name:
+        get_model_router().record_outcome(model_name, ok, stage)
+
+
+def _validate_sql(sql_script: str) -> ValidatedQuery | None:
+    """
+    ກວດ SQL ກັບ SchemaSnapshot (None = ບໍ່ມີ Schema ໃຫ້ກວດ, ຂ້າມໄປ)
+
+    Raises:
+        SQLValidationError: table/column ບໍ່ມີ ຫຼື Syntax ຜິດ
+    """
+    try:
+        snapshot = get_schema_catalog().get_snapshot()
+    except Exception as e:
+        logger.warning(f"⚠️ Schema unavailable, skipping SQL validation: {e}")
+        return None
+    if not snapshot.tables:
+        return None
+    
+    try:
+        validated = validate_sql(sql_script, snapshot)
+    except QueryRejected:
+        set_attribute("sql.validation", "failed")
+        raise
+    set_attribute("sql.validation", "rewritten" if validated.rewritten else "ok")
+    return validated
+
+
+def _result_cache_versions(validated: ValidatedQuery | None) -> dict | None:
+    """
+    Version ຂອງ tables ທີ່ SQL ໃຊ້ (ດຶງກ່ອນ execute); None = ບໍ່ໃຊ້ Result Cache
+    (ປິດຢູ່, ບໍ່ຮູ້ວ່າ SQL ອ້າງເຖິງ tables ໃດ ເພາະບໍ່ໄດ້ກວດກັບ Schema, ຫຼື SQL ບໍ່ອ້າງເຖິງ table ໃດເລີຍ
+    ເຊັ່ນ SELECT NOW() ທີ່ບໍ່ມີ version ໃຫ້ invalidate)
+    """
+    if validated is None or not validated.tables or not result_cache_enabled():
+        return None
+    try:
+        return get_result_cache().table_versions(validated.tables)
+    except Exception as e:
+        logger.warning(f"⚠️ Result cache unavailable: {e}")
+        return None
+
+
+def _lookup_cached_result(sql_script: str, table_versions: dict) -> dict | None:
+    try:
+        cached = get_result_cache().get(sql_script, table_versions)
+    except Exception as e:
+        logger.warning(f"⚠️ Result cache lookup failed: {e}")
+        cached = None
+    if cached is None:
+        set_attribute("cache.result", "miss")
+        return None
+    logger.success(f"⚡ Result cache hit: {cached['row_count']} rows (age {cached['cache_age_s']}s)")
+    set_attribute("cache.result", "hit")
+    add_metric("cache.result_rows", cached["row_count"])
+    return cached
+
+
+def _remember_result(sql_script: str, tables: list[str], table_versions: dict, sql_result: dict):
+    try:
+        get_result_cache().put(sql_script, tables, table_versions, sql_result)
+    except Exception as e:
+        logger.warning(f"⚠️ Result cache write failed: {e}")
+
+
+def _invalidate_failed_sql(state: AgentState, sql_script: str):
+    # SQL ທີ່ມາຈາກ Cache (ຫຼື SQL ທີ່ repair ແລ້ວ ເຊິ່ງຖືກບັນທຶກລົງ Cache) ແຕ່ execute ບໍ່ຜ່ານ
+    # → ລຶບອອກ ເພື່ອໃຫ້ຄັ້ງໜ້າສ້າງໃໝ່
+    from_cache = state.get("sql_cache_hit") or state.get("sql_repair_attempts")
+    if from_cache and state.get("schema_fingerprint"):
+        invalidate_cached_sql(state.get("question", ""), state["schema_fingerprint"], sql_script)
+
+
+# ===========================
+# REPAIR SQL NODE
+# ===========================
+
+# MariaDB error codes ທີ່ເກີດຈາກຕົວ SQL (LLM ແກ້ໄດ້ເມື່ອເຫັນ error message)
+REPAIRABLE_ERRNOS = {
+    1052,  # ER_NON_UNIQ_ERROR: Column is ambiguous
+    1054,  # ER_BAD_FIELD_ERROR: Unknown column
+    1055,  # ER_WRONG_FIELD_WITH_GROUP (ONLY_FULL_GROUP_BY)
+    1060,  # ER_DUP_FIELDNAME
+    1064,  # ER_PARSE_ERROR: SQL syntax
+    1066,  # ER_NONUNIQ_TABLE: Not unique table/alias
+    1109,  # ER_UNKNOWN_TABLE
+    1111,  # ER_INVALID_GROUP_FUNC_USE
+    1146,  # ER_NO_SUCH_TABLE
+    1222,  # ER_WRONG_NUMBER_OF_COLUMNS_IN_SELECT (UNION)
+    1242,  # ER_SUBQUERY_NO_1_ROW
+    1248,  # ER_DERIVED_MUST_HAVE_ALIAS
+    1305,  # ER_SP_DOES_NOT_EXIST: FUNCTION does not exist
+    1582,  # ER_WRONG_PARAMCOUNT_TO_NATIVE_FCT
+}
+
+REPAIR_SQL_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        """ທ່ານເປັນ **Expert SQL Developer** (MariaDB). SQL ທີ່ສ້າງໄວ້ກ່ອນໜ້ານີ້ execute ບໍ່ຜ່ານ, ໃຫ້ແກ້ໄຂຕາມ Error.
+
+Database Schema:
+{schema}
+
+### ກົດລະບຽບ:
+1. ໃຊ້ສະເພາະ **SELECT** ເທົ່ານັ້ນ ແລະ ໃຊ້ຊື່ table/column ທີ່ມີໃນ Schema ເທົ່ານັ້ນ.
+2. ຕ້ອງໃຊ້ `test_visualization.` ນໍາໜ້າຊື່ຕາຕະລາງສະເໝີ.
+3. ແກ້ສະເພາະສ່ວນທີ່ເຮັດໃຫ້ເກີດ Error, ຮັກສາຄວາມໝາຍຂອງ Query ເດີມໄວ້.
+
+### ⚠️ FORMAT: ຕອບເປັນ **JSON Object** ເທົ່ານັ້ນ (ຫ້າມ Escape Single Quote):
+{{
+    "sql_script": "SQL Query ທີ່ແກ້ແລ້ວ..."
+}}
+"""
+    ),
+    ("user", "ຄຳຖາມ: {question}\n\nSQL ທີ່ຜິດ:\n{sql_script}\n\nError ຈາກ Database:\n{error}")
+])
+
+
+def _repair_inputs(state: AgentState) -> dict:
+    """
+    Inputs ຂອງ REPAIR_SQL_PROMPT: ໃຊ້ Schema ທີ່ຢູ່ໃນ state ແລ້ວ (ບໍ່ດຶງ Schema ໃໝ່)
+    """
+    schema = state.get("result_schema") or get_schema_catalog().get_snapshot().schema_text
+    return {
+        "schema": schema,
+        "question": state.get("question", ""),
+        "sql_script": state.get("sql_script", ""),
+        "error": (state.get("sql_result") or {}).get("error", ""),
+    }
+
+
+def _repair_update(state: AgentState, repaired_sql: str, model_name: str) -> dict:
+    attempts = state.get("sql_repair_attempts", 0) + 1
+    history = list(state.get("sql_repair_history") or [])
+    history.append({
+        "sql_script": state.get("sql_script", ""),
+        "error": (state.get("sql_result") or {}).get("error", ""),
+    })
+    set_attribute("sql.repair_attempt", attempts)
+
+    schema_fingerprint = state.get("schema_fingerprint", "")
+    if schema_fingerprint:
+        # SQL ທີ່ແກ້ແລ້ວແທນທີ່ SQL ທີ່ຜິດໃນ Cache
+        invalidate_cached_sql(state.get("question", ""), schema_fingerprint, state.get("sql_script", ""))
+        if repaired_sql:
+            _remember_sql(state.get("question", ""), schema_fingerprint, repaired_sql)
+
+    update = {"sql_repair_attempts": attempts, "sql_repair_history": history}
+    if not repaired_sql:
+        # ແກ້ບໍ່ໄດ້ → ບໍ່ execute SQL ເກົ່າຊ້ຳ
+        update["sql_result"] = {**(state.get("sql_result") or {}), "repairable": False}
+        return update
+    update.update({"sql_script": repaired_sql, "sql_cache_hit": False, "sql_model": model_name})
+    return update
+
+
+def _repair_route(state: AgentState) -> RoutingDecision:
+    # SQL ທີ່ບໍ່ຜ່ານ validation/EXPLAIN/execute → ແກ້ດ້ວຍ model ໃຫຍ່
+    return get_model_router().escalate((state.get("sql_result") or {}).get("error_stage") or "execution")
+
+
+def repair_sql_node(state: AgentState) -> dict:
+    """
+    Node ສຳລັບແກ້ SQL ທີ່ execute ບໍ່ຜ່ານ ໂດຍສົ່ງ SQL ເດີມ + Error ໃຫ້ LLM
+    (ບໍ່ເລີ່ມສ້າງໃໝ່ທັງໝົດ ແລະ ບໍ່ດຶງ Schema ໃໝ່)
+    """
+    attempt = state.get("sql_repair_attempts", 0) + 1
+    logger.info(f"🔧 Repairing SQL (attempt {attempt})...")
+    
+    decision = _repair_route(state)
+    try:
+        repaired_sql = _invoke_sql_llm(decision, REPAIR_SQL_PROMPT, _repair_inputs(state))
+    except Exception as e:
+        logger.error(f"❌ Error repairing SQL: {e}")
+        repaired_sql = ""
+    
+    if repaired_sql:
+        logger.success("✅ SQL repaired, re-executing...")
+    return _repair_update(state, repaired_sql, decision.model_name)
+
+
+def route_after_repair(state: AgentState) -> str:
+    """
+    Conditional edge ຫຼັງ repair_sql: "execute_sql" ຖ້າໄດ້ SQL ໃໝ່, ບໍ່ດັ່ງນັ້ນ "continue"
+    """
+    return "execute_sql" if (state.get("sql_result") or {}).get("repairable") else "continue"
+
+
+def max_repair_attempts() -> int:
+    return int(os.getenv("SQL_REPAIR_MAX_ATTEMPTS", "2"))
+
+
+def route_after_execute(state: AgentState) -> str:
+    """
+    Conditional edge ຫຼັງ execute_sql: "repair_sql" ຖ້າ Error ແກ້ໄດ້ ແລະ ຍັງບໍ່ເກີນຈຳນວນຄັ້ງ,
+    ບໍ່ດັ່ງນັ້ນ "continue"
+    """
+    sql_result = state.get("sql_result") or {}
+    if (
+        sql_result.get("error")
+        and sql_result.get("repairable")
+        and state.get("sql_repair_attempts", 0) < max_repair_attempts()
+    ):
+        return "repair_sql"
+    return "continue"
+
+# ===========================
+# RESULT SUMMARY NODE
+# ===========================
+
+def summarize_result_node(state: AgentState) -> dict:
+    """
+    Node ສຳລັບຫຍໍ້ sql_result (ສະຖິຕິ, top-k, LTTB series) ໃຫ້ພໍດີກັບ token budget
+    ກ່ອນສົ່ງໃຫ້ Chart Agent
+    """
+    logger.info("🧮 Summarizing SQL result for the chart prompt...")
+    
+    sql_result = state.get("sql_result", None)
+    if not sql_result or sql_result.get("error"):
+        return {"result_summary": {}}
+    
+    try:
+        result_summary = summarize_result(sql_result)
+        logger.success(
+            f"✅ Result summarized: {result_summary.get('row_count', 0)} rows → "
+            f"~{result_summary.get('estimated_tokens', 0)} tokens"
+        )
+        return {"result_summary": result_summary}
+    except Exception as e:
+        logger.error(f"❌ Error summarizing result: {e}")
+        return {"result_summary": {}}
+
 
 CHART_AGENT_PROMPT = ChatPromptTemplate.from_messages([
     (
@@ -238,6 +659,11 @@ CHART_AGENT_PROMPT = ChatPromptTemplate.from_messages([
 
 2.  **⚠️ ການຈັດການການສະແດງຜົນຂໍ້ມູນຂະໜາດໃຫຍ່ (ສຳຄັນ):**
     * **ຫ້າມ** ຕັດ ຫຼື ຈຳກັດຈຳນວນຂໍ້ມູນ (ເຊັ່ນ: Top 10). ຕ້ອງສະແດງທຸກແຖວຂອງຂໍ້ມູນທີ່ໄດ້ຮັບມາ.
+    * **ຂໍ້ມູນເຕັມບໍ່ໄດ້ຢູ່ໃນ Prompt:** ທ່ານໄດ້ຮັບສະເພາະ **ບົດສະຫຼຸບ** (ສະຖິຕິ, Top-k, Series ທີ່ຫຍໍ້ແລ້ວ). ຂໍ້ມູນເຕັມທຸກແຖວຈະຖືກໃສ່ໃຫ້ອັດຕະໂນມັດໃນ HTML.
+      **ຫ້າມ** ຂຽນຂໍ້ມູນລົງໃນ Code ເອງ. ໃຫ້ໃສ່ Tag ນີ້ໃນ HTML ຕາມຕົວອັກສອນ:
+      `<script id="chart-data" type="application/json">__CHART_DATA__</script>`
+      ແລ້ວອ່ານຂໍ້ມູນດ້ວຍ `JSON.parse(document.getElementById('chart-data').textContent)` ເຊິ່ງມີຮູບແບບ
+      `{{"columns": ["col1", "col2", ...], "rows": [[v1, v2, ...], ...]}}`.
     * **ສຳລັບ Bar Chart ເທົ່ານັ້ນ:** ຖ້າຂໍ້ມູນມີແຖວ (Rows) **ເກີນ 15 ແຖວ** ແລະ ເປັນ Bar Chart, ທ່ານຕ້ອງສ້າງ **Horizontal Bar Chart** ເທົ່ານັ້ນ.
     * **CSS Scroll Control:** ໃຫ້ກຳນົດຂະໜາດຂອງ Canvas ໃຫ້ມີຄວາມສູງທີ່ເໝາະສົມ (ເຊັ່ນ: 600px) ແລະ ໃຫ້ໃຊ້ **CSS Overflow/Scroll** ຂອງ Container (<div>) ຫຸ້ມ Chart ນັ້ນ ເພື່ອໃຫ້ຜູ້ໃຊ້ສາມາດເລື່ອນເບິ່ງ Chart ໄດ້ໂດຍບໍ່ເຮັດໃຫ້ໜ້າເວັບຢາວເກີນໄປ.
 
@@ -259,57 +685,213 @@ CHART_AGENT_PROMPT = ChatPromptTemplate.from_messages([
 
 **ຄຳຖາມຕົ້ນສະບັບ:** {question}
 
-**ຜົນລັບຈາກ Database: **
-{sql_result}
+**ບົດສະຫຼຸບຜົນລັບຈາກ Database (JSON):**
+{result_summary}
 
 """
     ),
 ])
 
-def chart_generation_node(state: AgentState) -> dict:
-    logger.info("🎨 Executing Chart Agent Node: Generating HTML/JS...")
-    
-    question = state.get("question", "")
-    
-    # ປ່ຽນການດຶງ Key: ຈາກ "query_result" ເປັນ "sql_result"
+CHART_ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        """ທ່ານແມ່ນ **Data Analyst** ທີ່ຂຽນບົດວິເຄາະສັ້ນໆ ເປັນພາສາລາວ ສຳລັບ Chart ທີ່ສ້າງແລ້ວ.
+
+Chart: {chart_type} ({label_column} → {value_columns})
+
+### ສິ່ງທີ່ຕ້ອງຂຽນ (3-6 ປະໂຫຍກ, plain text, ບໍ່ມີ Markdown ຫຼື HTML):
+1. Chart ນີ້ກ່ຽວກັບຫຍັງ
+2. ຈຸດເດັ່ນ (ຄ່າສູງສຸດ/ຕ່ຳສຸດ, ການປຽບທຽບ)
+3. Trend ແລະ ການຄາດຄະເນໃນອະນາຄົດ
+
+**ຄຳຖາມຕົ້ນສະບັບ:** {question}
+
+**ບົດສະຫຼຸບຂໍ້ມູນ (JSON):**
+{result_summary}
+"""
+    ),
+])
+
+
+def _chart_analysis_inputs(question: str, spec: ChartSpec, result_summary: dict) -> dict:
+    return {
+        "question": question,
+        "chart_type": spec.chart_type,
+        "label_column": spec.label_column,
+        "value_columns": ", ".join(spec.value_columns),
+        "result_summary": json.dumps(result_summary, ensure_ascii=False)
+    }
+
+
+def _generate_chart_analysis(question: str, spec: ChartSpec, result_summary: dict) -> str:
+    """
+    ໃຫ້ LLM ຂຽນສະເພາະບົດວິເຄາະສັ້ນໆ (ບໍ່ຕ້ອງຂຽນ HTML ທັງໝົດ)
+    """
+    llm = get_router_llm(model_name=large_model(), temperature=0.1, purpose="chart")
+    chain = CHART_ANALYSIS_PROMPT | llm
+    response = chain.invoke(_chart_analysis_inputs(question, spec, result_summary))
+    return response.content
+
+
+def _fallback_analysis(spec: ChartSpec, error: Exception) -> str:
+    # Chart ຍັງໃຊ້ໄດ້ ເຖິງວ່າບໍ່ມີບົດວິເຄາະ
+    logger.warning(f"⚠️ Chart analysis failed, rendering chart without it: {error}")
+    return f"ຂໍ້ມູນທັງໝົດ {spec.row_count} ແຖວ."
+
+
+def _chart_report(artifact: ChartArtifact) -> dict:
+    # final_report ຍັງເປັນ String ສະຖານະ (ສຳລັບ log/ຜູ້ໃຊ້ເກົ່າ), chart_artifact ແມ່ນຂໍ້ມູນທີ່ໃຊ້ຈິງ
+    return {
+        "final_report": f"File '{artifact.path}' ໄດ້ຖືກສ້າງສຳເລັດແລ້ວ.",
+        "chart_artifact": artifact.as_dict(),
+    }
+
+
+def _store_chart(artifact_key: str, content: str) -> dict:
+    """
+    ບັນທຶກ Chart HTML ລົງ ArtifactStore
+    """
+    try:
+        artifact = get_artifact_store().put(artifact_key, content)
+    except Exception as e:
+        logger.error(f"❌ Could not store chart: {e}")
+        return {"final_report": f"Error: ບໍ່ສາມາດບັນທຶກ Chart ໄດ້: {e}"}
+    return _chart_report(artifact)
+
+
+def _write_template_chart(question: str, spec: ChartSpec, analysis_text: str, artifact_key: str) -> dict:
+    content = render_chart_html(spec, question, analysis_text)
+    report = _store_chart(artifact_key, content)
+    logger.success(f"✅ Template chart ({spec.chart_type}) finished. Status: {report['final_report']}")
+    return report
+
+
+def _render_template_chart(question: str, spec: ChartSpec, result_summary: dict, artifact_key: str) -> dict:
+    """
+    ສ້າງ Chart ຈາກ Template (LLM ຂຽນສະເພາະບົດວິເຄາະ)
+    """
+    try:
+        analysis_text = _generate_chart_analysis(question, spec, result_summary)
+    except Exception as e:
+        analysis_text = _fallback_analysis(spec, e)
+    return _write_template_chart(question, spec, analysis_text, artifact_key)
+
+
+def _cached_chart(artifact_key: str) -> dict | None:
+    """
+    Chart ຂອງຄຳຖາມ/SQL/ຜົນລັບດຽວກັນທີ່ເຄີຍສ້າງແລ້ວ (ບໍ່ຕ້ອງຮຽກ LLM)
+    """
+    try:
+        artifact = get_artifact_store().get(artifact_key)
+    except Exception as e:
+        logger.warning(f"⚠️ Artifact store lookup failed: {e}")
+        artifact = None
+    if artifact is None:
+        set_attribute("cache.chart", "miss")
+        return None
+    logger.success(f"⚡ Chart served from artifact store: {os.path.basename(artifact.path)}")
+    set_attribute("cache.chart", "hit")
+    return _chart_report(artifact)
+
+
+def _prepare_chart(state: AgentState) -> tuple[dict | None, ChartSpec | None, dict, str]:
+    """
+    ກວດ sql_result ແລະ ເລືອກວິທີສ້າງ Chart
+
+    Returns:
+        tuple: (report ທີ່ພ້ອມສົ່ງຄືນ (error ຫຼື Chart ຈາກ Store) ຫຼື None,
+                ChartSpec ສຳລັບ Template ຫຼື None, result_summary, artifact key)
+    """
     sql_result = state.get("sql_result", None) 
     
     # ກວດສອບຂໍ້ມູນ
     if not sql_result or sql_result.get("error"): # ກວດສອບວ່າມີ error ຢູ່ໃນ result ບໍ່
         logger.error("❌ Cannot generate chart: Invalid SQL result.")
-        return {"final_report": f"Error: Cannot generate chart due to invalid data: {sql_result.get('error', 'No data')}"}
+        error = (sql_result or {}).get("error", "No data")
+        return {"final_report": f"Error: Cannot generate chart due to invalid data: {error}"}, None, {}, ""
     
+    artifact_key = chart_artifact_key(state.get("question", ""), state.get("sql_script", ""), sql_result)
+    cached = _cached_chart(artifact_key)
+    if cached:
+        return cached, None, {}, artifact_key
+    
+    # 0. ຮູບແບບທີ່ພົບເລື້ອຍ (bar/line/pie) → ໃຊ້ Template ແທນການໃຫ້ LLM ຂຽນ HTML
     try:
-        # 1. ຕັ້ງຄ່າ LLM
-        llm = get_router_llm(model_name="moonshotai/kimi-k2-instruct-0905", temperature=0.1)
-        
-        # 2. Bind Tool
-        chart_generator = CHART_AGENT_PROMPT | llm.bind_tools(
-            tools=[FileGenerationSchema]
-        )
+        spec = infer_chart_spec(sql_result)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not infer chart type, falling back to LLM: {e}")
+        spec = None
+    
+    # ບົດສະຫຼຸບທີ່ພໍດີກັບ token budget (ສ້າງໂດຍ summarize_result_node)
+    result_summary = state.get("result_summary") or summarize_result_node(state)["result_summary"]
+    return None, spec, result_summary, artifact_key
+
+
+def can_prerender_chart(state: AgentState) -> bool:
+    """
+    Chart ຂອງ sql_result ນີ້ສ້າງລ່ວງໜ້າໄດ້ໂດຍບໍ່ໃຫ້ LLM ຂຽນ HTML ບໍ
+    (ມີໃນ Artifact Store ແລ້ວ ຫຼື ເປັນຮູບແບບທີ່ Template ຮອງຮັບ)
+    """
+    sql_result = state.get("sql_result", None)
+    if not sql_result or sql_result.get("error"):
+        return False
+    try:
+        artifact_key = chart_artifact_key(state.get("question", ""), state.get("sql_script", ""), sql_result)
+        if get_artifact_store().get(artifact_key) is not None:
+            return True
+        return infer_chart_spec(sql_result) is not None
+    except Exception:
+        return False
+
+
+def _chart_llm():
+    # Tool ຖືກ bind ໄວ້ລ່ວງໜ້າໃນ registry
+    return get_router_llm(
+        model_name=large_model(),
+        temperature=0.1,
+        tools=[FileGenerationSchema],
+        purpose="chart",
+    )
+
+
+def _write_tool_call_chart(response, sql_result: dict, artifact_key: str) -> dict:
+    """
+    ບັນທຶກ HTML ຈາກ Tool Call ຂອງ LLM (ໃສ່ຂໍ້ມູນເຕັມແທນ placeholder)
+    ຊື່ file ທີ່ LLM ເລືອກບໍ່ຖືກໃຊ້ (Store ຕັ້ງຊື່ຕາມ hash ຂອງເນື້ອໃນ)
+    """
+    if response.tool_calls:
+        tool_call = response.tool_calls[0]
+        if tool_call["name"] == "FileGenerationSchema":
+            args = tool_call["args"]
+            report = _store_chart(artifact_key, inject_chart_data(args.get("content", ""), sql_result))
+            logger.success(f"✅ Chart Agent finished. Status: {report['final_report']}")
+            return report
+    
+    logger.error("❌ LLM did not call the FileGenerationSchema tool.")
+    return {"final_report": "Error: Chart generation failed. LLM did not provide tool call."}
+
+
+def chart_generation_node(state: AgentState) -> dict:
+    logger.info("🎨 Executing Chart Agent Node: Generating HTML/JS...")
+    
+    question = state.get("question", "")
+    ready_report, spec, result_summary, artifact_key = _prepare_chart(state)
+    if ready_report:
+        return ready_report
+    
+    if spec:
+        return _render_template_chart(question, spec, result_summary, artifact_key)
+    
+    logger.info("🤖 Unusual result shape, asking LLM to generate the full chart HTML...")
+    try:
+        chart_generator = CHART_AGENT_PROMPT | _chart_llm()
         
-        # 3. Invoke LLM: ຕ້ອງປ່ຽນ Key ທີ່ສົ່ງເຂົ້າ Prompt ໃຫ້ກົງກັບ Prompt ດ້ວຍ
         response = chart_generator.invoke({
             "question": question,
-            "sql_result": sql_result
+            "result_summary": json.dumps(result_summary, ensure_ascii=False)
         })
-        
-        # ... ສ່ວນທີ່ເຫຼືອຂອງ Code Process Tool Call ແມ່ນຄືເກົ່າ ...
-        if response.tool_calls:
-            # ... process tool call ...
-            tool_call = response.tool_calls[0]
-            if tool_call["name"] == "FileGenerationSchema":
-                args = tool_call["args"]
-                file_status = write_chart_file(
-                    filename=args.get("filename"),
-                    content=args.get("content")
-                )
-                logger.success(f"✅ Chart Agent finished. Status: {file_status}")
-                return {"final_report": file_status}
-        else:
-             logger.error("❌ LLM did not call the FileGenerationSchema tool.")
-             return {"final_report": "Error: Chart generation failed. LLM did not provide tool call."}
+        return _write_tool_call_chart(response, state["sql_result"], artifact_key)
         
     except Exception as e:
         logger.error(f"❌ Error in Chart Agent Node: {e}")
-        return {"final_report": f"Error: Chart Agent failed with exception: {str(e)}"}
\ No newline at end of file
+        return {"final_report": f"Error: Chart Agent failed with exception: {str(e)}"}
@@ -0,0 +1,213 @@
+"""
+result_summary.py - ຫຍໍ້ sql_result ໃຫ້ພໍດີກັບ Token Budget ກ່ອນສົ່ງໃຫ້ Chart Agent
+
+ແທນທີ່ຈະສົ່ງທຸກແຖວເຂົ້າ Prompt, ສົ່ງສະເພາະ:
+- ສະຖິຕິຂອງແຕ່ລະ column (min/max/mean/sum, ຈຳນວນ null, ຈຳນວນຄ່າທີ່ແຕກຕ່າງ)
+- Top-k categories ຂອງ column ຂໍ້ຄວາມ
+- Series ທີ່ຫຍໍ້ດ້ວຍ LTTB (Largest-Triangle-Three-Buckets) ສຳລັບຂໍ້ມູນຕາມເວລາ
+- ຕົວຢ່າງແຖວຈຳນວນໜ້ອຍ
+
+ຖ້າ payload ຍັງເກີນ budget ຈະຫຼຸດ sample/top-k/series ລົງເຄິ່ງໜຶ່ງຈົນກວ່າຈະພໍດີ.
+ຂໍ້ມູນເຕັມຈະຖືກໃສ່ເຂົ້າ HTML ເປັນ JSON ແຍກຕ່າງຫາກ (ບໍ່ໃຫ້ LLM ຂຽນຄືນ).
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.Agent.chart_engine import classify_columns
+from src.DB.result_set import result_to_dataframe
+
+
+DEFAULT_TOKEN_BUDGET = 2000
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    ປະມານຈຳນວນ tokens ແບບ conservative (~3 bytes UTF-8 ຕໍ່ token, ໂຕອັກສອນລາວ ≈ 1 token)
+    """
+    return math.ceil(len(text.encode("utf-8")) / 3)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    ເລືອກ indices ດ້ວຍ Largest-Triangle-Three-Buckets ເພື່ອຫຍໍ້ series ໃຫ້ເຫຼືອ threshold ຈຸດ
+    ໂດຍຮັກສາຮູບຊົງ (peak/trough) ຂອງ series ໄວ້
+
+    Args:
+        x: ຄ່າແກນ X (ຕົວເລກ, ລຽງແລ້ວ)
+        y: ຄ່າແກນ Y
+        threshold: ຈຳນວນຈຸດທີ່ຕ້ອງການ
+
+    Returns:
+        np.ndarray: indices ທີ່ເລືອກ (ລຽງຈາກນ້ອຍຫາໃຫຍ່)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # ແບ່ງ (n - 2) ຈຸດກາງອອກເປັນ (threshold - 2) buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    prev = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # ຈຸດສະເລ່ຍຂອງ bucket ຖັດໄປ
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_end = max(next_end, next_start + 1)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        bucket_x = x[start:end]
+        bucket_y = y[start:end]
+        areas = np.abs(
+            (x[prev] - avg_x) * (bucket_y - y[prev])
+            - (x[prev] - bucket_x) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(areas))
+        selected[i + 1] = prev
+
+    return selected
+
+
+def _to_jsonable(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (np.floating,)):
+        return round(float(value), 4)
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, (pd.Timestamp,)):
+        return value.isoformat()
+    return value if isinstance(value, (int, str, bool)) else str(value)
+
+
+def _column_stats(df: pd.DataFrame, kinds: dict[str, str], top_k: int) -> list[dict]:
+    stats = []
+    for col, kind in kinds.items():
+        values = df[col]
+        entry = {
+            "name": col,
+            "kind": kind,
+            "nulls": int(values.isna().sum()),
+            "distinct": int(values.nunique(dropna=True)),
+        }
+        if kind == "numeric":
+            numbers = pd.to_numeric(values, errors="coerce")
+            entry.update({
+                "min": _to_jsonable(numbers.min()),
+                "max": _to_jsonable(numbers.max()),
+                "mean": _to_jsonable(numbers.mean()),
+                "sum": _to_jsonable(numbers.sum()),
+            })
+        elif kind == "temporal":
+            entry.update({
+                "min": _to_jsonable(values.min()),
+                "max": _to_jsonable(values.max()),
+            })
+        elif top_k > 0:
+            counts = values.astype(str).value_counts().head(top_k)
+            entry["top"] = [{"value": k, "count": int(v)} for k, v in counts.items()]
+        stats.append(entry)
+    return stats
+
+
+def _series(df: pd.DataFrame, kinds: dict[str, str], max_points: int) -> dict | None:
+    """
+    Series ຕາມເວລາ (ຖ້າມີ column ເວລາ 1 ອັນ + ຕົວເລກ) ທີ່ຫຍໍ້ດ້ວຍ LTTB
+    """
+    temporal = [c for c, k in kinds.items() if k == "temporal"]
+    numeric = [c for c, k in kinds.items() if k == "numeric"]
+    if len(temporal) != 1 or not numeric or max_points < 3:
+        return None
+
+    time_col = temporal[0]
+    frame = df[[time_col] + numeric].copy()
+    for col in numeric:
+        frame[col] = pd.to_numeric(frame[col], errors="coerce")
+    # ເວລາຊ້ຳກັນ → ລວມເປັນ bucket ດຽວ
+    frame = frame.groupby(time_col, sort=True)[numeric].sum().reset_index()
+
+    if pd.api.types.is_numeric_dtype(frame[time_col]):
+        x = frame[time_col].to_numpy(dtype=np.float64)
+    else:
+        x = pd.to_datetime(frame[time_col], errors="coerce").to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    y = frame[numeric[0]].fillna(0).to_numpy(dtype=np.float64)
+
+    idx = lttb_indices(x, y, max_points)
+    sampled = frame.iloc[idx]
+    return {
+        "x": time_col,
+        "method": "lttb" if len(idx) < len(frame) else "full",
+        "points": [
+            [_to_jsonable(v) for v in row]
+            for row in sampled.itertuples(index=False, name=None)
+        ],
+        "columns": [time_col] + numeric,
+        "original_points": len(frame),
+    }
+
+
+def _build_payload(df: pd.DataFrame, kinds: dict[str, str], row_count: int,
+                   sample_rows: int, top_k: int, max_points: int) -> dict:
+    payload = {
+        "row_count": row_count,
+        "columns": _column_stats(df, kinds, top_k),
+    }
+    series = _series(df, kinds, max_points)
+    if series:
+        payload["series"] = series
+    if sample_rows > 0:
+        payload["sample_rows"] = [
+            [_to_jsonable(v) for v in row]
+            for row in df.head(sample_rows).itertuples(index=False, name=None)
+        ]
+    return payload
+
+
+def summarize_result(sql_result: dict, token_budget: int | None = None) -> dict:
+    """
+    ສ້າງ payload ຫຍໍ້ຂອງ sql_result ທີ່ບໍ່ເກີນ token_budget
+
+    Args:
+        sql_result: ຜົນລັບຈາກ execute_sql_node
+        token_budget: ຈຳນວນ tokens ສູງສຸດ (default: CHART_PROMPT_TOKEN_BUDGET ຫຼື 2000)
+
+    Returns:
+        dict: payload (row_count, columns stats, series, sample_rows, estimated_tokens)
+    """
+    token_budget = token_budget or int(os.getenv("CHART_PROMPT_TOKEN_BUDGET", str(DEFAULT_TOKEN_BUDGET)))
+    df = result_to_dataframe(sql_result)
+    kinds = classify_columns(df)
+
+    sample_rows, top_k, max_points = 20, 10, 200
+    while True:
+        payload = _build_payload(df, kinds, len(df), sample_rows, top_k, max_points)
+        tokens = estimate_tokens(json.dumps(payload, ensure_ascii=False))
+        if tokens <= token_budget or (sample_rows == 0 and top_k == 0 and max_points < 3):
+            break
+        sample_rows //= 2
+        top_k //= 2
+        max_points //= 2
+
+    if tokens > token_budget:
+        # ກໍລະນີ columns ຫຼາຍຫຼາຍ: ເຫຼືອສະເພາະຊື່ ແລະ ປະເພດ
+        payload = {
+            "row_count": len(df),
+            "columns": [{"name": c, "kind": k} for c, k in kinds.items()][:max(1, token_budget // 20)],
+        }
+        tokens = estimate_tokens(json.dumps(payload, ensure_ascii=False))
+
+    if sql_result.get("truncated"):
+        payload["truncated"] = True
+    payload["estimated_tokens"] = tokens
+    return payload
@@ -12,4 +12,15 @@ class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]  # ຂໍ້ຄວາມຂອງຜູ້ໃຊ້ ແລະ LLM
     sql_script: NotRequired[str]  # SQL Query ສຳລັບດຶງຂໍ້ມູນ
     result_schema: NotRequired[str]  # ຜົນລັບ schema ຂອງ tables ທັງໝົດ (text)
-    sql_result: NotRequired[dict]  # ຜົນລັບຈາກການ execute SQL (columns, rows)
\ No newline at end of file
+    schema_fingerprint: NotRequired[str]  # hash ຂອງໂຄງສ້າງ schema (ໃຊ້ເປັນ cache key)
+    selected_tables: NotRequired[list[str]]  # tables ທີ່ Table Selector ເລືອກສົ່ງໃຫ້ SQL Agent
+    schema_tokens_saved: NotRequired[int]  # ຈຳນວນ tokens ທີ່ປະຢັດໄດ້ຈາກການຕັດ Schema
+    sql_cache_hit: NotRequired[bool]  # True ຖ້າ sql_script ມາຈາກ SQL cache
+    sql_model: NotRequired[str]  # model ທີ່ສ້າງ sql_script ປັດຈຸບັນ (ModelRouter; ວ່າງ = ມາຈາກ Cache)
+    sql_repair_attempts: NotRequired[int]  # ຈຳນວນຄັ້ງທີ່ repair_sql ແກ້ SQL ທີ່ execute ບໍ່ຜ່ານ
+    sql_repair_history: NotRequired[list[dict]]  # SQL ທີ່ຜິດ ແລະ Error ຂອງແຕ່ລະຄັ້ງ (sql_script, error)
+    query_id: NotRequired[str]  # ID ຂອງ query ທີ່ກຳລັງ run (ໃຊ້ຍົກເລີກຈາກ UI)
+    sql_result: NotRequired[dict]  # ຜົນລັບຈາກການ execute SQL (columns, data ແບບ columnar, row_count, truncated, spill_path, repairable, error_stage)
+    result_summary: NotRequired[dict]  # ບົດສະຫຼຸບ sql_result ທີ່ພໍດີກັບ token budget (ສຳລັບ Chart Agent)
+    final_report: NotRequired[str]  # ສະຖານະຂອງການສ້າງ Chart (path ຂອງ HTML file ຫຼື error)
+    chart_artifact: NotRequired[dict]  # Chart ໃນ ArtifactStore (path, size, content_hash, key, reused)
@@ -0,0 +1,122 @@
+"""
+streaming.py - Stream ຜົນລັບຂອງ LLM ທີລະ token ຜ່ານ LangGraph (stream_mode messages + updates)
+
+- stream_sql: SQL ທີ່ກຳລັງຖືກຂຽນ (parse JSON ທີ່ຍັງບໍ່ຄົບດ້ວຍ parse_partial_json)
+- stream_chart: HTML ທີ່ກຳລັງຖືກປະກອບຈາກ tool-call argument chunks (ຫຼື ບົດວິເຄາະ
+  ຂອງ Template chart)
+
+ທັງສອງເປັນ generator: ຜູ້ຮຽກຢຸດ (ປິດ generator) ໄດ້ທຸກເວລາ ແລະ LLM stream ຈະຖືກປິດນຳ.
+
+ເມື່ອສົ່ງ thread_id ຈະ stream ຜ່ານ Session graph (get_session_app) ທີ່ບັນທຶກ State ລົງ
+Checkpointer: stream_sql ຢຸດກ່ອນ approve_sql (ກ່ອນ execute_sql) ແລະ stream_chart resume ຈາກ State ທີ່ບັນທຶກໄວ້.
+"""
+
+from dataclasses import dataclass, field
+
+from langchain_core.messages import AIMessageChunk
+from langchain_core.utils.json import parse_partial_json
+
+from src.Agent.builder import CHART_STEPS, SQL_STEPS, get_session_app, get_step_app
+from src.Agent.checkpointer import thread_config
+
+
+@dataclass
+class StreamEvent:
+    """
+    ເຫດການລະຫວ່າງ stream
+
+    kind:
+        "sql"      → text = SQL ທີ່ໄດ້ຮັບມາເຖິງຕອນນີ້
+        "html"     → text = HTML (content ຂອງ tool call) ທີ່ໄດ້ຮັບມາເຖິງຕອນນີ້
+        "analysis" → text = ບົດວິເຄາະຂອງ Template chart ທີ່ໄດ້ຮັບມາເຖິງຕອນນີ້
+        "node"     → node ສຳເລັດແລ້ວ, update = state ທີ່ node ນັ້ນສົ່ງກັບ
+    """
+    kind: str
+    node: str = ""
+    text: str = ""
+    update: dict = field(default_factory=dict)
+
+
+def _partial_field(raw: str, key: str) -> str:
+    """
+    ດຶງ field ຈາກ JSON ທີ່ຍັງ stream ບໍ່ຄົບ (ຕັດ ```json ອອກກ່ອນ)
+    """
+    raw = raw.lstrip().removeprefix("```json").removeprefix("```").lstrip()
+    try:
+        parsed = parse_partial_json(raw)
+    except Exception:
+        return ""
+    if isinstance(parsed, dict) and isinstance(parsed.get(key), str):
+        return parsed[key]
+    return ""
+
+
+def _stream(app, graph_input: dict | None, config: dict | None = None):
+    content = ""
+    tool_args = ""
+
+    stream = app.stream(graph_input, config, stream_mode=["messages", "updates"])
+    try:
+        for mode, payload in stream:
+            if mode == "updates":
+                for node, update in payload.items():
+                    if node.startswith("__"):
+                        continue  # __interrupt__: Session graph ຢຸດລໍຖ້າຜູ້ໃຊ້
+                    yield StreamEvent("node", node=node, update=update or {})
+                continue
+
+            chunk, metadata = payload
+            if not isinstance(chunk, AIMessageChunk):
+                continue
+            node = metadata.get("langgraph_node", "")
+
+            if chunk.tool_call_chunks:
+                for tool_chunk in chunk.tool_call_chunks:
+                    tool_args += tool_chunk.get("args") or ""
+                html = _partial_field(tool_args, "content")
+                if html:
+                    yield StreamEvent("html", node=node, text=html)
+            elif chunk.content:
+                content += chunk.content
+                if node == "sql_agent":
+                    sql = _partial_field(content, "sql_script")
+                    if sql:
+                        yield StreamEvent("sql", node=node, text=sql)
+                elif node == "chart_agent":
+                    yield StreamEvent("analysis", node=node, text=content)
+    finally:
+        stream.close()
+
+
+def stream_sql(state: dict, thread_id: str | None = None):
+    """
+    Stream ຂັ້ນຕອນ get_schema → select_tables → sql_agent
+
+    Args:
+        state: State ເລີ່ມຕົ້ນ (question, messages)
+        thread_id: ID ຂອງ session (ເລີ່ມ thread ໃໝ່ໃນ Session graph ແລະ ຢຸດກ່ອນ approve_sql)
+
+    Yields:
+        StreamEvent: "sql" (SQL ບາງສ່ວນ) ແລະ "node" (state update ຂອງແຕ່ລະ node)
+    """
+    if thread_id:
+        yield from _stream(get_session_app(), state, thread_config(thread_id))
+    else:
+        yield from _stream(get_step_app(SQL_STEPS), state)
+
+
+def stream_chart(state: dict | None = None, thread_id: str | None = None):
+    """
+    Stream ຂັ້ນຕອນ summarize_result → chart_agent
+
+    Args:
+        state: State ທີ່ມີ sql_result (ບໍ່ໃຊ້ເມື່ອມີ thread_id)
+        thread_id: ID ຂອງ session (resume ຈາກ State ທີ່ບັນທຶກໄວ້ຫຼັງ execute_sql)
+
+    Yields:
+        StreamEvent: "html"/"analysis" (ຜົນລັບບາງສ່ວນ) ແລະ "node" (state update)
+    """
+    if thread_id:
+        yield from _stream(get_session_app(), None, thread_config(thread_id))
+    else:
+        yield from _stream(get_step_app(CHART_STEPS), state)
@@ -0,0 +1,229 @@
+"""
+table_selector.py - ເລືອກສະເພາະ Tables ທີ່ກ່ຽວຂ້ອງກັບຄຳຖາມ ກ່ອນສົ່ງ Schema ໃຫ້ SQL Agent
+
+ແທນທີ່ຈະສົ່ງ Schema ທັງໝົດເຂົ້າ Prompt ທຸກຄັ້ງ:
+1. ສ້າງ Index (char n-gram TF-IDF) ຂອງ ຊື່ table, ຊື່ column, comments ແລະ
+   ຕົວຢ່າງຄ່າ (optional) ຄັ້ງດຽວຕໍ່ Schema fingerprint
+2. ໃຫ້ຄະແນນແຕ່ລະ table ຕາມ field ທີ່ໃກ້ຄຽງກັບຄຳຖາມທີ່ສຸດ
+3. ເລືອກ top-k tables + tables ທີ່ເຊື່ອມກັນດ້ວຍ Foreign Key
+4. ຖ້າບໍ່ມີ table ໃດຄະແນນຜ່ານ SCHEMA_SELECT_MIN_SCORE → ໃຊ້ Schema ເຕັມ
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from loguru import logger
+
+from src.Agent.result_summary import estimate_tokens
+from src.Cache.sql_cache import normalize_question
+from src.DB.db_config import get_pooled_connection
+from src.DB.schema_catalog import SchemaSnapshot
+from src.Model_Provider.embeddings import get_embedder
+
+
+_TEXT_TYPES = {"char", "varchar", "enum", "set", "tinytext"}
+
+
+@dataclass(frozen=True)
+class TableSelection:
+    """
+    ຜົນລັບການເລືອກ Tables
+    """
+    tables: tuple[str, ...]
+    schema_text: str
+    full_tokens: int
+    selected_tokens: int
+    fallback: bool
+    scores: dict[str, float]
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(self.full_tokens - self.selected_tokens, 0)
+
+
+def _humanize(name: str) -> str:
+    # order_items / orderItems → "order items"
+    name = re.sub(r"([a-z])([A-Z])", r"\1 \2", name)
+    return name.replace("_", " ")
+
+
+def _neighbours(snapshot: SchemaSnapshot) -> dict[str, set[str]]:
+    """
+    ຄວາມສຳພັນລະຫວ່າງ tables (2 ທິດທາງ) ຈາກ Foreign Keys
+    ຖ້າບໍ່ມີ FK ປະກາດໄວ້ ຈະເດົາຈາກຊື່ column ແບບ <table>_id
+    """
+    graph: dict[str, set[str]] = {name: set() for name in snapshot.tables}
+
+    def link(a: str, b: str):
+        if a != b and a in graph and b in graph:
+            graph[a].add(b)
+            graph[b].add(a)
+
+    lowered = {name.lower(): name for name in snapshot.tables}
+    for table in snapshot.tables.values():
+        for fk in table.foreign_keys:
+            link(table.name, fk.ref_table)
+        if table.foreign_keys:
+            continue
+        for col in table.columns:
+            col_name = col.name.lower()
+            if not col_name.endswith("_id"):
+                continue
+            stem = col_name[:-3]
+            for candidate in (stem, f"{stem}s", f"{stem}es", f"{stem[:-1]}ies" if stem.endswith("y") else None):
+                if candidate and candidate in lowered:
+                    link(table.name, lowered[candidate])
+                    break
+    return graph
+
+
+class SchemaIndex:
+    """
+    Index ຂອງ fields ໃນ Schema (table / column) ສຳລັບຄົ້ນຫາດ້ວຍ Cosine Similarity
+    """
+
+    def __init__(self, snapshot: SchemaSnapshot, sample_values: dict[tuple[str, str], list[str]] | None = None):
+        self.fingerprint = snapshot.fingerprint
+        self.snapshot = snapshot
+        self.neighbours = _neighbours(snapshot)
+        self.full_tokens = estimate_tokens(snapshot.schema_text)
+        self._embedder = get_embedder()
+
+        sample_values = sample_values or {}
+        documents: list[str] = []
+        owners: list[str] = []
+        for table in snapshot.tables.values():
+            documents.append(normalize_question(f"{_humanize(table.name)} {table.comment}"))
+            owners.append(table.name)
+            for col in table.columns:
+                samples = " ".join(sample_values.get((table.name, col.name), []))
+                documents.append(normalize_question(f"{_humanize(col.name)} {col.comment} {samples}"))
+                owners.append(table.name)
+
+        self._owners = np.array(owners)
+        self._table_names = list(snapshot.tables)
+
+        vectors = self._embedder.embed(documents) if documents else np.zeros((0, self._embedder.dim), dtype=np.float32)
+        doc_freq = (vectors > 0).sum(axis=0)
+        self._idf = np.log((1.0 + len(documents)) / (1.0 + doc_freq)).astype(np.float32) + 1.0
+        weighted = vectors * self._idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._matrix = weighted / norms
+
+    def score_tables(self, question: str) -> dict[str, float]:
+        """
+        ຄະແນນຂອງແຕ່ລະ table = similarity ສູງສຸດຂອງ field ໃນ table ນັ້ນ
+        """
+        query = self._embedder.embed_one(normalize_question(question)) * self._idf
+        norm = np.linalg.norm(query)
+        if norm == 0 or not len(self._matrix):
+            return {name: 0.0 for name in self._table_names}
+        field_scores = self._matrix @ (query / norm)
+        return {
+            name: float(field_scores[self._owners == name].max(initial=0.0))
+            for name in self._table_names
+        }
+
+    def select(self, question: str, top_k: int | None = None, min_score: float | None = None) -> TableSelection:
+        """
+        ເລືອກ tables ທີ່ກ່ຽວຂ້ອງ (top-k + FK neighbours)
+
+        Args:
+            question: ຄຳຖາມຂອງຜູ້ໃຊ້
+            top_k: ຈຳນວນ tables ສູງສຸດ (default: SCHEMA_SELECT_TOP_K ຫຼື 5)
+            min_score: ຄະແນນຕ່ຳສຸດ (default: SCHEMA_SELECT_MIN_SCORE ຫຼື 0.15)
+
+        Returns:
+            TableSelection: tables ທີ່ເລືອກ ແລະ schema text
+        """
+        top_k = top_k or int(os.getenv("SCHEMA_SELECT_TOP_K", "5"))
+        min_score = min_score if min_score is not None else float(os.getenv("SCHEMA_SELECT_MIN_SCORE", "0.15"))
+
+        scores = self.score_tables(question)
+        ranked = [name for name in sorted(scores, key=scores.get, reverse=True) if scores[name] >= min_score]
+
+        if not ranked or len(self._table_names) <= top_k:
+            # ຄຳຖາມບໍ່ກົງກັບ table ໃດເລີຍ ຫຼື Schema ນ້ອຍຢູ່ແລ້ວ → ສົ່ງ Schema ເຕັມ
+            return TableSelection(
+                tables=tuple(self._table_names),
+                schema_text=self.snapshot.schema_text,
+                full_tokens=self.full_tokens,
+                selected_tokens=self.full_tokens,
+                fallback=True,
+                scores=scores,
+            )
+
+        selected = list(ranked[:top_k])
+        for name in list(selected):
+            for neighbour in sorted(self.neighbours.get(name, ())):
+                if neighbour not in selected:
+                    selected.append(neighbour)
+
+        schema_text = self.snapshot.schema_text_for(selected)
+        return TableSelection(
+            tables=tuple(selected),
+            schema_text=schema_text,
+            full_tokens=self.full_tokens,
+            selected_tokens=estimate_tokens(schema_text),
+            fallback=False,
+            scores=scores,
+        )
+
+
+def _fetch_sample_values(snapshot: SchemaSnapshot, per_column: int) -> dict[tuple[str, str], list[str]]:
+    """
+    ດຶງຕົວຢ່າງຄ່າຂອງ column ຂໍ້ຄວາມ (ເຊັ່ນ ຊື່ສິນຄ້າ, ແຂວງ) ເພື່ອໃຫ້ຄຳຖາມພາສາລາວ
+    ຈັບຄູ່ກັບ table ທີ່ມີຊື່ column ເປັນພາສາອັງກິດໄດ້
+    """
+    samples: dict[tuple[str, str], list[str]] = {}
+    with get_pooled_connection() as connection:
+        cursor = connection.cursor()
+        try:
+            for table in snapshot.tables.values():
+                for col in table.columns:
+                    if col.data_type.lower() not in _TEXT_TYPES:
+                        continue
+                    cursor.execute(
+                        f"SELECT DISTINCT `{col.name}` FROM `{snapshot.schema_name}`.`{table.name}` "
+                        f"WHERE `{col.name}` IS NOT NULL LIMIT {int(per_column)}"
+                    )
+                    samples[(table.name, col.name)] = [str(row[0]) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    return samples
+
+
+_index: SchemaIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_schema_index(snapshot: SchemaSnapshot) -> SchemaIndex:
+    """
+    ດຶງ SchemaIndex ຂອງ snapshot ນີ້ (ສ້າງໃໝ່ສະເພາະເມື່ອ Schema fingerprint ປ່ຽນ)
+
+    ຕັ້ງ SCHEMA_INDEX_SAMPLE_VALUES=N ເພື່ອລວມຕົວຢ່າງຄ່າ N ຄ່າຕໍ່ column ຂໍ້ຄວາມເຂົ້າ Index
+
+    Returns:
+        SchemaIndex: Index instance
+    """
+    global _index
+    index = _index
+    if index is not None and index.fingerprint == snapshot.fingerprint:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.fingerprint != snapshot.fingerprint:
+            per_column = int(os.getenv("SCHEMA_INDEX_SAMPLE_VALUES", "0"))
+            sample_values = None
+            if per_column > 0:
+                try:
+                    sample_values = _fetch_sample_values(snapshot, per_column)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not fetch sample values for schema index: {e}")
+            _index = SchemaIndex(snapshot, sample_values)
+            logger.info(f"🗂️ Schema index built: {len(snapshot.tables)} tables")
+        return _index
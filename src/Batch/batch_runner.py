@@ -0,0 +1,387 @@
+"""
+batch_runner.py - Run ຄຳຖາມຈຳນວນຫຼາຍແບບ offline (ເຊັ່ນ Chart ຂອງລາຍງານປະຈຳຄືນ)
+
+ອ່ານຄຳຖາມຈາກ JSONL ແລ້ວ run get_agent_app() ດ້ວຍ worker pool ທີ່ຈຳກັດຈຳນວນ:
+- Input: ໜຶ່ງ JSON ຕໍ່ແຖວ; id ຈາກ "id" ຫຼື "request_id" (ບໍ່ມີ → ເລກແຖວ),
+  ຄຳຖາມຈາກ "question", "body" ຫຼື "title" (ໃຊ້ຮູບແບບດຽວກັບ requests.jsonl ໄດ້)
+- Workers ໃຊ້ Schema catalog/index, DB pool, SQL/Result cache ແລະ ArtifactStore
+  ຮ່ວມກັນ (singletons ຂອງ Process) → ໂຫຼດ Schema ຄັ້ງດຽວກ່ອນເລີ່ມ
+- LLM calls ໃຊ້ priority "batch" ໃນ LLMScheduler (ຄຳຖາມຂອງຜູ້ໃຊ້ໃນ UI ໄດ້ຄິວກ່ອນ)
+- Concurrency ປັບຕາມ Rate limit ຂອງ LLM: ເມື່ອ 429 ຍັງຫຼຸດລອດ Scheduler ມາ ຈະຫຼຸດຈຳນວນ
+  workers ທີ່ run ພ້ອມກັນລົງເຄິ່ງໜຶ່ງ, ຢຸດຊົ່ວຄາວ (backoff + jitter) ແລ້ວລອງຄຳຖາມນັ້ນໃໝ່;
+  ເມື່ອສຳເລັດຕິດຕໍ່ກັນຈຶ່ງຄ່ອຍເພີ່ມຄືນ
+- Resume: ຄຳຖາມທີ່ມີ status "ok" ໃນ output ແລ້ວຖືກຂ້າມ (--retry-failed ບໍ່ມີຜົນກັບ "ok")
+- Output: ໜຶ່ງ JSON ຕໍ່ຄຳຖາມ (SQL, ຈຳນວນແຖວ, path ຂອງ Chart, cache hits, ເວລາຂອງແຕ່ລະ node)
+  ຂຽນຕໍ່ທ້າຍ file ທັນທີທີ່ແຕ່ລະຄຳຖາມສຳເລັດ
+
+Usage:
+    python -m src.Batch.batch_runner --input questions.jsonl --output .cache/batch/nightly.jsonl --workers 8
+    python -m src.Batch.batch_runner --input questions.jsonl --output .cache/batch/nightly.jsonl --retry-failed
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from loguru import logger
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+DEFAULT_OUTPUT_DIR = ROOT / ".cache" / "batch"
+
+# Nodes ກືນ Exception ແລ້ວສົ່ງ Error ເປັນ Text → ກວດ Rate limit ຈາກ Text
+_RATE_LIMIT_RE = re.compile(r"\b429\b|rate.?limit|too many requests", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    """
+    ຄຳຖາມໜຶ່ງຂໍ້ໃນ Batch
+    """
+    id: str
+    question: str
+
+
+def load_items(path: Path) -> list[BatchItem]:
+    """
+    ອ່ານຄຳຖາມຈາກ JSONL (ແຖວວ່າງຖືກຂ້າມ)
+
+    Raises:
+        ValueError: JSON ຜິດຮູບແບບ, ບໍ່ມີຄຳຖາມ ຫຼື id ຊ້ຳກັນ
+    """
+    items = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})") from e
+            question = next(
+                (str(record[key]).strip() for key in ("question", "body", "title") if record.get(key)),
+                "",
+            )
+            if not question:
+                raise ValueError(f"{path}:{line_no}: no question/body/title")
+            item_id = str(record.get("id") or record.get("request_id") or f"line-{line_no}")
+            if item_id in seen:
+                raise ValueError(f"{path}:{line_no}: duplicate id '{item_id}'")
+            seen.add(item_id)
+            items.append(BatchItem(id=item_id, question=question))
+    return items
+
+
+def load_finished(path: Path, retry_failed: bool) -> set[str]:
+    """
+    ids ທີ່ບໍ່ຕ້ອງ run ຊ້ຳ (ສຳເລັດແລ້ວ; ລວມທັງທີ່ລົ້ມເຫຼວຖ້າບໍ່ໄດ້ໃຊ້ --retry-failed)
+    """
+    finished = set()
+    if not path.exists():
+        return finished
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # ແຖວສຸດທ້າຍທີ່ຂຽນບໍ່ທັນແລ້ວ (process ຖືກ kill) → run ຄຳຖາມນັ້ນໃໝ່
+                continue
+            if record.get("status") == "ok" or not retry_failed:
+                finished.add(str(record.get("id")))
+    return finished
+
+
+class AdaptiveLimiter:
+    """
+    ຈຳກັດຈຳນວນຄຳຖາມທີ່ run ພ້ອມກັນແບບ AIMD (thread-safe)
+
+    - Rate limit → limit ຫຼຸດລົງເຄິ່ງໜຶ່ງ ແລະ ທຸກ worker ຢຸດລໍ backoff (exponential + jitter)
+    - ສຳເລັດຄົບ limit ຄຳຖາມຕິດຕໍ່ກັນ → limit ເພີ່ມຂຶ້ນ 1 (ບໍ່ເກີນ max_limit)
+    """
+
+    def __init__(self, max_limit: int, base_backoff: float = 2.0, max_backoff: float = 60.0):
+        self.max_limit = max_limit
+        self.limit = max_limit
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._in_flight = 0
+        self._successes = 0
+        self._strikes = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self.rate_limited = 0
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait <= 0 and self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, rate_limited: bool = False):
+        with self._cond:
+            self._in_flight -= 1
+            if rate_limited:
+                self.rate_limited += 1
+                self._successes = 0
+                self._strikes += 1
+                self.limit = max(1, self.limit // 2)
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** (self._strikes - 1))
+                self._paused_until = max(self._paused_until, time.monotonic() + backoff * random.uniform(0.5, 1.0))
+                logger.warning(f"🐢 LLM rate limited: concurrency → {self.limit}, pausing {backoff:.1f}s")
+            else:
+                self._strikes = 0
+                self._successes += 1
+                if self.limit < self.max_limit and self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._cond.notify_all()
+
+
+def warm_up(workers: int):
+    """
+    ໂຫຼດ Schema catalog/index ແລະ DB pool ກ່ອນເລີ່ມ workers (ບໍ່ໃຫ້ workers ໂຫຼດພ້ອມກັນ)
+    """
+    from src.Agent.table_selector import get_schema_index
+    from src.DB.db_config import get_db_pool
+    from src.DB.schema_catalog import get_schema_catalog
+
+    snapshot = get_schema_catalog().get_snapshot()
+    get_schema_index(snapshot)
+    pool = get_db_pool()
+    logger.info(f"📚 Schema ready: {len(snapshot.tables)} tables (fingerprint {snapshot.fingerprint[:12]})")
+    if pool.max_size < workers:
+        logger.warning(
+            f"⚠️ DB_POOL_MAX_SIZE={pool.max_size} < --workers {workers}: workers will queue for connections"
+        )
+
+
+def _error_of(state: dict) -> str | None:
+    sql_script = state.get("sql_script") or ""
+    if not sql_script.strip():
+        return "No SQL generated"
+    if sql_script.lstrip().startswith("-- Error"):
+        return sql_script.strip().removeprefix("-- ")
+    error = (state.get("sql_result") or {}).get("error")
+    if error:
+        return str(error)
+    if not state.get("chart_artifact"):
+        return state.get("final_report") or "No chart generated"
+    return None
+
+
+def _trace_timings(trace_id: str | None) -> tuple[dict, dict]:
+    """
+    ເວລາລວມຂອງແຕ່ລະ node (ms) ແລະ tokens ຂອງ LLM ຈາກ trace ຂອງຄຳຖາມ
+    """
+    from src.Tracing.tracer import get_trace
+
+    trace = get_trace(trace_id) if trace_id else None
+    if trace is None:
+        return {}, {}
+    nodes: dict[str, float] = {}
+    tokens = {"prompt": 0, "completion": 0}
+    for item in trace.spans:
+        if item.name.startswith("node."):
+            name = item.name.removeprefix("node.")
+            nodes[name] = round(nodes.get(name, 0.0) + item.duration_ms, 2)
+        tokens["prompt"] += int(item.attributes.get("llm.prompt_tokens", 0))
+        tokens["completion"] += int(item.attributes.get("llm.completion_tokens", 0))
+    return nodes, tokens
+
+
+def run_item(item: BatchItem) -> dict:
+    """
+    Run ຄຳຖາມດຽວຜ່ານ Pipeline ເຕັມ ແລ້ວສ້າງ record ຂອງ output
+    """
+    from src.Agent.builder import get_agent_app
+    from src.Model_Provider.llm_scheduler import PRIORITY_BATCH, request_priority
+    from src.Tracing.tracer import current_trace_id, span
+
+    started = time.perf_counter()
+    trace_id = None
+    try:
+        with request_priority(PRIORITY_BATCH), span("batch.question", question_id=item.id):
+            trace_id = current_trace_id()
+            state = get_agent_app().invoke({"question": item.question, "messages": []})
+        error = _error_of(state)
+    except Exception as e:
+        state = {}
+        error = f"{type(e).__name__}: {e}"
+    total_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    sql_result = state.get("sql_result") or {}
+    artifact = state.get("chart_artifact") or {}
+    nodes, tokens = _trace_timings(trace_id)
+    return {
+        "id": item.id,
+        "question": item.question,
+        "status": "error" if error else "ok",
+        "error": error,
+        "sql_script": state.get("sql_script"),
+        "sql_model": state.get("sql_model") or None,
+        "row_count": sql_result.get("row_count"),
+        "truncated": bool(sql_result.get("truncated")),
+        "chart_path": artifact.get("path"),
+        "chart_reused": bool(artifact.get("reused")),
+        "sql_cache_hit": bool(state.get("sql_cache_hit")),
+        "result_cache_hit": bool(sql_result.get("cache_hit")),
+        "sql_repair_attempts": state.get("sql_repair_attempts", 0),
+        "timings_ms": {"total": total_ms, "nodes": nodes},
+        "llm_tokens": tokens,
+        "trace_id": trace_id,
+        "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def is_rate_limited(record: dict) -> bool:
+    return bool(record.get("error")) and bool(_RATE_LIMIT_RE.search(record["error"]))
+
+
+def run_with_retries(item: BatchItem, limiter: AdaptiveLimiter, max_retries: int) -> dict:
+    """
+    Run ຄຳຖາມ; ຖ້າຖືກ Rate limit ລອງໃໝ່ (ສູງສຸດ max_retries ຄັ້ງ) ຫຼັງ backoff ຂອງ limiter
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        limiter.acquire()
+        record = None
+        try:
+            record = run_item(item)
+        finally:
+            limiter.release(rate_limited=record is not None and is_rate_limited(record))
+        record["attempts"] = attempt
+        if not is_rate_limited(record) or attempt > max_retries:
+            return record
+        logger.info(f"🔁 {item.id}: rate limited, retrying (attempt {attempt + 1})")
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def run_batch(items: list[BatchItem], output: Path, workers: int, max_retries: int) -> dict:
+    """
+    Run ທຸກຄຳຖາມດ້ວຍ worker pool ແລະ ຂຽນຜົນຕໍ່ທ້າຍ output ທັນທີທີ່ແຕ່ລະຄຳຖາມສຳເລັດ
+
+    Returns:
+        dict: ສະຫຼຸບ (ok, failed, throughput, p50/p95, ຄິວຂອງ LLMScheduler)
+    """
+    from src.Model_Provider.llm_scheduler import get_llm_scheduler
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    limiter = AdaptiveLimiter(workers)
+    write_lock = threading.Lock()
+    latencies = []
+    counts = {"ok": 0, "error": 0}
+    started = time.perf_counter()
+
+    with open(output, "a", encoding="utf-8") as out, ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="batch"
+    ) as executor:
+        futures = {executor.submit(run_with_retries, item, limiter, max_retries): item for item in items}
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            with write_lock:
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+            counts[record["status"]] += 1
+            latencies.append(record["timings_ms"]["total"])
+            status = "✅" if record["status"] == "ok" else f"❌ {record['error'][:120]}"
+            logger.info(
+                f"[{done}/{len(items)}] {record['id']} {record['timings_ms']['total']:.0f}ms "
+                f"rows={record['row_count']} {status}"
+            )
+
+    elapsed = time.perf_counter() - started
+    scheduler = get_llm_scheduler().stats()
+    return {
+        "ok": counts["ok"],
+        "failed": counts["error"],
+        "rate_limited": limiter.rate_limited + scheduler["rate_limited"],
+        "llm_max_queue_depth": max((m["max_queue_depth"] for m in scheduler["models"].values()), default=0),
+        "llm_p95_wait_ms": max((m["p95_wait_ms"] for m in scheduler["models"].values()), default=0.0),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_min": round(len(items) / elapsed * 60, 2) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run questions from JSONL through the chart agent in parallel")
+    parser.add_argument("--input", type=Path, required=True, help="JSONL ຂອງຄຳຖາມ (question/body/title)")
+    parser.add_argument(
+        "--output", type=Path, default=None,
+        help=f"JSONL ຂອງຜົນລັບ (default: {DEFAULT_OUTPUT_DIR}/<input>.results.jsonl)",
+    )
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BATCH_WORKERS", "4")))
+    parser.add_argument("--max-retries", type=int, default=3, help="ຈຳນວນຄັ້ງທີ່ລອງໃໝ່ເມື່ອຖືກ Rate limit")
+    parser.add_argument("--retry-failed", action="store_true", help="run ຄຳຖາມທີ່ລົ້ມເຫຼວໃນ output ເດີມຄືນ")
+    parser.add_argument("--limit", type=int, default=None, help="run ສະເພາະ N ຄຳຖາມທຳອິດທີ່ຍັງບໍ່ສຳເລັດ")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.output is None:
+        args.output = DEFAULT_OUTPUT_DIR / f"{args.input.stem}.results.jsonl"
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level="DEBUG" if args.verbose else "WARNING",
+        filter=lambda record: record["name"] != __name__,
+    )
+    logger.add(sys.stderr, level="INFO", filter=lambda record: record["name"] == __name__)
+
+    items = load_items(args.input)
+    finished = load_finished(args.output, args.retry_failed)
+    pending = [item for item in items if item.id not in finished]
+    skipped = len(items) - len(pending)
+    if args.limit is not None:
+        pending = pending[: args.limit]
+    logger.info(
+        f"📋 {len(items)} questions: {skipped} already done, "
+        f"{len(pending)} to run with {args.workers} workers → {args.output}"
+    )
+    if not pending:
+        return 0
+
+    warm_up(args.workers)
+    summary = run_batch(pending, args.output, args.workers, args.max_retries)
+    logger.info(
+        f"🏁 ok={summary['ok']} failed={summary['failed']} rate_limited={summary['rate_limited']} "
+        f"in {summary['elapsed_s']:.1f}s ({summary['throughput_per_min']:.1f}/min) "
+        f"p50={summary['p50_ms']:.0f}ms p95={summary['p95_ms']:.0f}ms "
+        f"llm_queue max={summary['llm_max_queue_depth']} p95_wait={summary['llm_p95_wait_ms']:.0f}ms"
+    )
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
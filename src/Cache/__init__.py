@@ -0,0 +1 @@
+# Cache Package
@@ -0,0 +1,257 @@
+"""
+artifact_store.py - ບ່ອນເກັບ Chart HTML ແບບ Content-addressed (ແທນ write_chart_file)
+
+- ຊື່ file = sha256 ຂອງເນື້ອໃນ → Chart ທີ່ເນື້ອໃນຄືກັນເກັບພຽງ file ດຽວ
+- Request key = hash ຂອງ (ຄຳຖາມ, SQL, fingerprint ຂອງຜົນລັບ) → ຄຳຖາມເດີມທີ່ຜົນລັບ
+  ບໍ່ປ່ຽນ ໄດ້ Chart ຈາກ disk ທັນທີ ໂດຍບໍ່ຮຽກ LLM
+- Index (keys → content hash, ຂະໜາດ, ເວລາໃຊ້ລ່າສຸດ) ເກັບໃນ SQLite ຂ້າງ files
+  (default: .cache/charts ແທນ src/Agent/Display ເດີມ)
+- Quota: ເມື່ອຂະໜາດລວມເກີນ ARTIFACT_STORE_MAX_BYTES ລຶບ file ທີ່ບໍ່ໄດ້ໃຊ້ດົນທີ່ສຸດ
+
+ຜົນລັບເປັນ ChartArtifact (path, size, content_hash) ແທນ String ສະຖານະ
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from loguru import logger
+
+
+DEFAULT_ARTIFACT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".cache", "charts"
+)
+
+
+@dataclass(frozen=True)
+class ChartArtifact:
+    """
+    Chart HTML ທີ່ເກັບໃນ Store
+
+    Attributes:
+        path: Absolute path ຂອງ HTML file
+        size: ຂະໜາດ (bytes)
+        content_hash: sha256 ຂອງເນື້ອໃນ (ເປັນຊື່ file)
+        key: Request key (question, SQL, result fingerprint)
+        reused: True ຖ້າໄດ້ຈາກ Store ໂດຍບໍ່ໄດ້ສ້າງໃໝ່
+    """
+    path: str
+    size: int
+    content_hash: str
+    key: str
+    reused: bool = False
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def result_fingerprint(sql_result: dict) -> str:
+    """
+    Hash ຂອງເນື້ອໃນ sql_result (ຜົນລັບທີ່ spill ແລ້ວ hash ຈາກ Arrow file ເຕັມ)
+    """
+    digest = hashlib.sha256()
+    header = {
+        "columns": sql_result.get("columns") or [],
+        "row_count": sql_result.get("row_count", 0),
+        "truncated": bool(sql_result.get("truncated")),
+    }
+    digest.update(json.dumps(header, ensure_ascii=False).encode("utf-8"))
+    spill_path = sql_result.get("spill_path")
+    if spill_path and os.path.exists(spill_path):
+        with open(spill_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    else:
+        data = sql_result.get("data") or {}
+        for col in header["columns"]:
+            digest.update(json.dumps(data.get(col, []), ensure_ascii=False, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def chart_artifact_key(question: str, sql_script: str, sql_result: dict) -> str:
+    raw = f"{question or ''}\x1f{sql_script or ''}\x1f{result_fingerprint(sql_result)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ArtifactStore:
+    """
+    Store ຂອງ Chart HTML ພ້ອມ Index ໃນ SQLite (thread-safe)
+    """
+
+    def __init__(self, directory: str | None = None, max_bytes: int | None = None):
+        self.directory = directory or os.getenv("ARTIFACT_STORE_DIR", DEFAULT_ARTIFACT_DIR)
+        self.max_bytes = max_bytes or int(os.getenv("ARTIFACT_STORE_MAX_BYTES", str(200 * 1024 * 1024)))
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._conn = sqlite3.connect(os.path.join(self.directory, "artifacts.sqlite3"), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    content_hash TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS artifact_keys (
+                    request_key TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_artifacts_last_access ON artifacts(last_access)"
+            )
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, f"chart_{content_hash}.html")
+
+    def get(self, key: str) -> ChartArtifact | None:
+        """
+        ຊອກຫາ Chart ຂອງ request key ນີ້ (file ທີ່ຖືກລຶບໄປແລ້ວຖືກລ້າງອອກຈາກ Index)
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                """
+                SELECT a.content_hash, a.size FROM artifact_keys k
+                JOIN artifacts a ON a.content_hash = k.content_hash
+                WHERE k.request_key = ?
+                """,
+                (key,),
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+
+            content_hash, size = row
+            path = self._path(content_hash)
+            if not os.path.exists(path):
+                self._delete(content_hash)
+                self._misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE artifacts SET last_access = ? WHERE content_hash = ?", (time.time(), content_hash)
+            )
+            self._hits += 1
+        return ChartArtifact(path=path, size=size, content_hash=content_hash, key=key, reused=True)
+
+    def put(self, key: str, content: str) -> ChartArtifact:
+        """
+        ບັນທຶກ Chart HTML (ເນື້ອໃນທີ່ມີຢູ່ແລ້ວບໍ່ຖືກຂຽນຊ້ຳ) ແລະ ລຶບ files ເກົ່າຖ້າເກີນ Quota
+
+        Raises:
+            OSError: ຂຽນ file ບໍ່ໄດ້
+        """
+        payload = content.encode("utf-8")
+        content_hash = hashlib.sha256(payload).hexdigest()
+        path = self._path(content_hash)
+        now = time.time()
+
+        with self._lock, self._conn:
+            exists = os.path.exists(path)
+            if not exists:
+                # ຂຽນໃສ່ file ຊົ່ວຄາວກ່ອນ ແລ້ວ rename (ຜູ້ອ່ານບໍ່ເຫັນ file ທີ່ຂຽນບໍ່ທັນແລ້ວ)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            self._conn.execute(
+                """
+                INSERT INTO artifacts (content_hash, size, created_at, last_access)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(content_hash) DO UPDATE SET last_access = excluded.last_access
+                """,
+                (content_hash, len(payload), now, now),
+            )
+            self._conn.execute(
+                """
+                INSERT INTO artifact_keys (request_key, content_hash) VALUES (?, ?)
+                ON CONFLICT(request_key) DO UPDATE SET content_hash = excluded.content_hash
+                """,
+                (key, content_hash),
+            )
+            self._enforce_quota(keep=content_hash)
+
+        if exists:
+            logger.info(f"♻️ Chart content already stored: {os.path.basename(path)}")
+        return ChartArtifact(path=path, size=len(payload), content_hash=content_hash, key=key, reused=exists)
+
+    def _delete(self, content_hash: str):
+        self._conn.execute("DELETE FROM artifact_keys WHERE content_hash = ?", (content_hash,))
+        self._conn.execute("DELETE FROM artifacts WHERE content_hash = ?", (content_hash,))
+        try:
+            os.remove(self._path(content_hash))
+        except FileNotFoundError:
+            pass
+
+    def _enforce_quota(self, keep: str):
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT content_hash, size FROM artifacts WHERE content_hash != ? ORDER BY last_access ASC",
+            (keep,),
+        ).fetchall()
+        removed = 0
+        for content_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._delete(content_hash)
+            total -= size
+            removed += 1
+        self._evictions += removed
+        if removed:
+            logger.info(f"🧹 Artifact store over quota: removed {removed} least recently used charts")
+
+    def stats(self) -> dict:
+        """
+        ສະຖິຕິຂອງ Store (hits/misses ນັບຕັ້ງແຕ່ process ເລີ່ມ)
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts"
+            ).fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "artifacts": count,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+_artifact_store: ArtifactStore | None = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """
+    ດຶງ ArtifactStore ທີ່ໃຊ້ຮ່ວມກັນທັງ Process
+
+    Returns:
+        ArtifactStore: Store instance
+    """
+    global _artifact_store
+    if _artifact_store is None:
+        with _artifact_store_lock:
+            if _artifact_store is None:
+                _artifact_store = ArtifactStore()
+    return _artifact_store
@@ -0,0 +1,340 @@
+"""
+result_cache.py - Cache ຜົນລັບຂອງ SQL ທີ່ execute ແລ້ວ (in-memory, LRU ຕາມຂະໜາດ)
+
+Dashboard ມັກ run SELECT ດຽວກັນຊ້ຳຫຼາຍຄັ້ງ → ເກັບຜົນລັບໄວ້ແທນການ Query MariaDB ໃໝ່
+
+Key = SQL ທີ່ normalize ແລ້ວ (sqlglot) + row/byte cap ປັດຈຸບັນ
+ຂໍ້ມູນເກັບເປັນ Arrow Table (columnar, ກະທັດຮັດກວ່າ list ຂອງ Python objects);
+ຜົນລັບທີ່ spill ແລ້ວເກັບພຽງ preview + spill_path.
+
+Invalidation ຕໍ່ table:
+- ແຕ່ລະ entry ຈື່ version ຂອງທຸກ table ທີ່ SQL ອ້າງເຖິງ
+  (CREATE_TIME|UPDATE_TIME ຈາກ INFORMATION_SCHEMA.TABLES)
+- Versions ຖືກດຶງໃໝ່ດ້ວຍ Query ດຽວ ຢ່າງຫຼາຍທຸກໆ RESULT_CACHE_CHECK_INTERVAL ວິນາທີ;
+  table ທີ່ version ປ່ຽນ → ລຶບທຸກ entries ທີ່ໃຊ້ table ນັ້ນ
+- UPDATE_TIME ອາດເປັນ NULL (InnoDB ຫຼັງ restart) → ອີງໃສ່ RESULT_CACHE_TTL ແທນ
+
+Eviction: LRU ເມື່ອຂະໜາດລວມເກີນ RESULT_CACHE_MAX_BYTES
+
+ປິດໄດ້ດ້ວຍ RESULT_CACHE_ENABLED=0
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pyarrow as pa
+import sqlglot
+from loguru import logger
+from sqlglot.errors import SqlglotError
+
+from src.DB.db_config import get_pooled_connection
+from src.DB.schema_catalog import SCHEMA_NAME
+from src.Tracing.tracer import add_metric
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Keys ຂອງ sql_result ທີ່ບໍ່ແມ່ນຂໍ້ມູນ (ເກັບໄວ້ກັບ entry ຕາມເດີມ)
+_META_KEYS = ("row_count", "truncated", "spill_path", "warnings", "estimated_rows")
+
+
+def result_cache_enabled() -> bool:
+    return os.getenv("RESULT_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Normalize SQL ເພື່ອໃຊ້ເປັນ Cache Key (ຍະຫວ່າງ, ຕົວພິມ keyword, ; ທ້າຍ)
+
+    SQL ທີ່ sqlglot parse ບໍ່ໄດ້ຈະຖືກຍຸບຍະຫວ່າງຢ່າງດຽວ
+    """
+    text = (sql or "").strip().rstrip(";").strip()
+    try:
+        return sqlglot.transpile(text, read="mysql", write="mysql")[0]
+    except (SqlglotError, IndexError):
+        return _WHITESPACE_RE.sub(" ", text)
+
+
+@dataclass
+class _Entry:
+    """
+    ຜົນລັບໜຶ່ງທີ່ Cache ໄວ້
+    """
+    columns: list[str]
+    table: pa.Table
+    meta: dict
+    tables: tuple[str, ...]
+    versions: dict[str, str]
+    created_at: float
+    nbytes: int
+    hits: int = 0
+
+
+class ResultCache:
+    """
+    Cache ຂອງຜົນລັບ SQL ແບບ in-memory (thread-safe)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+        check_interval: float | None = None,
+        schema_name: str = SCHEMA_NAME,
+    ):
+        self.max_bytes = (
+            max_bytes if max_bytes is not None
+            else int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        )
+        # entry ດຽວໃຊ້ budget ໄດ້ບໍ່ເກີນ 1/4 (ບໍ່ໃຫ້ຜົນລັບໃຫຍ່ອັນດຽວໄລ່ອັນອື່ນອອກໝົດ)
+        self.max_entry_bytes = self.max_bytes // 4
+        self.ttl = ttl if ttl is not None else float(os.getenv("RESULT_CACHE_TTL", "300"))
+        self.check_interval = (
+            check_interval if check_interval is not None
+            else float(os.getenv("RESULT_CACHE_CHECK_INTERVAL", "5"))
+        )
+        self.schema_name = schema_name
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_table: dict[str, set[str]] = {}
+        self._bytes = 0
+
+        self._versions: dict[str, str] = {}
+        self._versions_checked = 0.0
+        self._versions_lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def make_key(sql: str) -> str:
+        caps = f"{os.getenv('SQL_MAX_ROWS', '100000')}\x1f{os.getenv('SQL_MAX_BYTES', str(64 * 1024 * 1024))}"
+        raw = f"{normalize_sql(sql)}\x1f{caps}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Table versions (INFORMATION_SCHEMA.TABLES)
+    # ------------------------------------------------------------------
+
+    def table_versions(self, tables) -> dict[str, str]:
+        """
+        Version ປັດຈຸບັນຂອງ tables ທີ່ SQL ໃຊ້ (ດຶງຈາກ DB ຢ່າງຫຼາຍທຸກ check_interval ວິນາທີ)
+
+        ຄວນຮຽກ *ກ່ອນ* execute ແລ້ວສົ່ງຄ່ານີ້ໃຫ້ put() ເພື່ອໃຫ້ການຂຽນທີ່ເກີດລະຫວ່າງ
+        Query ເຮັດໃຫ້ entry ໝົດອາຍຸ (ບໍ່ແມ່ນຖືກນັບວ່າໃໝ່)
+
+        Returns:
+            dict: {table: "CREATE_TIME|UPDATE_TIME"}
+        """
+        if time.time() - self._versions_checked >= self.check_interval:
+            with self._versions_lock:
+                if time.time() - self._versions_checked >= self.check_interval:
+                    self._refresh_versions()
+        current = self._versions
+        return {table: current.get(table, "") for table in tables}
+
+    def _refresh_versions(self):
+        with get_pooled_connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(
+                    """
+                    SELECT TABLE_NAME, CREATE_TIME, UPDATE_TIME
+                    FROM INFORMATION_SCHEMA.TABLES
+                    WHERE TABLE_SCHEMA = ?
+                    """,
+                    (self.schema_name,),
+                )
+                versions = {
+                    name: f"{create_time}|{update_time}"
+                    for name, create_time, update_time in cursor.fetchall()
+                }
+                add_metric("db.round_trips")
+            finally:
+                cursor.close()
+
+        previous = self._versions
+        self._versions = versions
+        self._versions_checked = time.time()
+        if previous:
+            changed = [name for name in previous.keys() | versions.keys() if previous.get(name) != versions.get(name)]
+            if changed:
+                self.invalidate_tables(changed)
+
+    # ------------------------------------------------------------------
+    # Get / Put
+    # ------------------------------------------------------------------
+
+    def get(self, sql: str, versions: dict[str, str]) -> dict | None:
+        """
+        ຊອກຫາຜົນລັບຂອງ SQL ນີ້
+
+        Args:
+            sql: SQL ທີ່ຈະ execute
+            versions: ຈາກ table_versions()
+
+        Returns:
+            dict | None: sql_result (ມີ "cache_hit": True ແລະ "cache_age_s") ຫຼື None
+        """
+        key = self.make_key(sql)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                now - entry.created_at > self.ttl
+                or entry.versions != versions
+                or (entry.meta.get("spill_path") and not os.path.exists(entry.meta["spill_path"]))
+            ):
+                self._remove(key)
+                self._invalidations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self._hits += 1
+
+        data = entry.table.to_pydict()
+        return {
+            "columns": list(entry.columns),
+            "data": {col: data[col] for col in entry.columns},
+            **entry.meta,
+            "cache_hit": True,
+            "cache_age_s": round(now - entry.created_at, 1),
+        }
+
+    def put(self, sql: str, tables, versions: dict[str, str], sql_result: dict) -> bool:
+        """
+        ເກັບຜົນລັບທີ່ execute ສຳເລັດ
+
+        Args:
+            sql: SQL ທີ່ execute
+            tables: tables ທີ່ SQL ອ້າງເຖິງ
+            versions: ຈາກ table_versions() ທີ່ດຶງກ່ອນ execute
+            sql_result: ຜົນລັບແບບ columnar
+
+        Returns:
+            bool: True ຖ້າເກັບແລ້ວ (ຜົນລັບທີ່ໃຫຍ່ເກີນ ຫຼື type ປົນກັນຈະບໍ່ຖືກເກັບ)
+        """
+        if sql_result.get("error") or self.max_bytes <= 0:
+            return False
+        columns = list(sql_result.get("columns") or [])
+        try:
+            table = pa.Table.from_arrays(
+                [pa.array(sql_result["data"].get(col, [])) for col in columns],
+                names=columns,
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Column ທີ່ type ປົນກັນ: ແປງເປັນ string ຈະເຮັດໃຫ້ຜົນລັບຕ່າງຈາກເດີມ → ບໍ່ Cache
+            logger.debug("🗃️ Result not cached (mixed column types)")
+            return False
+
+        nbytes = table.nbytes + len(sql)
+        if nbytes > self.max_entry_bytes:
+            logger.debug(f"🗃️ Result not cached ({nbytes // 1024} KB > entry limit)")
+            return False
+
+        key = self.make_key(sql)
+        entry = _Entry(
+            columns=columns,
+            table=table,
+            meta={k: sql_result[k] for k in _META_KEYS if k in sql_result},
+            tables=tuple(tables),
+            versions=dict(versions),
+            created_at=time.time(),
+            nbytes=nbytes,
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += nbytes
+            for name in entry.tables:
+                self._by_table.setdefault(name, set()).add(key)
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+        return True
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.nbytes
+        for name in entry.tables:
+            keys = self._by_table.get(name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[name]
+
+    # ------------------------------------------------------------------
+    # Invalidation / Stats
+    # ------------------------------------------------------------------
+
+    def invalidate_tables(self, tables):
+        """
+        ລຶບທຸກ entries ທີ່ອ້າງເຖິງ tables ເຫຼົ່ານີ້ (ເຊັ່ນ: ເມື່ອ UPDATE_TIME ປ່ຽນ)
+        """
+        with self._lock:
+            keys = set()
+            for name in tables:
+                keys |= self._by_table.get(name, set())
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+        if keys:
+            logger.info(f"🗑️ Result cache: {len(keys)} entries invalidated ({', '.join(sorted(tables))} changed)")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        ສະຖິຕິຂອງ Result Cache (ນັບຕັ້ງແຕ່ process ເລີ່ມ)
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+_result_cache: ResultCache | None = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """
+    ດຶງ ResultCache ທີ່ໃຊ້ຮ່ວມກັນທັງ Process
+
+    Returns:
+        ResultCache: Cache instance
+    """
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache()
+    return _result_cache
@@ -0,0 +1,265 @@
+"""
+semantic_cache.py - Cache ຄຳຖາມທີ່ຄວາມໝາຍໃກ້ຄຽງກັນ (Paraphrase)
+
+ເກັບ Vector ຂອງຄຳຖາມໄວ້ໃນ NumPy matrix ແລະ ຊອກຫາດ້ວຍ Cosine Similarity
+(TF-IDF ຂອງ character n-grams). ຖ້າ similarity ≥ SEMANTIC_CACHE_THRESHOLD
+ຈະໃຊ້ SQL ຂອງຄຳຖາມເດີມແທນການຮຽກ LLM.
+
+Similarity ຢ່າງດຽວແຍກຄຳຖາມທີ່ຕ່າງກັນພຽງຄຳດຽວບໍ່ໄດ້ ("ຍອດຂາຍແຕ່ລະແຂວງ" vs "ຍອດຂາຍແຕ່ລະສິນຄ້າ",
+"total sales by province" vs "total sales by product" ໄດ້ຄະແນນໃກ້ຄຽງກັບ paraphrase ແທ້),
+ຈຶ່ງຕ້ອງຜ່ານ guard ນຳ: ຕົວເລກ (ເຊັ່ນ: ປີ 2023 vs 2024, Top 5 vs Top 10) ແລະ entities
+(ຄຳພາສາອັງກິດທີ່ບໍ່ແມ່ນຄຳເຊື່ອມ ເຊັ່ນ ຊື່ column, ແລະ ຄຳພາສາລາວໃນ _LAO_ENTITIES ເຊັ່ນ ແຂວງ,
+ສິນຄ້າ, ປີນີ້, ສູງສຸດ) ຕ້ອງຄືກັນ. ສ່ວນອື່ນຂອງປະໂຫຍກ (ຄຳສຸພາບ, ລຳດັບຄຳ) ໃຫ້ threshold ຕັດສິນ.
+
+Threshold ຄ່າເລີ່ມຕົ້ນ (0.5) ເລືອກຈາກຊຸດຄູ່ຄຳຖາມພາສາລາວທີ່ຕິດປ້າຍໄວ້ໃນ
+benchmarks/semantic_pairs.py (python -m benchmarks.semantic_pairs): ບໍ່ມີ false positive,
+recall 0.75 (0.8 ເດີມ recall ພຽງ 0.12).
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from loguru import logger
+
+from src.Cache.sql_cache import SQLCache, get_sql_cache, normalize_question
+from src.Model_Provider.embeddings import get_embedder
+
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+_LATIN_TERM_RE = re.compile(r"[^\s\u0e80-\u0eff]+")
+
+# ຄຳທີ່ບໍ່ປ່ຽນຄວາມໝາຍຂອງຄຳຖາມ
+_STOPWORDS = {
+    "a", "all", "an", "and", "are", "by", "display", "each", "every", "for", "get", "give",
+    "how", "i", "in", "is", "list", "me", "of", "on", "per", "please", "show", "the",
+    "to", "want", "what", "which", "with",
+}
+_SYNONYMS = {"number": "count", "many": "count", "sum": "total"}
+
+# ຄຳພາສາລາວທີ່ປ່ຽນ SQL (dimension, measure, ຊ່ວງເວລາ, ທິດທາງ) → concept;
+# ພາສາລາວບໍ່ມີຍະຫວ່າງລະຫວ່າງຄຳ ຈຶ່ງຊອກແບບ substring ໂດຍຈັບຄຳທີ່ຍາວກວ່າກ່ອນ (ວັນທີ ກ່ອນ ວັນ)
+_LAO_ENTITIES = {
+    "ແຂວງ": "province", "ເມືອງ": "district", "ບ້ານ": "village", "ສາຂາ": "branch",
+    "ສິນຄ້າ": "product", "ລູກຄ້າ": "customer", "ພະນັກງານ": "employee", "ຜູ້ໃຊ້": "user",
+    "ປະເພດ": "category", "ໝວດ": "category", "ຄຳສັ່ງຊື້": "order", "ອໍເດີ": "order",
+    "ຍອດຂາຍ": "sales", "ລາຍຮັບ": "revenue", "ລາຍຈ່າຍ": "expense", "ກຳໄລ": "profit",
+    "ລາຄາ": "price", "ຈຳນວນ": "count", "ສະເລ່ຍ": "average",
+    "ສູງສຸດ": "max", "ຫຼາຍທີ່ສຸດ": "max", "ຫຼາຍສຸດ": "max",
+    "ຕ່ຳສຸດ": "min", "ໜ້ອຍທີ່ສຸດ": "min", "ໜ້ອຍສຸດ": "min", "ບໍ່": "not",
+    "ປີນີ້": "this_year", "ປີກາຍ": "last_year", "ເດືອນນີ້": "this_month",
+    "ເດືອນກ່ອນ": "last_month", "ເດືອນແລ້ວ": "last_month", "ມື້ນີ້": "today", "ມື້ວານ": "yesterday",
+    "ປີ": "year", "ໄຕມາດ": "quarter", "ເດືອນ": "month", "ອາທິດ": "week",
+    "ວັນທີ": "date", "ວັນ": "day", "ມື້": "day",
+}
+_LAO_ENTITY_RE = re.compile(
+    "|".join(re.escape(normalize_question(word)) for word in sorted(_LAO_ENTITIES, key=len, reverse=True))
+)
+_LAO_CONCEPTS = {normalize_question(word): concept for word, concept in _LAO_ENTITIES.items()}
+
+
+def _numbers(text: str) -> tuple[str, ...]:
+    return tuple(sorted(_NUMBER_RE.findall(text)))
+
+
+def _signature(normalized: str) -> tuple:
+    """
+    ສ່ວນຂອງຄຳຖາມທີ່ຕ້ອງຄືກັນທຸກຕົວຈຶ່ງໃຊ້ SQL ຮ່ວມກັນໄດ້: (ຕົວເລກ, entities)
+    """
+    terms = {
+        _SYNONYMS.get(term, term)
+        for term in _LATIN_TERM_RE.findall(normalized)
+        if term not in _STOPWORDS and not _NUMBER_RE.fullmatch(term)
+    }
+    terms.update(_LAO_CONCEPTS[word] for word in _LAO_ENTITY_RE.findall(normalized))
+    return _numbers(normalized), tuple(sorted(terms))
+
+
+@dataclass(frozen=True)
+class SemanticMatch:
+    """
+    ຜົນລັບການຊອກຫາໃນ SemanticCache
+    """
+    sql_script: str
+    matched_question: str
+    similarity: float
+
+
+class SemanticCache:
+    """
+    Index ຂອງ (question vector → SQL) ແບບ in-memory (thread-safe)
+    """
+
+    def __init__(self, threshold: float | None = None, max_entries: int | None = None):
+        self.threshold = (
+            threshold if threshold is not None
+            else float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.5"))
+        )
+        self.max_entries = max_entries or int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "5000"))
+        self._embedder = get_embedder()
+        dim = self._embedder.dim
+
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((64, dim), dtype=np.float32)  # TF vectors (ຍັງບໍ່ weight)
+        self._doc_freq = np.zeros(dim, dtype=np.float32)
+        self._entries: list[tuple[str, str, tuple, str]] = []  # (question, namespace, signature, sql)
+        self._index: np.ndarray | None = None  # TF-IDF vectors ທີ່ normalize ແລ້ວ
+        self._idf: np.ndarray | None = None
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _namespace(schema_fingerprint: str, model_name: str) -> str:
+        return f"{schema_fingerprint}\x1f{model_name}"
+
+    def _rebuild_index(self):
+        count = len(self._entries)
+        self._idf = np.log((1.0 + count) / (1.0 + self._doc_freq)) + 1.0
+        weighted = self._vectors[:count] * self._idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._index = weighted / norms
+
+    def lookup(self, question: str, schema_fingerprint: str, model_name: str) -> SemanticMatch | None:
+        """
+        ຊອກຫາຄຳຖາມທີ່ໃກ້ຄຽງທີ່ສຸດໃນ namespace ດຽວກັນ
+
+        Returns:
+            SemanticMatch | None: ຜົນລັບຖ້າ similarity ຜ່ານ threshold ແລະ signature ຄືກັນ
+        """
+        normalized = normalize_question(question)
+        query = self._embedder.embed_one(normalized)
+        namespace = self._namespace(schema_fingerprint, model_name)
+
+        with self._lock:
+            if not self._entries:
+                self._misses += 1
+                return None
+            if self._index is None:
+                self._rebuild_index()
+
+            weighted = query * self._idf
+            norm = np.linalg.norm(weighted)
+            if norm == 0:
+                self._misses += 1
+                return None
+            scores = self._index @ (weighted / norm)
+
+            signature = _signature(normalized)
+            # ໄລ່ທຸກ entries ທີ່ຜ່ານ threshold (entries ຂອງ Schema/Model ອື່ນບໍ່ບັງ match ຂອງ namespace ນີ້)
+            for idx in np.argsort(scores)[::-1]:
+                score = float(scores[idx])
+                if score < self.threshold:
+                    break
+                entry_question, entry_namespace, entry_signature, sql_script = self._entries[idx]
+                if entry_namespace == namespace and entry_signature == signature:
+                    self._hits += 1
+                    return SemanticMatch(sql_script, entry_question, score)
+
+            self._misses += 1
+            return None
+
+    def add(self, question: str, schema_fingerprint: str, model_name: str, sql_script: str):
+        """
+        ເພີ່ມຄຳຖາມ ແລະ SQL ເຂົ້າ Index
+        """
+        normalized = normalize_question(question)
+        vector = self._embedder.embed_one(normalized)
+        namespace = self._namespace(schema_fingerprint, model_name)
+
+        with self._lock:
+            for idx, (entry_question, entry_namespace, _, _) in enumerate(self._entries):
+                if entry_question == normalized and entry_namespace == namespace:
+                    self._remove_at(idx)
+                    break
+            self._append(normalized, namespace, vector, sql_script)
+
+    def _append(self, normalized: str, namespace: str, vector: np.ndarray, sql_script: str):
+        if len(self._entries) >= self.max_entries:
+            # ລຶບອັນເກົ່າທີ່ສຸດ (FIFO) ເພື່ອຈຳກັດຂະໜາດ matrix
+            self._remove_at(0)
+
+        count = len(self._entries)
+        if count == self._vectors.shape[0]:
+            grown = np.zeros((count * 2, self._vectors.shape[1]), dtype=np.float32)
+            grown[:count] = self._vectors
+            self._vectors = grown
+
+        self._vectors[count] = vector
+        self._doc_freq += vector > 0
+        self._entries.append((normalized, namespace, _signature(normalized), sql_script))
+        self._index = None
+
+    def remove_sql(self, sql_script: str, schema_fingerprint: str, model_name: str):
+        """
+        ລຶບທຸກ entries ທີ່ໃຊ້ SQL ນີ້ (ເຊັ່ນ: ເມື່ອ SQL execute ບໍ່ຜ່ານ)
+        """
+        namespace = self._namespace(schema_fingerprint, model_name)
+        with self._lock:
+            for idx in range(len(self._entries) - 1, -1, -1):
+                _, entry_namespace, _, entry_sql = self._entries[idx]
+                if entry_namespace == namespace and entry_sql == sql_script:
+                    self._remove_at(idx)
+
+    def _remove_at(self, idx: int):
+        count = len(self._entries)
+        self._doc_freq -= self._vectors[idx] > 0
+        self._vectors[idx:count - 1] = self._vectors[idx + 1:count]
+        self._vectors[count - 1] = 0.0
+        del self._entries[idx]
+        self._index = None
+
+    def warm_from(self, sql_cache: SQLCache):
+        """
+        ໂຫຼດ entries ຈາກ SQLCache ເຂົ້າ Index (ຫຼັງຈາກ restart process)
+        """
+        rows = sql_cache.entries(self.max_entries)
+        questions = [normalize_question(question) for question, _, _, _ in rows]
+        vectors = self._embedder.embed(questions)
+        with self._lock:
+            # entries ຈາກ SQLCache ບໍ່ຊ້ຳກັນຢູ່ແລ້ວ (key ດຽວກັນ) ຈຶ່ງບໍ່ຕ້ອງກວດຊ້ຳ
+            for normalized, vector, (_, schema_fingerprint, model_name, sql_script) in zip(questions, vectors, rows):
+                self._append(normalized, self._namespace(schema_fingerprint, model_name), vector, sql_script)
+        loaded = len(rows)
+        if loaded:
+            logger.info(f"🧠 Semantic cache warmed with {loaded} questions")
+
+    def stats(self) -> dict:
+        """
+        ສະຖິຕິຂອງ Semantic Cache
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "threshold": self.threshold,
+            }
+
+
+_semantic_cache: SemanticCache | None = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """
+    ດຶງ SemanticCache ທີ່ໃຊ້ຮ່ວມກັນທັງ Process (warm ຈາກ SQL cache ຄັ້ງທຳອິດ)
+
+    Returns:
+        SemanticCache: Cache instance
+    """
+    global _semantic_cache
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                cache = SemanticCache()
+                try:
+                    cache.warm_from(get_sql_cache())
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not warm semantic cache: {e}")
+                _semantic_cache = cache
+    return _semantic_cache
@@ -0,0 +1,221 @@
+"""
+sql_cache.py - Cache ຄຳຖາມ → SQL ແບບຖາວອນ (SQLite)
+
+Key = (ຄຳຖາມທີ່ normalize ແລ້ວ, schema fingerprint, model name)
+ເມື່ອ Schema ປ່ຽນ fingerprint ກໍປ່ຽນ ຈຶ່ງບໍ່ໃຊ້ SQL ເກົ່າທີ່ອາດຜິດກັບ Schema ໃໝ່.
+
+Eviction:
+- TTL: entry ທີ່ເກົ່າກວ່າ SQL_CACHE_TTL ວິນາທີຖືກລຶບຕອນອ່ານ
+- LRU: ເມື່ອຈຳນວນ entries ເກີນ SQL_CACHE_MAX_ENTRIES ລຶບອັນທີ່ບໍ່ໄດ້ໃຊ້ດົນທີ່ສຸດ
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from loguru import logger
+
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".cache"
+)
+
+# ຕົວອັກສອນທີ່ບໍ່ມີຄວາມໝາຍ (zero-width) ທີ່ມັກຕິດມາຈາກ keyboard ລາວ
+_INVISIBLE_CHARS = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff"))
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """
+    Normalize ຄຳຖາມເພື່ອໃຊ້ເປັນ Cache Key
+
+    - Unicode NFKC + casefold
+    - ລຶບ zero-width characters ແລະ ເຄື່ອງໝາຍວັກຕອນ
+    - ຍຸບຍະຫວ່າງຫຼາຍອັນໃຫ້ເຫຼືອອັນດຽວ
+    """
+    text = unicodedata.normalize("NFKC", question or "").translate(_INVISIBLE_CHARS).casefold()
+    text = "".join(
+        " " if unicodedata.category(ch).startswith("P") else ch
+        for ch in text
+    )
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class SQLCache:
+    """
+    Cache ຂອງ SQL ທີ່ LLM ສ້າງ ເກັບໃນ SQLite (thread-safe)
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_entries: int | None = None,
+        ttl: float | None = None,
+    ):
+        self.path = path or os.getenv(
+            "SQL_CACHE_PATH", os.path.join(DEFAULT_CACHE_DIR, "sql_cache.sqlite3")
+        )
+        self.max_entries = max_entries or int(os.getenv("SQL_CACHE_MAX_ENTRIES", "5000"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("SQL_CACHE_TTL", str(7 * 24 * 3600)))
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sql_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    question TEXT NOT NULL,
+                    schema_fingerprint TEXT NOT NULL,
+                    model_name TEXT NOT NULL,
+                    sql_script TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sql_cache_last_access ON sql_cache(last_access)"
+            )
+
+    @staticmethod
+    def make_key(question: str, schema_fingerprint: str, model_name: str) -> str:
+        raw = f"{normalize_question(question)}\x1f{schema_fingerprint}\x1f{model_name}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, question: str, schema_fingerprint: str, model_name: str) -> str | None:
+        """
+        ຊອກຫາ SQL ທີ່ເຄີຍສ້າງສຳລັບຄຳຖາມນີ້
+
+        Returns:
+            str | None: SQL script ຖ້າພົບ (ແລະ ບໍ່ໝົດອາຍຸ), ບໍ່ດັ່ງນັ້ນ None
+        """
+        key = self.make_key(question, schema_fingerprint, model_name)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT sql_script, created_at FROM sql_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._misses += 1
+                return None
+
+            sql_script, created_at = row
+            if now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM sql_cache WHERE cache_key = ?", (key,))
+                self._misses += 1
+                self._evictions += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE sql_cache SET last_access = ?, hits = hits + 1 WHERE cache_key = ?",
+                (now, key),
+            )
+            self._hits += 1
+            return sql_script
+
+    def put(self, question: str, schema_fingerprint: str, model_name: str, sql_script: str):
+        """
+        ບັນທຶກ SQL ທີ່ສ້າງສຳເລັດ ແລະ ລຶບ entries ເກົ່າຖ້າເກີນຂະໜາດ
+        """
+        key = self.make_key(question, schema_fingerprint, model_name)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO sql_cache
+                    (cache_key, question, schema_fingerprint, model_name, sql_script, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(cache_key) DO UPDATE SET
+                    sql_script = excluded.sql_script,
+                    created_at = excluded.created_at,
+                    last_access = excluded.last_access
+                """,
+                (key, normalize_question(question), schema_fingerprint, model_name, sql_script, now, now),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM sql_cache").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM sql_cache WHERE cache_key IN (
+                        SELECT cache_key FROM sql_cache ORDER BY last_access ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+                self._evictions += overflow
+
+    def invalidate(self, question: str, schema_fingerprint: str, model_name: str):
+        """
+        ລຶບ entry (ເຊັ່ນ: ເມື່ອ SQL ທີ່ Cache ໄວ້ execute ບໍ່ຜ່ານ ຫຼື ຜູ້ໃຊ້ປະຕິເສດ)
+        """
+        key = self.make_key(question, schema_fingerprint, model_name)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sql_cache WHERE cache_key = ?", (key,))
+        logger.info("🗑️ SQL cache entry invalidated")
+
+    def entries(self, limit: int) -> list[tuple[str, str, str, str]]:
+        """
+        ດຶງ entries ທີ່ໃຊ້ລ່າສຸດ (ບໍ່ນັບ entries ທີ່ໝົດອາຍຸ)
+
+        Returns:
+            list: [(question, schema_fingerprint, model_name, sql_script), ...] ເກົ່າ → ໃໝ່
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT question, schema_fingerprint, model_name, sql_script
+                FROM sql_cache WHERE created_at >= ?
+                ORDER BY last_access DESC LIMIT ?
+                """,
+                (time.time() - self.ttl, limit),
+            ).fetchall()
+        return rows[::-1]
+
+    def stats(self) -> dict:
+        """
+        ສະຖິຕິຂອງ Cache (hits/misses ນັບຕັ້ງແຕ່ process ເລີ່ມ)
+        """
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM sql_cache").fetchone()
+            lookups = self._hits + self._misses
+            return {
+                "entries": entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+_sql_cache: SQLCache | None = None
+_sql_cache_lock = threading.Lock()
+
+
+def get_sql_cache() -> SQLCache:
+    """
+    ດຶງ SQLCache ທີ່ໃຊ້ຮ່ວມກັນທັງ Process
+
+    Returns:
+        SQLCache: Cache instance
+    """
+    global _sql_cache
+    if _sql_cache is None:
+        with _sql_cache_lock:
+            if _sql_cache is None:
+                _sql_cache = SQLCache()
+    return _sql_cache
@@ -1,4 +1,8 @@
 import os
+import threading
+import time
+from contextlib import contextmanager
+
 import mariadb
 from loguru import logger
 
@@ -39,3 +43,278 @@ def close_connection(connection):
             logger.info("👋 Connection closed")
         except Exception as e:
             logger.warning(f"⚠️ Error closing connection: {e}")
+
+
+# ===========================
+# CONNECTION POOL
+# ===========================
+
+class ConnectionPool:
+    """
+    Pool ຂອງ MariaDB connections ທີ່ໃຊ້ຮ່ວມກັນລະຫວ່າງ threads/sessions
+
+    - ສ້າງ connection ລ່ວງໜ້າ min_size ອັນ ແລະ ບໍ່ເກີນ max_size ອັນ
+    - ກວດສອບສຸຂະພາບ (ping) ຕອນ checkout ຖ້າ connection ບໍ່ໄດ້ໃຊ້ເກີນ health_check_after ວິນາທີ
+    - ເກັບສະຖິຕິ: checkouts, waits, connections ທີ່ສ້າງ, health check ທີ່ລົ້ມເຫຼວ,
+      max_in_use (high-water mark ຂອງ connections ທີ່ຖືກ checkout ພ້ອມກັນ)
+    """
+
+    def __init__(
+        self,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        health_check_after: float = 30.0,
+        connection_factory=None,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self._connection_factory = connection_factory or get_db_connection
+
+        self._cond = threading.Condition()
+        self._idle: list[tuple[object, float]] = []  # (connection, last_used)
+        self._size = 0
+        self._closed = False
+        self._discard_ids: set[int] = set()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "created": 0,
+            "health_check_failures": 0,
+            "discarded": 0,
+            "max_in_use": 0,
+        }
+
+        for _ in range(min_size):
+            try:
+                connection = self._create_connection()
+            except mariadb.Error:
+                logger.warning("⚠️ Could not pre-fill connection pool, will connect on demand")
+                break
+            with self._cond:
+                self._size += 1
+                self._idle.append((connection, time.monotonic()))
+
+    def _create_connection(self):
+        connection = self._connection_factory()
+        # SELECT ຢ່າງດຽວ: autocommit ເພື່ອບໍ່ໃຫ້ transaction ຄ້າງ snapshot ເກົ່າລະຫວ່າງການໃຊ້ງານ
+        connection.autocommit = True
+        with self._cond:
+            self._stats["created"] += 1
+        return connection
+
+    def _is_healthy(self, connection) -> bool:
+        try:
+            connection.ping()
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Pooled connection failed health check: {e}")
+            return False
+
+    def acquire(self, timeout: float | None = None):
+        """
+        Checkout connection ຈາກ pool (ລໍຖ້າຖ້າ pool ເຕັມ)
+
+        Args:
+            timeout: ເວລາລໍຖ້າສູງສຸດ (ວິນາທີ), default ໃຊ້ຄ່າຂອງ pool
+
+        Returns:
+            mariadb.Connection: connection ທີ່ພ້ອມໃຊ້ງານ
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+        connection = None
+        last_used = 0.0
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise mariadb.PoolError("Connection pool is closed")
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    # ຈອງບ່ອນໄວ້ກ່ອນ ແລ້ວຈຶ່ງສ້າງ connection ນອກ lock
+                    self._size += 1
+                    break
+                if not waited:
+                    waited = True
+                    self._stats["waits"] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise mariadb.PoolError(
+                        f"Timed out after {timeout:.1f}s waiting for a pooled connection "
+                        f"(max_size={self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+            self._stats["checkouts"] += 1
+            self._stats["max_in_use"] = max(self._stats["max_in_use"], self._size - len(self._idle))
+            if waited:
+                self._stats["wait_time_total"] += time.monotonic() - started
+
+        try:
+            if connection is not None and time.monotonic() - last_used >= self.health_check_after:
+                if not self._is_healthy(connection):
+                    with self._cond:
+                        self._stats["health_check_failures"] += 1
+                        self._stats["discarded"] += 1
+                    close_connection(connection)
+                    connection = None
+            if connection is None:
+                connection = self._create_connection()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        return connection
+
+    def release(self, connection, discard: bool = False, healthy: bool = True):
+        """
+        ສົ່ງ connection ຄືນ pool
+
+        Args:
+            connection: connection ທີ່ checkout ມາ
+            discard: ປິດ connection ຖິ້ມແທນການສົ່ງຄືນ
+            healthy: False = ບັງຄັບໃຫ້ກວດສອບສຸຂະພາບໃນ checkout ຄັ້ງຕໍ່ໄປ
+        """
+        with self._cond:
+            if id(connection) in self._discard_ids:
+                self._discard_ids.discard(id(connection))
+                discard = True
+            if discard or self._closed:
+                self._size -= 1
+                self._stats["discarded"] += 1
+            else:
+                self._idle.append((connection, time.monotonic() if healthy else 0.0))
+            self._cond.notify()
+        if discard or self._closed:
+            close_connection(connection)
+
+    def discard_on_release(self, connection):
+        """
+        ໝາຍໃຫ້ປິດ connection ຖິ້ມຕອນສົ່ງຄືນ (ເຊັ່ນ: ຍັງມີ rows ທີ່ບໍ່ໄດ້ອ່ານຄ້າງຢູ່)
+        """
+        with self._cond:
+            self._discard_ids.add(id(connection))
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        """
+        Context manager ສຳລັບ checkout/return connection
+
+        Example:
+            with get_db_pool().connection() as connection:
+                cursor = connection.cursor()
+        """
+        connection = self.acquire(timeout)
+        healthy = True
+        try:
+            yield connection
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self.release(connection, healthy=healthy)
+
+    def reset_peak(self):
+        """
+        ເລີ່ມນັບ max_in_use ໃໝ່ຈາກຈຳນວນທີ່ checkout ຢູ່ຕອນນີ້ (ເຊັ່ນ: ຕໍ່ລະດັບຂອງ load test)
+        """
+        with self._cond:
+            self._stats["max_in_use"] = self._size - len(self._idle)
+
+    def stats(self) -> dict:
+        """
+        ສະຖິຕິຂອງ pool
+        """
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                **self._stats,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            }
+
+    def close(self):
+        """
+        ປິດ connections ທີ່ວ່າງທັງໝົດ (connections ທີ່ກຳລັງໃຊ້ຈະຖືກປິດຕອນສົ່ງຄືນ)
+        """
+        with self._cond:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for connection, _ in idle:
+            close_connection(connection)
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+_connection_factory = None
+
+
+def set_connection_factory(factory=None):
+    """
+    ປ່ຽນ function ສ້າງ connection ຂອງ pool ກາງ (ເຊັ່ນ: SQLite shim ສຳລັບ benchmarks)
+    ແລະ ປິດ pool ເກົ່າ; None = ກັບໄປໃຊ້ get_db_connection
+
+    Args:
+        factory: callable ທີ່ return connection ແບບ mariadb (cursor, ping, close, autocommit)
+    """
+    global _pool, _connection_factory
+    with _pool_lock:
+        _connection_factory = factory
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_db_pool() -> ConnectionPool:
+    """
+    ດຶງ ConnectionPool ທີ່ໃຊ້ຮ່ວມກັນທັງ Process (ສ້າງຄັ້ງທຳອິດທີ່ຮຽກ)
+
+    ຕັ້ງຄ່າຜ່ານ environment variables:
+        DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_POOL_HEALTH_CHECK_AFTER
+
+    Returns:
+        ConnectionPool: pool instance
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    min_size=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+                    max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                    timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+                    health_check_after=float(os.getenv("DB_POOL_HEALTH_CHECK_AFTER", "30")),
+                    connection_factory=_connection_factory,
+                )
+                logger.info(f"🔌 MariaDB connection pool ready (max_size={_pool.max_size})")
+    return _pool
+
+
+def get_pooled_connection(timeout: float | None = None):
+    """
+    Context manager ສຳລັບ checkout connection ຈາກ pool ກາງ
+
+    Example:
+        with get_pooled_connection() as connection:
+            cursor = connection.cursor()
+    """
+    return get_db_pool().connection(timeout)
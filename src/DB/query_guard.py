@@ -0,0 +1,290 @@
+"""
+query_guard.py - ກວດ ແລະ ປ້ອງກັນ SQL ທີ່ມາຈາກ LLM ກ່ອນ execute ໃນ MariaDB
+
+ຂັ້ນຕອນ:
+1. Tokenize SQL (ຂ້າມ string literals, `identifiers` ແລະ comments) ແລ້ວອະນຸຍາດສະເພາະ
+   SELECT / WITH ... SELECT ຄຳສັ່ງດຽວ
+2. EXPLAIN ເພື່ອປະມານຈຳນວນແຖວທີ່ຕ້ອງ scan → warn ຫຼື reject ຕາມ threshold
+3. ໃສ່ LIMIT ໃຫ້ (ຖ້າບໍ່ມີ LIMIT ຢູ່ລະດັບນອກສຸດ)
+4. ຫໍ່ດ້ວຍ SET STATEMENT max_statement_time=N FOR ... ເພື່ອຈຳກັດເວລາ
+
+Query ທີ່ກຳລັງ run ຈະຖືກບັນທຶກໄວ້ (query_id → connection thread id) ເພື່ອໃຫ້
+UI ຍົກເລີກໄດ້ດ້ວຍ cancel_query() (KILL QUERY).
+"""
+
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+
+import mariadb
+from loguru import logger
+
+from src.DB.db_config import get_db_connection
+from src.Tracing.tracer import add_metric
+
+
+class QueryRejected(ValueError):
+    """
+    SQL ຖືກປະຕິເສດໂດຍ Query Guard (ບໍ່ແມ່ນ SELECT, ແພງເກີນໄປ, ...)
+    """
+
+
+# ຄຳສັ່ງທີ່ແກ້ໄຂຂໍ້ມູນ/Schema ຫຼື lock (ອະນຸຍາດຖ້າເປັນ function call ເຊັ່ນ REPLACE(...), INSERT(...))
+_FORBIDDEN_KEYWORDS = {
+    "INSERT", "UPDATE", "DELETE", "REPLACE", "MERGE", "UPSERT",
+    "CREATE", "ALTER", "DROP", "TRUNCATE", "RENAME",
+    "GRANT", "REVOKE", "SET", "CALL", "DO", "HANDLER", "LOAD",
+    "LOCK", "UNLOCK", "INTO", "OUTFILE", "DUMPFILE", "KILL", "SHUTDOWN",
+}
+# Functions ທີ່ເຮັດໃຫ້ connection ຄ້າງ ຫຼື ກິນ CPU ໂດຍເຈດຕະນາ
+_FORBIDDEN_FUNCTIONS = {"SLEEP", "BENCHMARK", "GET_LOCK", "LOAD_FILE"}
+
+_TOKEN_RE = re.compile(
+    r"""
+      (?P<comment>--[^\n]*|\#[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*")
+    | (?P<quoted>`(?:[^`]|``)*`)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<number>\d+(?:\.\d+)?)
+    | (?P<space>\s+)
+    | (?P<symbol>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str
+    value: str
+    depth: int  # ລະດັບວົງເລັບ (0 = ນອກສຸດ)
+
+
+@dataclass
+class GuardedQuery:
+    """
+    ຜົນລັບຂອງ Query Guard: SQL ທີ່ພ້ອມ execute ແລະ ຂໍ້ມູນປະກອບ
+    """
+    sql: str                      # SQL ທີ່ຜ່ານການກວດ (ມີ LIMIT ແລ້ວ)
+    executable_sql: str           # SQL ທີ່ຫໍ່ດ້ວຍ SET STATEMENT max_statement_time
+    estimated_rows: int | None = None
+    limit_injected: bool = False
+    warnings: list[str] = field(default_factory=list)
+
+
+def tokenize(sql: str) -> list[Token]:
+    """
+    ແຍກ SQL ເປັນ tokens (ບໍ່ລວມ whitespace ແລະ comments) ພ້ອມລະດັບວົງເລັບ
+    """
+    tokens = []
+    depth = 0
+    for match in _TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        value = match.group()
+        if kind in ("space", "comment"):
+            continue
+        if kind == "symbol" and value == ")":
+            depth = max(depth - 1, 0)
+        tokens.append(Token(kind, value, depth))
+        if kind == "symbol" and value == "(":
+            depth += 1
+    return tokens
+
+
+def check_read_only(sql: str) -> list[Token]:
+    """
+    ກວດວ່າ SQL ເປັນ SELECT (ຫຼື WITH ... SELECT) ຄຳສັ່ງດຽວ
+
+    Raises:
+        QueryRejected: ຖ້າມີຫຼາຍຄຳສັ່ງ ຫຼື ມີຄຳສັ່ງທີ່ບໍ່ອະນຸຍາດ
+
+    Returns:
+        list[Token]: tokens ຂອງ SQL (ບໍ່ລວມ ; ທ້າຍ)
+    """
+    tokens = tokenize(sql)
+    while tokens and tokens[-1].value == ";":
+        tokens.pop()
+    if not tokens:
+        raise QueryRejected("SQL ວ່າງເປົ່າ")
+
+    if any(token.kind == "symbol" and token.value == ";" for token in tokens):
+        raise QueryRejected("ອະນຸຍາດໃຫ້ execute SQL ພຽງຄຳສັ່ງດຽວ")
+
+    first = next((token for token in tokens if token.value != "("), None)
+    if first is None or first.kind != "word" or first.value.upper() not in ("SELECT", "WITH"):
+        raise QueryRejected("ອະນຸຍາດສະເພາະຄຳສັ່ງ SELECT ເທົ່ານັ້ນ")
+
+    for i, token in enumerate(tokens):
+        if token.kind != "word":
+            continue
+        word = token.value.upper()
+        is_call = i + 1 < len(tokens) and tokens[i + 1].value == "("
+        if word in _FORBIDDEN_FUNCTIONS and is_call:
+            raise QueryRejected(f"ບໍ່ອະນຸຍາດໃຫ້ໃຊ້ function {word}()")
+        if word in _FORBIDDEN_KEYWORDS and not is_call:
+            # ຍົກເວັ້ນ column ທີ່ຂຽນແບບ table.column (ເຊັ່ນ t.set)
+            if i > 0 and tokens[i - 1].value == ".":
+                continue
+            raise QueryRejected(f"ບໍ່ອະນຸຍາດໃຫ້ໃຊ້ຄຳສັ່ງ {word}")
+    return tokens
+
+
+def has_top_level_limit(tokens: list[Token]) -> bool:
+    return any(
+        token.kind == "word" and token.depth == 0 and token.value.upper() == "LIMIT"
+        for token in tokens
+    )
+
+
+def _strip_trailing_semicolons(sql: str) -> str:
+    return re.sub(r"[\s;]+$", "", sql)
+
+
+def estimate_rows(connection, sql: str) -> int | None:
+    """
+    ປະມານຈຳນວນແຖວທີ່ MariaDB ຕ້ອງ scan ຈາກ EXPLAIN
+
+    ແຖວທີ່ມີ id ດຽວກັນແມ່ນ nested-loop join → ຄູນກັນ, SELECT ຕ່າງ id → ບວກກັນ.
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN {sql}")
+        add_metric("db.round_trips")
+        columns = [desc[0].lower() for desc in cursor.description or []]
+        if "rows" not in columns:
+            return None
+        id_idx = columns.index("id") if "id" in columns else None
+        rows_idx = columns.index("rows")
+
+        per_select: dict = {}
+        for row in cursor.fetchall():
+            rows = row[rows_idx]
+            if rows is None:
+                continue
+            key = row[id_idx] if id_idx is not None else 0
+            per_select[key] = per_select.get(key, 1) * max(int(rows), 1)
+        return sum(per_select.values()) if per_select else None
+    finally:
+        cursor.close()
+
+
+def guard_query(
+    sql: str,
+    connection=None,
+    max_rows: int | None = None,
+    statement_timeout: float | None = None,
+) -> GuardedQuery:
+    """
+    ກວດ SQL ແລະ ສ້າງ SQL ທີ່ປອດໄພສຳລັບ execute
+
+    Args:
+        sql: SQL ຈາກ LLM
+        connection: Connection ສຳລັບ EXPLAIN (None = ຂ້າມ EXPLAIN)
+        max_rows: LIMIT ທີ່ຈະໃສ່ໃຫ້ (default: SQL_MAX_ROWS ຫຼື 100000, +1 ເພື່ອກວດການຕັດ)
+        statement_timeout: ວິນາທີສູງສຸດຕໍ່ query (default: SQL_MAX_STATEMENT_TIME ຫຼື 30)
+
+    Raises:
+        QueryRejected: ຖ້າ SQL ບໍ່ຜ່ານການກວດ
+
+    Returns:
+        GuardedQuery: SQL ທີ່ພ້ອມ execute
+    """
+    max_rows = max_rows or int(os.getenv("SQL_MAX_ROWS", "100000"))
+    statement_timeout = statement_timeout or float(os.getenv("SQL_MAX_STATEMENT_TIME", "30"))
+    max_explain_rows = int(os.getenv("SQL_MAX_EXPLAIN_ROWS", "50000000"))
+    warn_explain_rows = int(os.getenv("SQL_WARN_EXPLAIN_ROWS", "1000000"))
+
+    sql = _strip_trailing_semicolons(sql.strip())
+    tokens = check_read_only(sql)
+
+    guarded = GuardedQuery(sql=sql, executable_sql=sql)
+
+    if connection is not None:
+        try:
+            guarded.estimated_rows = estimate_rows(connection, sql)
+        except mariadb.Error as e:
+            # EXPLAIN ບໍ່ຜ່ານ = SQL ຜິດ syntax/ຊື່ table → ໃຫ້ error ຂຶ້ນໄປເລີຍ
+            raise QueryRejected(f"EXPLAIN failed: {e}") from e
+
+        estimated = guarded.estimated_rows
+        if estimated is not None and estimated > max_explain_rows:
+            raise QueryRejected(
+                f"Query ແພງເກີນໄປ: ປະມານ {estimated:,} ແຖວ (ສູງສຸດ {max_explain_rows:,})"
+            )
+        if estimated is not None and estimated > warn_explain_rows:
+            guarded.warnings.append(f"Query ອາດຊ້າ: ປະມານ {estimated:,} ແຖວທີ່ຕ້ອງ scan")
+
+    if not has_top_level_limit(tokens):
+        guarded.sql = f"{sql}\nLIMIT {max_rows + 1}"
+        guarded.limit_injected = True
+
+    guarded.executable_sql = (
+        f"SET STATEMENT max_statement_time={statement_timeout:g} FOR {guarded.sql}"
+    )
+    return guarded
+
+
+# ===========================
+# Cancellation Registry
+# ===========================
+
+_running_queries: dict[str, int] = {}
+_cancelled_queries: set[str] = set()
+_registry_lock = threading.Lock()
+
+
+def register_query(query_id: str, connection):
+    """
+    ບັນທຶກ query ທີ່ກຳລັງ run (ເພື່ອໃຫ້ cancel_query ຫາ thread id ໄດ້)
+    """
+    thread_id = getattr(connection, "thread_id", None) or getattr(connection, "connection_id", None)
+    if thread_id is None:
+        return
+    with _registry_lock:
+        _running_queries[query_id] = int(thread_id)
+        _cancelled_queries.discard(query_id)
+
+
+def unregister_query(query_id: str) -> bool:
+    """
+    ລຶບ query ອອກຈາກ registry
+
+    Returns:
+        bool: True ຖ້າ query ນີ້ຖືກຍົກເລີກໂດຍຜູ້ໃຊ້
+    """
+    with _registry_lock:
+        _running_queries.pop(query_id, None)
+        cancelled = query_id in _cancelled_queries
+        _cancelled_queries.discard(query_id)
+        return cancelled
+
+
+def cancel_query(query_id: str) -> bool:
+    """
+    ຍົກເລີກ query ທີ່ກຳລັງ run ດ້ວຍ KILL QUERY (ໃຊ້ connection ແຍກ)
+
+    Returns:
+        bool: True ຖ້າສົ່ງຄຳສັ່ງ KILL ສຳເລັດ
+    """
+    with _registry_lock:
+        thread_id = _running_queries.get(query_id)
+        if thread_id is None:
+            return False
+        _cancelled_queries.add(query_id)
+
+    connection = None
+    try:
+        # ບໍ່ໃຊ້ pool: pool ອາດເຕັມຢູ່ ໃນຂະນະທີ່ query ກຳລັງກິນ connection
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(f"KILL QUERY {thread_id}")
+        cursor.close()
+        logger.warning(f"⛔ Cancelled query {query_id} (thread {thread_id})")
+        return True
+    except mariadb.Error as e:
+        logger.error(f"❌ Could not cancel query {query_id}: {e}")
+        return False
+    finally:
+        if connection:
+            connection.close()
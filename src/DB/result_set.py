@@ -0,0 +1,362 @@
+"""
+result_set.py - ດຶງຜົນລັບ SQL ແບບ Streaming ແລະ ເກັບເປັນ Columnar
+
+ຮູບແບບ sql_result:
+    {
+        "columns": ["col1", "col2", ...],        # ຊື່ບໍ່ຊ້ຳກັນ (ຊື່ຊ້ຳຈາກ JOIN → name, name_1)
+        "data": {"col1": [...], "col2": [...]},  # ຄ່າຂອງແຕ່ລະ column (columnar)
+        "row_count": 123,
+        "truncated": False,                      # True ຖ້າຖືກຕັດຍ້ອນ row/byte cap
+        "spill_path": "/.../result_xxx.arrow",   # (ມີສະເພາະຜົນລັບຂະໜາດໃຫຍ່)
+    }
+
+ຜົນລັບທີ່ໃຫຍ່ກວ່າ RESULT_SPILL_BYTES ຈະຖືກຂຽນເປັນ Arrow IPC file ໃນ RESULT_SPILL_DIR,
+"data" ຈະເຫຼືອພຽງ preview (RESULT_PREVIEW_ROWS ແຖວທຳອິດ) ແລະ ຜູ້ອ່ານ (ຕາຕະລາງ, chart,
+download) ອ່ານ file ດ້ວຍ memory map ຜ່ານ load_table() ແທນການ copy ຂໍ້ມູນໄປມາໃນ state.
+State ທີ່ບັນທຶກລົງ Checkpointer ໃຊ້ spill_preview() (spill ທຸກຜົນລັບທີ່ຍາວກວ່າ preview).
+Spill files ຖືກລຶບຫຼັງ RESULT_SPILL_TTL ວິນາທີ (spill_missing() ກວດວ່າ file ຍັງຢູ່ບໍ).
+
+ການແປງ type (datetime → ISO string, Decimal → float, bytes → str) ຖືກຕັດສິນ
+ຄັ້ງດຽວຕໍ່ column ຈາກ cursor.description ແທນການກວດທຸກ cell.
+"""
+
+import datetime
+import decimal
+import os
+import time
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+from loguru import logger
+from mariadb.constants import FIELD_TYPE
+
+from src.Tracing.tracer import add_metric
+
+
+DEFAULT_SPILL_DIR = Path(__file__).resolve().parents[2] / ".cache" / "results"
+
+
+_DATE_TYPES = {FIELD_TYPE.DATE, FIELD_TYPE.DATETIME, FIELD_TYPE.TIMESTAMP, FIELD_TYPE.NEWDATE}
+_DECIMAL_TYPES = {FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL}
+_BINARY_TYPES = {
+    FIELD_TYPE.TINY_BLOB, FIELD_TYPE.MEDIUM_BLOB, FIELD_TYPE.LONG_BLOB,
+    FIELD_TYPE.BLOB, FIELD_TYPE.BIT, FIELD_TYPE.GEOMETRY,
+}
+
+
+def _iso(value):
+    return None if value is None else value.isoformat()
+
+
+def _to_str(value):
+    return None if value is None else str(value)
+
+
+def _to_float(value):
+    return None if value is None else float(value)
+
+
+def _decode(value):
+    # BLOB/TEXT columns ອາດເປັນ str (TEXT) ຫຼື bytes (BLOB)
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    return value
+
+
+def _converter_for_type(type_code):
+    if type_code in _DATE_TYPES:
+        return _iso
+    if type_code == FIELD_TYPE.TIME:
+        return _to_str  # MariaDB ສົ່ງ TIME ມາເປັນ timedelta
+    if type_code in _DECIMAL_TYPES:
+        return _to_float
+    if type_code in _BINARY_TYPES:
+        return _decode
+    return None
+
+
+def _converter_for_value(value):
+    """
+    Fallback ເມື່ອ driver ບໍ່ບອກ type_code: ຕັດສິນຈາກຄ່າທຳອິດທີ່ບໍ່ແມ່ນ NULL
+    """
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return _iso
+    if isinstance(value, (datetime.time, datetime.timedelta)):
+        return _to_str
+    if isinstance(value, decimal.Decimal):
+        return _to_float
+    if isinstance(value, (bytes, bytearray)):
+        return _decode
+    return None
+
+
+def _estimate_bytes(values: list) -> int:
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, str):
+        return sum(len(v) for v in values if v is not None)
+    return 8 * len(values)
+
+
+def _unique_columns(names: list[str]) -> list[str]:
+    """
+    ຕັ້ງຊື່ column ທີ່ຊ້ຳກັນໃຫ້ບໍ່ຊ້ຳ (name, name_1, ...) ເຊັ່ນ `SELECT a.name, b.name` ຈາກ JOIN,
+    ເພາະ "data" ເກັບຕາມຊື່ column
+    """
+    seen = set(names)
+    counts: dict[str, int] = {}
+    columns = []
+    for name in names:
+        if name not in counts:
+            counts[name] = 0
+            columns.append(name)
+            continue
+        while True:
+            counts[name] += 1
+            candidate = f"{name}_{counts[name]}"
+            if candidate not in seen:
+                break
+        seen.add(candidate)
+        columns.append(candidate)
+    return columns
+
+
+def fetch_columnar(
+    cursor,
+    max_rows: int | None = None,
+    max_bytes: int | None = None,
+    batch_size: int | None = None,
+) -> dict:
+    """
+    ດຶງຜົນລັບຈາກ cursor ທີ່ execute ແລ້ວ ເປັນ batch (fetchmany) ແລະ ສ້າງ sql_result ແບບ columnar
+
+    Args:
+        cursor: cursor ທີ່ execute SQL ແລ້ວ (ຄວນເປັນ unbuffered)
+        max_rows: ຈຳນວນແຖວສູງສຸດ (default: SQL_MAX_ROWS ຫຼື 100000)
+        max_bytes: ຂະໜາດຂໍ້ມູນສູງສຸດໂດຍປະມານ (default: SQL_MAX_BYTES ຫຼື 64MB)
+        batch_size: ຈຳນວນແຖວຕໍ່ fetchmany (default: SQL_FETCH_BATCH_SIZE ຫຼື 1000)
+
+    Returns:
+        dict: sql_result (columns, data, row_count, truncated)
+    """
+    max_rows = max_rows or int(os.getenv("SQL_MAX_ROWS", "100000"))
+    max_bytes = max_bytes or int(os.getenv("SQL_MAX_BYTES", str(64 * 1024 * 1024)))
+    batch_size = batch_size or int(os.getenv("SQL_FETCH_BATCH_SIZE", "1000"))
+
+    description = cursor.description or []
+    columns = _unique_columns([desc[0] for desc in description])
+    data: dict[str, list] = {col: [] for col in columns}
+    if not columns:
+        return {"columns": [], "data": {}, "row_count": 0, "truncated": False}
+
+    converters = [_converter_for_type(desc[1]) for desc in description]
+    # Column ທີ່ driver ບໍ່ບອກ type ຈະຕັດສິນຈາກຄ່າທຳອິດ
+    undecided = {i for i, desc in enumerate(description) if desc[1] is None}
+
+    row_count = 0
+    byte_count = 0
+    truncated = False
+
+    while True:
+        batch = cursor.fetchmany(min(batch_size, max_rows - row_count + 1))
+        add_metric("db.round_trips")
+        if not batch:
+            break
+
+        if row_count + len(batch) > max_rows:
+            batch = batch[:max_rows - row_count]
+            truncated = True
+
+        for i, values in enumerate(zip(*batch)):
+            if i in undecided:
+                sample = next((v for v in values if v is not None), None)
+                if sample is not None:
+                    converters[i] = _converter_for_value(sample)
+                    undecided.discard(i)
+            convert = converters[i]
+            values = list(map(convert, values)) if convert else list(values)
+            byte_count += _estimate_bytes(values)
+            data[columns[i]].extend(values)
+
+        row_count += len(batch)
+        if byte_count > max_bytes:
+            truncated = True
+        if truncated:
+            break
+
+    add_metric("db.rows", row_count)
+    add_metric("db.bytes", byte_count)
+    result = {
+        "columns": columns,
+        "data": data,
+        "row_count": row_count,
+        "truncated": truncated,
+    }
+    return spill_if_large(result, byte_count)
+
+
+def _spill_dir() -> Path:
+    path = Path(os.getenv("RESULT_SPILL_DIR", str(DEFAULT_SPILL_DIR)))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def spill_ttl() -> int:
+    """
+    ອາຍຸຂອງ spill files (RESULT_SPILL_TTL ວິນາທີ, default: 1 ມື້)
+    """
+    return int(os.getenv("RESULT_SPILL_TTL", str(24 * 3600)))
+
+
+def _cleanup_spill_dir(spill_dir: Path):
+    """
+    ລຶບ spill files ທີ່ເກົ່າກວ່າ RESULT_SPILL_TTL ວິນາທີ
+    """
+    cutoff = time.time() - spill_ttl()
+    for path in spill_dir.glob("result_*.arrow"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def spill_if_large(sql_result: dict, byte_count: int, threshold: int | None = None) -> dict:
+    """
+    ຖ້າຂະໜາດຜົນລັບເກີນ threshold ໃຫ້ຂຽນເປັນ Arrow IPC file ແລະ ເກັບພຽງ preview ໃນ "data"
+
+    Args:
+        sql_result: ຜົນລັບແບບ columnar
+        byte_count: ຂະໜາດຂໍ້ມູນໂດຍປະມານ
+        threshold: ຂະໜາດທີ່ຈະ spill (default: RESULT_SPILL_BYTES ຫຼື 8MB)
+
+    Returns:
+        dict: sql_result (ອາດມີ "spill_path")
+    """
+    threshold = threshold or int(os.getenv("RESULT_SPILL_BYTES", str(8 * 1024 * 1024)))
+    if byte_count <= threshold or not sql_result["columns"]:
+        return sql_result
+    return _spill(sql_result, byte_count)
+
+
+def spill_preview(sql_result: dict) -> dict:
+    """
+    sql_result ສຳລັບ State ທີ່ບັນທຶກລົງ Checkpointer: ຜົນລັບທີ່ຍາວກວ່າ RESULT_PREVIEW_ROWS ແລະ
+    ຍັງບໍ່ spill ຈະຖືກຂຽນເປັນ Arrow file ແລະ ເກັບພຽງ preview + spill_path
+    (ທຸກ checkpoint ບັນທຶກ State ເຕັມ → ບໍ່ໃຫ້ຜົນລັບເຕັມຖືກ copy ທຸກຂັ້ນ)
+    """
+    preview_rows = int(os.getenv("RESULT_PREVIEW_ROWS", "1000"))
+    if (
+        sql_result.get("spill_path")
+        or sql_result.get("error")
+        or not sql_result.get("columns")
+        or sql_result.get("row_count", 0) <= preview_rows
+    ):
+        return sql_result
+    byte_count = sum(_estimate_bytes(values) for values in sql_result["data"].values())
+    return _spill(sql_result, byte_count)
+
+
+def spill_missing(sql_result: dict) -> bool:
+    """
+    True ຖ້າຜົນລັບເຕັມຖືກ spill ແຕ່ file ຖືກລຶບແລ້ວ (ເຫຼືອພຽງ preview ໃນ "data")
+    """
+    spill_path = sql_result.get("spill_path")
+    return bool(spill_path) and not os.path.exists(spill_path)
+
+
+def _spill(sql_result: dict, byte_count: int) -> dict:
+    spill_dir = _spill_dir()
+    _cleanup_spill_dir(spill_dir)
+    path = spill_dir / f"result_{uuid.uuid4().hex}.arrow"
+
+    table = _table_from_data(sql_result["columns"], sql_result["data"])
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=64 * 1024)
+
+    preview_rows = int(os.getenv("RESULT_PREVIEW_ROWS", "1000"))
+    logger.info(f"💾 Spilled {sql_result['row_count']} rows (~{byte_count // 1024} KB) to {path.name}")
+    return {
+        **sql_result,
+        "data": {col: values[:preview_rows] for col, values in sql_result["data"].items()},
+        "spill_path": str(path),
+    }
+
+
+def _table_from_data(columns: list[str], data: dict) -> pa.Table:
+    arrays = []
+    for col in columns:
+        try:
+            arrays.append(pa.array(data.get(col, [])))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # column ທີ່ມີ type ປົນກັນ → ເກັບເປັນ string
+            arrays.append(pa.array([None if v is None else str(v) for v in data.get(col, [])]))
+    return pa.Table.from_arrays(arrays, names=columns)
+
+
+def empty_result(error: str | None = None) -> dict:
+    """
+    sql_result ເປົ່າ (ໃຊ້ກັບກໍລະນີ error)
+    """
+    result = {"columns": [], "data": {}, "row_count": 0, "truncated": False}
+    if error is not None:
+        result["error"] = error
+    return result
+
+
+def load_table(sql_result: dict) -> pa.Table:
+    """
+    ອ່ານຜົນລັບເຕັມເປັນ Arrow Table (spill file ຖືກອ່ານແບບ memory map, ບໍ່ copy ເຂົ້າ heap)
+
+    Args:
+        sql_result: ຜົນລັບຈາກ execute_sql_node
+
+    Returns:
+        pa.Table: ຂໍ້ມູນທຸກແຖວ
+    """
+    spill_path = sql_result.get("spill_path")
+    if spill_path and os.path.exists(spill_path):
+        return pa.ipc.open_file(pa.memory_map(spill_path, "r")).read_all()
+    columns = sql_result.get("columns") or []
+    return _table_from_data(columns, sql_result.get("data") or {})
+
+
+def result_to_dataframe(sql_result: dict) -> pd.DataFrame:
+    """
+    ແປງ sql_result ເປັນ pandas DataFrame
+
+    Args:
+        sql_result: ຜົນລັບຈາກ execute_sql_node
+
+    Returns:
+        pd.DataFrame: DataFrame ທີ່ columns ລຽງຕາມ SQL
+    """
+    if sql_result.get("spill_path"):
+        return load_table(sql_result).to_pandas()
+    columns = sql_result.get("columns") or []
+    data = sql_result.get("data") or {}
+    return pd.DataFrame({col: data.get(col, []) for col in columns}, columns=columns)
+
+
+def iter_rows(sql_result: dict):
+    """
+    ວົນອ່ານ sql_result ເປັນ tuple ທີລະແຖວ (ລຽງຕາມ columns)
+    """
+    if sql_result.get("spill_path"):
+        table = load_table(sql_result)
+        return (
+            row
+            for batch in table.to_batches()
+            for row in zip(*(column.to_pylist() for column in batch.columns))
+        )
+    data = sql_result.get("data") or {}
+    return zip(*(data.get(col, []) for col in sql_result.get("columns") or []))
+
+
+def result_to_csv(sql_result: dict) -> bytes:
+    """
+    ແປງຜົນລັບເຕັມເປັນ CSV (UTF-8 BOM ເພື່ອໃຫ້ Excel ອ່ານພາສາລາວໄດ້)
+    """
+    return result_to_dataframe(sql_result).to_csv(index=False).encode("utf-8-sig")
@@ -0,0 +1,351 @@
+"""
+schema_catalog.py - Cache ຂອງ Schema test_visualization ພາຍໃນ Process
+
+ໂຫຼດ tables ແລະ columns ທັງໝົດດ້ວຍ Query ດຽວ, ເກັບໂຄງສ້າງໄວ້ໃນ Memory
+ແລະ ສ້າງ Schema Text ສຳລັບ Prompt ໃໝ່ກໍຕໍ່ເມື່ອ Schema ມີການປ່ຽນແປງແທ້ໆ.
+
+ການກວດສອບການປ່ຽນແປງ (DDL):
+1. ພາຍໃນ SCHEMA_CHECK_INTERVAL ວິນາທີ → ໃຊ້ Snapshot ເດີມໂດຍບໍ່ແຕະ DB
+2. ຫຼັງຈາກນັ້ນ → Query fingerprint ລາຄາຖືກຈາກ INFORMATION_SCHEMA.TABLES (CREATE_TIME)
+   ແລະ aggregate ຂອງ INFORMATION_SCHEMA.COLUMNS (ຈຳນວນ + checksum ຂອງ columns)
+3. ຖ້າ fingerprint ປ່ຽນ ຫຼື ເກີນ SCHEMA_CACHE_TTL → ໂຫຼດ columns ທັງໝົດໃໝ່
+
+ນອກຈາກ columns ຍັງເກັບ comments ແລະ Foreign Keys (KEY_COLUMN_USAGE) ເພື່ອໃຫ້
+Table Selector ເລືອກສະເພາະ tables ທີ່ກ່ຽວຂ້ອງກັບຄຳຖາມໄດ້.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from src.DB.db_config import get_pooled_connection
+from src.Tracing.tracer import add_metric
+
+
+SCHEMA_NAME = "test_visualization"
+
+
+@dataclass(frozen=True)
+class ColumnInfo:
+    """
+    ໂຄງສ້າງຂອງ Column ໜຶ່ງ
+    """
+    name: str
+    data_type: str
+    is_nullable: bool
+    column_key: str
+    comment: str = ""
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    """
+    Foreign Key ຈາກ column ຂອງ table ນີ້ ໄປຫາ column ຂອງ table ອື່ນ
+    """
+    column: str
+    ref_table: str
+    ref_column: str
+
+
+@dataclass(frozen=True)
+class TableInfo:
+    """
+    ໂຄງສ້າງຂອງ Table ໜຶ່ງ (ບໍ່ລວມ records)
+    """
+    name: str
+    columns: tuple[ColumnInfo, ...]
+    comment: str = ""
+    foreign_keys: tuple[ForeignKey, ...] = ()
+
+
+@dataclass(frozen=True)
+class SchemaSnapshot:
+    """
+    Snapshot ຂອງ Schema ທີ່ Parse ແລ້ວ ພ້ອມ Text ສຳລັບ Prompt
+
+    fingerprint ແມ່ນ hash ຂອງເນື້ອໃນ columns (ບໍ່ແມ່ນເວລາ) ຈຶ່ງຄົງທີ່
+    ຕາບໃດທີ່ໂຄງສ້າງ Schema ບໍ່ປ່ຽນ.
+    """
+    schema_name: str
+    tables: dict[str, TableInfo]
+    schema_text: str
+    fingerprint: str
+    ddl_fingerprint: str
+    loaded_at: float = field(default_factory=time.time)
+
+    def schema_text_for(self, table_names) -> str:
+        """
+        ສ້າງ Schema Text ສະເພາະ tables ທີ່ເລືອກ (ລຽງຕາມລຳດັບໃນ Schema)
+        """
+        wanted = set(table_names)
+        subset = {name: table for name, table in self.tables.items() if name in wanted}
+        return _format_schema_text(self.schema_name, subset)
+
+
+def _format_schema_text(schema_name: str, tables: dict[str, TableInfo]) -> str:
+    """
+    ສ້າງ Schema Text ສຳລັບ Prompt (ຮູບແບບດຽວກັບທີ່ get_schema_node ເຄີຍສ້າງ)
+    """
+    parts = [
+        f"=== Schema: {schema_name} ===\n",
+        f"ຈຳນວນ Tables: {len(tables)}\n\n",
+    ]
+    for table in tables.values():
+        parts.append(f"--- Table: {table.name} ---\n")
+        if table.comment:
+            parts.append(f"Comment: {table.comment}\n")
+        parts.append("Columns:\n")
+        for col in table.columns:
+            key_info = f" [{col.column_key}]" if col.column_key else ""
+            null_info = "NULL" if col.is_nullable else "NOT NULL"
+            comment_info = f" -- {col.comment}" if col.comment else ""
+            parts.append(f"  - {col.name}: {col.data_type} ({null_info}){key_info}{comment_info}\n")
+        if table.foreign_keys:
+            parts.append("Foreign Keys:\n")
+            for fk in table.foreign_keys:
+                parts.append(f"  - {fk.column} → {fk.ref_table}.{fk.ref_column}\n")
+        parts.append("\n")
+    return "".join(parts)
+
+
+class SchemaCatalog:
+    """
+    Catalog ຂອງ Schema ທີ່ໃຊ້ຮ່ວມກັນທັງ Process (thread-safe)
+    """
+
+    def __init__(
+        self,
+        schema_name: str = SCHEMA_NAME,
+        check_interval: float | None = None,
+        ttl: float | None = None,
+    ):
+        self.schema_name = schema_name
+        self.check_interval = (
+            check_interval if check_interval is not None
+            else float(os.getenv("SCHEMA_CHECK_INTERVAL", "30"))
+        )
+        self.ttl = ttl if ttl is not None else float(os.getenv("SCHEMA_CACHE_TTL", "3600"))
+
+        self._snapshot: SchemaSnapshot | None = None
+        self._last_checked = 0.0
+        self._lock = threading.Lock()
+
+    def get_snapshot(self, force_reload: bool = False) -> SchemaSnapshot:
+        """
+        ດຶງ Snapshot ປັດຈຸບັນ, ໂຫຼດໃໝ່ສະເພາະເມື່ອ Schema ປ່ຽນ
+
+        Args:
+            force_reload: ບັງຄັບໃຫ້ໂຫຼດ columns ທັງໝົດໃໝ່
+
+        Returns:
+            SchemaSnapshot: Snapshot ຂອງ Schema
+        """
+        snapshot = self._snapshot
+        now = time.time()
+        if (
+            snapshot is not None
+            and not force_reload
+            and now - self._last_checked < self.check_interval
+        ):
+            return snapshot
+
+        with self._lock:
+            # ອາດມີ thread ອື່ນໂຫຼດໃຫ້ແລ້ວໃນລະຫວ່າງລໍຖ້າ lock
+            snapshot = self._snapshot
+            now = time.time()
+            if (
+                snapshot is not None
+                and not force_reload
+                and now - self._last_checked < self.check_interval
+            ):
+                return snapshot
+
+            try:
+                self._snapshot = self._refresh(snapshot, force_reload)
+            except Exception as e:
+                if snapshot is None:
+                    raise
+                # ໃຊ້ Snapshot ເກົ່າຕໍ່ ຖ້າ DB ມີບັນຫາຊົ່ວຄາວ
+                logger.warning(f"⚠️ Schema refresh failed, serving cached schema: {e}")
+            self._last_checked = time.time()
+            return self._snapshot
+
+    def invalidate(self):
+        """
+        ບັງຄັບໃຫ້ການຮຽກຄັ້ງຕໍ່ໄປກວດສອບ DB ທັນທີ
+        """
+        self._last_checked = 0.0
+
+    def _refresh(self, snapshot: SchemaSnapshot | None, force_reload: bool) -> SchemaSnapshot:
+        with get_pooled_connection() as connection:
+            cursor = connection.cursor()
+            try:
+                ddl_fingerprint = self._fetch_ddl_fingerprint(cursor)
+                add_metric("db.round_trips", 2)
+
+                expired = snapshot is None or time.time() - snapshot.loaded_at >= self.ttl
+                if (
+                    snapshot is not None
+                    and not force_reload
+                    and not expired
+                    and snapshot.ddl_fingerprint == ddl_fingerprint
+                ):
+                    logger.debug("📊 Schema unchanged (fingerprint match)")
+                    return snapshot
+
+                tables = self._fetch_tables(cursor)
+                add_metric("db.round_trips", 3)
+            finally:
+                cursor.close()
+
+        fingerprint = self._content_fingerprint(tables)
+        if snapshot is not None and snapshot.fingerprint == fingerprint:
+            # ໂຄງສ້າງຄືເກົ່າ → ບໍ່ຕ້ອງສ້າງ Text ໃໝ່
+            logger.debug("📊 Schema reloaded, content unchanged")
+            return SchemaSnapshot(
+                schema_name=snapshot.schema_name,
+                tables=snapshot.tables,
+                schema_text=snapshot.schema_text,
+                fingerprint=snapshot.fingerprint,
+                ddl_fingerprint=ddl_fingerprint,
+            )
+
+        logger.success(f"✅ Schema catalog loaded: {len(tables)} tables")
+        return SchemaSnapshot(
+            schema_name=self.schema_name,
+            tables=tables,
+            schema_text=_format_schema_text(self.schema_name, tables),
+            fingerprint=fingerprint,
+            ddl_fingerprint=ddl_fingerprint,
+        )
+
+    def _fetch_ddl_fingerprint(self, cursor) -> str:
+        """
+        Fingerprint ລາຄາຖືກ: ລາຍຊື່ tables + CREATE_TIME ແລະ ຈຳນວນ/checksum ຂອງ columns
+
+        CREATE_TIME ປ່ຽນສະເພາະ ALTER ທີ່ສ້າງ table ໃໝ່ (ALGORITHM=COPY); ALTER ແບບ INSTANT/INPLACE
+        (ເຊັ່ນ ADD COLUMN, RENAME COLUMN) ບໍ່ປ່ຽນມັນ → ກວດ columns ດ້ວຍ aggregate ອີກ Query ໜຶ່ງ
+        (ຂໍ້ມູນດຽວກັບທີ່ _fetch_tables ອ່ານ ແຕ່ສົ່ງກັບມາແຖວດຽວ)
+        """
+        cursor.execute(
+            """
+            SELECT TABLE_NAME, CREATE_TIME
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = ?
+            ORDER BY TABLE_NAME
+            """,
+            (self.schema_name,),
+        )
+        digest = hashlib.sha256()
+        for table_name, create_time in cursor.fetchall():
+            digest.update(f"{table_name}|{create_time}\n".encode("utf-8"))
+
+        cursor.execute(
+            """
+            SELECT COUNT(*), SUM(CRC32(CONCAT_WS('|', TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION,
+                                                COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_COMMENT)))
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = ?
+            """,
+            (self.schema_name,),
+        )
+        column_count, column_checksum = cursor.fetchone()
+        digest.update(f"columns|{column_count}|{column_checksum}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _fetch_tables(self, cursor) -> dict[str, TableInfo]:
+        """
+        ດຶງ columns ຂອງທຸກ tables ດ້ວຍ Query ດຽວ (ແທນ N+1 queries)
+        ພ້ອມ comments ແລະ Foreign Keys
+        """
+        cursor.execute(
+            """
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_COMMENT
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = ?
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """,
+            (self.schema_name,),
+        )
+        grouped: dict[str, list[ColumnInfo]] = {}
+        for table_name, col_name, data_type, is_nullable, col_key, comment in cursor.fetchall():
+            grouped.setdefault(table_name, []).append(
+                ColumnInfo(
+                    name=col_name,
+                    data_type=data_type,
+                    is_nullable=is_nullable == "YES",
+                    column_key=col_key or "",
+                    comment=comment or "",
+                )
+            )
+
+        cursor.execute(
+            """
+            SELECT TABLE_NAME, TABLE_COMMENT
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = ?
+            """,
+            (self.schema_name,),
+        )
+        table_comments = {name: comment or "" for name, comment in cursor.fetchall()}
+
+        cursor.execute(
+            """
+            SELECT TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+            FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = ? AND REFERENCED_TABLE_NAME IS NOT NULL
+            ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+            """,
+            (self.schema_name,),
+        )
+        foreign_keys: dict[str, list[ForeignKey]] = {}
+        for table_name, col_name, ref_table, ref_column in cursor.fetchall():
+            foreign_keys.setdefault(table_name, []).append(
+                ForeignKey(column=col_name, ref_table=ref_table, ref_column=ref_column)
+            )
+
+        return {
+            name: TableInfo(
+                name=name,
+                columns=tuple(columns),
+                comment=table_comments.get(name, ""),
+                foreign_keys=tuple(foreign_keys.get(name, ())),
+            )
+            for name, columns in grouped.items()
+        }
+
+    @staticmethod
+    def _content_fingerprint(tables: dict[str, TableInfo]) -> str:
+        digest = hashlib.sha256()
+        for table in tables.values():
+            digest.update(f"{table.name}|{table.comment}\n".encode("utf-8"))
+            for col in table.columns:
+                digest.update(
+                    f"{table.name}|{col.name}|{col.data_type}|{col.is_nullable}|{col.column_key}|{col.comment}\n".encode("utf-8")
+                )
+            for fk in table.foreign_keys:
+                digest.update(f"{table.name}|{fk.column}|{fk.ref_table}|{fk.ref_column}\n".encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+
+_catalog: SchemaCatalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_schema_catalog() -> SchemaCatalog:
+    """
+    ດຶງ SchemaCatalog ທີ່ໃຊ້ຮ່ວມກັນທັງ Process
+
+    Returns:
+        SchemaCatalog: Catalog instance
+    """
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = SchemaCatalog()
+    return _catalog
@@ -0,0 +1,236 @@
+"""
+sql_validator.py - ກວດ SQL ຈາກ LLM ກັບ Schema ທີ່ Cache ໄວ້ (ບໍ່ແຕະ MariaDB)
+
+ໃຊ້ sqlglot (MySQL dialect ເຊິ່ງໃກ້ຄຽງກັບ MariaDB) ເພື່ອ:
+1. Parse SQL → Syntax error ພ້ອມຕຳແໜ່ງ (ແຖວ/column)
+2. ກວດທຸກ table ວ່າມີໃນ Schema; table ທີ່ບໍ່ມີ `test_visualization.` ນຳໜ້າ
+   ຈະຖືກເພີ່ມໃຫ້ອັດຕະໂນມັດ (ແກ້ໃນ Text ເດີມ, ບໍ່ generate SQL ໃໝ່)
+3. ກວດທຸກ column (ລວມທັງ alias, CTE, subquery, correlated subquery) ວ່າມີຢູ່ແທ້
+
+Error ທີ່ໄດ້ແມ່ນ SQLValidationError (subclass ຂອງ QueryRejected) ຈຶ່ງຖືກຈັດການ
+ຄືກັບ Query Guard ແລະ ສົ່ງຕໍ່ໃຫ້ repair_sql ແກ້ໄດ້ໂດຍກົງ.
+"""
+
+import difflib
+from dataclasses import dataclass, field
+
+import sqlglot
+from loguru import logger
+from sqlglot import exp
+from sqlglot.errors import ParseError
+from sqlglot.optimizer.scope import Scope, traverse_scope
+
+from src.DB.query_guard import QueryRejected
+from src.DB.schema_catalog import SchemaSnapshot
+
+
+DIALECT = "mysql"
+
+
+class SQLValidationError(QueryRejected):
+    """
+    SQL ອ້າງເຖິງ table/column ທີ່ບໍ່ມີ ຫຼື Syntax ຜິດ
+
+    Attributes:
+        errors: ລາຍການ Error ແຕ່ລະຈຸດ
+    """
+
+    def __init__(self, errors: list[str]):
+        self.errors = errors
+        super().__init__("SQL validation failed: " + "; ".join(errors))
+
+
+@dataclass
+class ValidatedQuery:
+    """
+    ຜົນການກວດ SQL
+
+    Attributes:
+        sql: SQL ທີ່ພ້ອມ execute (ເພີ່ມ schema ໃຫ້ table ແລ້ວ)
+        qualified_tables: tables ທີ່ຖືກເພີ່ມ `test_visualization.` ໃຫ້
+        tables: tables ຂອງ Schema ທີ່ SQL ໃຊ້
+    """
+    sql: str
+    qualified_tables: list[str] = field(default_factory=list)
+    tables: list[str] = field(default_factory=list)
+
+    @property
+    def rewritten(self) -> bool:
+        return bool(self.qualified_tables)
+
+
+def _suggest(name: str, candidates) -> str:
+    matches = difflib.get_close_matches(name.lower(), [c.lower() for c in candidates], n=3, cutoff=0.6)
+    return f" (ໝາຍເຖິງ {', '.join(matches)} ບໍ?)" if matches else ""
+
+
+class _Resolver:
+    """
+    ຈັບຄູ່ table/column ກັບ SchemaSnapshot (case-insensitive ຄືກັບ MariaDB)
+    """
+
+    def __init__(self, snapshot: SchemaSnapshot):
+        self.schema_name = snapshot.schema_name.lower()
+        self.tables = {name.lower(): table for name, table in snapshot.tables.items()}
+        self.columns = {
+            name: {col.name.lower() for col in table.columns}
+            for name, table in self.tables.items()
+        }
+
+    def table_columns(self, table: exp.Table) -> set[str] | None:
+        if table.db and table.db.lower() != self.schema_name:
+            return None
+        return self.columns.get(table.name.lower())
+
+    def source_columns(self, source) -> set[str] | None:
+        """
+        Columns ທີ່ source (table ຫຼື derived table/CTE) ມີ; None = ບອກບໍ່ໄດ້ (ຂ້າມການກວດ)
+        """
+        if isinstance(source, exp.Table):
+            return self.table_columns(source)
+        if isinstance(source, Scope):
+            query = source.expression
+            selects = getattr(query, "selects", None)
+            if not selects or any(select.is_star for select in selects):
+                return None
+            return {name.lower() for name in query.named_selects}
+        return None
+
+
+def _check_tables(expression: exp.Expression, resolver: _Resolver, errors: list[str]) -> tuple[list[exp.Table], list[str]]:
+    """
+    Returns:
+        tuple: (tables ທີ່ຕ້ອງເພີ່ມ schema, ຊື່ tables ຂອງ Schema ທີ່ໃຊ້)
+    """
+    cte_names = {cte.alias_or_name.lower() for cte in expression.find_all(exp.CTE)}
+    unqualified = []
+    used = []
+    for table in expression.find_all(exp.Table):
+        name = table.name
+        if not name:
+            continue
+        if not table.db and name.lower() in cte_names:
+            continue
+        if table.db and table.db.lower() != resolver.schema_name:
+            errors.append(f"Schema `{table.db}` ບໍ່ອະນຸຍາດ (ໃຊ້ `{resolver.schema_name}` ເທົ່ານັ້ນ)")
+            continue
+        if name.lower() not in resolver.tables:
+            errors.append(f"ບໍ່ພົບ table `{name}`{_suggest(name, resolver.tables)}")
+            continue
+        used.append(resolver.tables[name.lower()].name)
+        if not table.db:
+            unqualified.append(table)
+    return unqualified, used
+
+
+def _check_column(scope: Scope, column: exp.Column, resolver: _Resolver) -> str | None:
+    """
+    ຫາ column ໃນ scope ປັດຈຸບັນ ແລ້ວໄລ່ຂຶ້ນ scope ນອກ (correlated subquery)
+
+    Returns:
+        str | None: Error message ຫຼື None ຖ້າຫາພົບ/ບອກບໍ່ໄດ້
+    """
+    name = column.name.lower()
+    qualifier = column.table
+    candidates: set[str] = set()
+    # ORDER BY / GROUP BY / HAVING ອ້າງເຖິງ alias ຂອງ SELECT ໄດ້
+    if not qualifier and column.find_ancestor(exp.Order, exp.Group, exp.Having) is not None:
+        if name in {alias.lower() for alias in scope.expression.named_selects}:
+            return None
+
+    walk = scope
+    while walk is not None:
+        if qualifier:
+            source = walk.sources.get(qualifier)
+            if source is None:
+                source = next(
+                    (s for alias, s in walk.sources.items() if alias.lower() == qualifier.lower()),
+                    None,
+                )
+            if source is not None:
+                columns = resolver.source_columns(source)
+                if columns is None or name in columns:
+                    return None
+                return f"ບໍ່ພົບ column `{column.name}` ໃນ `{qualifier}`{_suggest(column.name, columns)}"
+        else:
+            for source in walk.sources.values():
+                columns = resolver.source_columns(source)
+                if columns is None or name in columns:
+                    return None
+                candidates |= columns
+        walk = walk.parent
+
+    if qualifier:
+        return f"ບໍ່ພົບ table ຫຼື alias `{qualifier}` (ໃນ `{qualifier}.{column.name}`)"
+    return f"ບໍ່ພົບ column `{column.name}`{_suggest(column.name, candidates)}"
+
+
+def _check_columns(expression: exp.Expression, resolver: _Resolver, errors: list[str]):
+    for scope in traverse_scope(expression):
+        for column in scope.columns:
+            if isinstance(column.this, exp.Star):
+                continue
+            # scope.columns ຂອງ scope ນອກລວມ columns ຂອງ subquery ນຳ → ກວດສະເພາະ column ຂອງ scope ນີ້
+            if column.find_ancestor(exp.Select) is not scope.expression:
+                continue
+            error = _check_column(scope, column, resolver)
+            if error and error not in errors:
+                errors.append(error)
+
+
+def _qualify(sql: str, tables: list[exp.Table], schema_name: str) -> str:
+    """
+    ເພີ່ມ `schema.` ໜ້າ table ໃນ Text ເດີມ (ຕາມຕຳແໜ່ງຈາກ tokenizer) ເພື່ອບໍ່ໃຫ້ SQL ປ່ຽນຮູບ
+    """
+    positions = sorted({table.this.meta["start"] for table in tables}, reverse=True)
+    for start in positions:
+        sql = f"{sql[:start]}{schema_name}.{sql[start:]}"
+    return sql
+
+
+def validate_sql(sql: str, snapshot: SchemaSnapshot) -> ValidatedQuery:
+    """
+    ກວດ SQL ກັບ Schema ໃນ memory
+
+    Args:
+        sql: SQL ຈາກ LLM
+        snapshot: SchemaSnapshot ຈາກ get_schema_catalog()
+
+    Returns:
+        ValidatedQuery: SQL ທີ່ເພີ່ມ schema ໃຫ້ table ແລ້ວ
+
+    Raises:
+        SQLValidationError: Syntax ຜິດ ຫຼື ອ້າງເຖິງ table/column ທີ່ບໍ່ມີ
+    """
+    try:
+        statements = [s for s in sqlglot.parse(sql, read=DIALECT) if s is not None]
+    except ParseError as e:
+        details = [
+            f"Syntax error ແຖວ {err.get('line')} column {err.get('col')} "
+            f"(ໃກ້ `{err.get('highlight')}`): {str(err.get('description')).split(' but got')[0]}"
+            for err in e.errors
+        ] or [f"Syntax error: {e}"]
+        raise SQLValidationError(details[:3]) from e
+
+    if len(statements) != 1:
+        # ຫຼາຍ statements → Query Guard ປະຕິເສດຢູ່ແລ້ວ
+        return ValidatedQuery(sql=sql)
+
+    expression = statements[0]
+    resolver = _Resolver(snapshot)
+    errors: list[str] = []
+    unqualified, used = _check_tables(expression, resolver, errors)
+    try:
+        _check_columns(expression, resolver, errors)
+    except Exception as e:
+        # ໂຄງສ້າງທີ່ sqlglot ບໍ່ຮອງຮັບ → ໃຫ້ MariaDB ຕັດສິນ
+        logger.warning(f"⚠️ Column validation skipped: {e}")
+
+    if errors:
+        raise SQLValidationError(errors)
+
+    qualified = [table.name for table in unqualified]
+    if unqualified:
+        sql = _qualify(sql, unqualified, snapshot.schema_name)
+        logger.info(f"🧩 Auto-qualified tables with `{snapshot.schema_name}.`: {', '.join(dict.fromkeys(qualified))}")
+    return ValidatedQuery(sql=sql, qualified_tables=list(dict.fromkeys(qualified)), tables=list(dict.fromkeys(used)))
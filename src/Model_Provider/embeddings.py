@@ -0,0 +1,72 @@
+"""
+embeddings.py - Local Text Embeddings (ບໍ່ຕ້ອງໃຊ້ Network)
+
+ໃຊ້ Character n-gram + Hashing trick ແທນ Model ໃຫຍ່:
+- ເໝາະກັບພາສາລາວທີ່ບໍ່ມີຍະຫວ່າງລະຫວ່າງຄຳ (ບໍ່ຕ້ອງຕັດຄຳ)
+- Vector ມີຂະໜາດຄົງທີ່ (dim) ຈຶ່ງບໍ່ຕ້ອງເກັບ vocabulary
+- IDF weighting ໃຫ້ຜູ້ໃຊ້ (ເຊັ່ນ SemanticCache) ຄິດໄລ່ຈາກ corpus ຂອງຕົນເອງ
+"""
+
+import os
+import threading
+import zlib
+
+import numpy as np
+
+
+class CharNgramEmbedder:
+    """
+    Embedder ແບບ Character n-gram TF (sublinear) ທີ່ hash ເຂົ້າ vector ຂະໜາດ dim
+    """
+
+    def __init__(self, dim: int = 4096, ngram_range: tuple[int, int] = (2, 4)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _ngrams(self, text: str):
+        padded = f" {text} "
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            for i in range(len(padded) - n + 1):
+                yield padded[i:i + n]
+
+    def embed_one(self, text: str) -> np.ndarray:
+        """
+        ແປງຂໍ້ຄວາມເປັນ vector (float32, ຍັງບໍ່ normalize)
+        """
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for gram in self._ngrams(text):
+            vector[zlib.crc32(gram.encode("utf-8")) % self.dim] += 1.0
+        # Sublinear TF: ຫຼຸດນ້ຳໜັກຂອງ n-gram ທີ່ຊ້ຳຫຼາຍເທື່ອ
+        np.log1p(vector, out=vector)
+        return vector
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """
+        ແປງຫຼາຍຂໍ້ຄວາມເປັນ matrix (len(texts), dim)
+        """
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            matrix[row] = self.embed_one(text)
+        return matrix
+
+
+_embedder: CharNgramEmbedder | None = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> CharNgramEmbedder:
+    """
+    ດຶງ Embedder ທີ່ໃຊ້ຮ່ວມກັນທັງ Process
+
+    ຕັ້ງຄ່າຜ່ານ EMBEDDING_DIM (default: 4096)
+
+    Returns:
+        CharNgramEmbedder: Embedder instance
+    """
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                _embedder = CharNgramEmbedder(dim=int(os.getenv("EMBEDDING_DIM", "4096")))
+    return _embedder
@@ -1,31 +1,234 @@
+import asyncio
+import json
 import os
+import threading
+import weakref
+from typing import Sequence
+
+import httpx
 from langchain_groq import ChatGroq
 from loguru import logger
 
+from src.Model_Provider.llm_scheduler import ScheduledLLM, get_llm_scheduler, llm_scheduler_enabled
+from src.Model_Provider.model_router import large_model
+from src.Tracing.tracer import LLMUsageCallback
+
+
+# Registry ຂອງ LLM instances: (model_name, temperature, tool names, purpose) → LLM/Runnable
+_llm_registry: dict[tuple, object] = {}
+_registry_lock = threading.Lock()
+
+_llm_factory = None
+
+_http_client: httpx.Client | None = None
+_http_async_client: httpx.AsyncClient | None = None
+
+# AsyncClient ຕໍ່ event loop: connections ຂອງ AsyncClient ຜູກກັບ loop ທີ່ເປີດມັນ
+# (ໃຊ້ຂ້າມ loop ເຊັ່ນ asyncio.run ຄັ້ງທີ 2 → "Event loop is closed")
+_loop_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_loop_clients_lock = threading.Lock()
+
+
+def _http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10")),
+        keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "120")),
+    )
+
+
+def _http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(float(os.getenv("LLM_HTTP_TIMEOUT", "120")), connect=10.0)
+
 
-def get_router_llm(model_name: str = "moonshotai/kimi-k2-instruct-0905", temperature: float = 0.0):
+def _observe_rate_limits(response: httpx.Response):
     """
-    ສ້າງ LLM ສຳລັບ Router/Agent ໂດຍໃຊ້ Groq
-    
-    Args:
-        model_name: ຊື່ model (default: moonshotai/kimi-k2-instruct-0905)
-        temperature: ຄວາມສຸ່ມຂອງ output (0.0 = deterministic)
-    
-    Returns:
-        ChatGroq: LLM instance
+    ສົ່ງ x-ratelimit-* headers ຂອງທຸກ response ໃຫ້ LLMScheduler (model ອ່ານຈາກ request body)
+    """
+    if "x-ratelimit-remaining-tokens" not in response.headers:
+        return
+    try:
+        model_name = json.loads(response.request.content or b"{}").get("model")
+    except (httpx.RequestNotRead, ValueError, AttributeError):
+        return
+    if model_name:
+        get_llm_scheduler().observe_response(model_name, response.headers)
+
+
+async def _observe_rate_limits_async(response: httpx.Response):
+    _observe_rate_limits(response)
+
+
+def _get_http_client() -> httpx.Client:
+    """
+    HTTP client ທີ່ໃຊ້ຮ່ວມກັນທຸກ LLM instances (keep-alive + TLS session reuse)
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            limits=_http_limits(),
+            timeout=_http_timeout(),
+            event_hooks={"response": [_observe_rate_limits]},
+        )
+    return _http_client
+
+
+def _loop_async_client() -> httpx.AsyncClient:
+    """
+    AsyncClient ຂອງ event loop ທີ່ກຳລັງ run (ສ້າງເມື່ອ loop ໃຊ້ຄັ້ງທຳອິດ, ຫາຍໄປພ້ອມ loop)
+    """
+    loop = asyncio.get_running_loop()
+    client = _loop_async_clients.get(loop)
+    if client is None:
+        with _loop_clients_lock:
+            client = _loop_async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    limits=_http_limits(),
+                    timeout=_http_timeout(),
+                    event_hooks={"response": [_observe_rate_limits_async]},
+                )
+                _loop_async_clients[loop] = client
+                _close_with_loop(loop, client)
+    return client
+
+
+def _close_with_loop(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+    """
+    ປິດ AsyncClient ກ່ອນ loop ປິດ: asyncio.run ເອີ້ນ shutdown_default_executor ກ່ອນ close
     """
+    shutdown = loop.shutdown_default_executor
+
+    async def shutdown_default_executor(*args, **kwargs):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.debug(f"LLM async client close failed: {e}")
+        with _loop_clients_lock:
+            _loop_async_clients.pop(loop, None)
+        await shutdown(*args, **kwargs)
+
+    try:
+        loop.shutdown_default_executor = shutdown_default_executor
+    except AttributeError:
+        # loop ທີ່ບໍ່ໃຫ້ປ່ຽນ attribute (ເຊັ່ນ uvloop): connections ປິດເມື່ອ loop ຖືກ GC
+        pass
+
+
+class _LoopLocalAsyncClient(httpx.AsyncClient):
+    """
+    AsyncClient ທີ່ ChatGroq ເກັບໄວ້ (instance ດຽວໃຊ້ໄດ້ທຸກ loop): ສ້າງ request ເອງ ແຕ່ສົ່ງຜ່ານ
+    AsyncClient ຂອງ loop ທີ່ກຳລັງ run
+    """
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await _loop_async_client().send(request, **kwargs)
+
+
+def _get_http_async_client() -> httpx.AsyncClient:
+    """
+    Async HTTP client ສຳລັບ ainvoke/astream (keep-alive ຮ່ວມກັນພາຍໃນແຕ່ລະ event loop)
+    """
+    global _http_async_client
+    if _http_async_client is None:
+        _http_async_client = _LoopLocalAsyncClient(timeout=_http_timeout())
+    return _http_async_client
+
+
+def _tools_key(tools: Sequence | None) -> tuple:
+    if not tools:
+        return ()
+    return tuple(getattr(tool, "__name__", None) or repr(tool) for tool in tools)
+
+
+def _create_llm(model_name: str, temperature: float) -> ChatGroq:
+    if _llm_factory is not None:
+        return _llm_factory(model_name, temperature)
+
     api_key = os.getenv("GROQ_API_KEY")
-    
+
     if not api_key:
         logger.error("❌ GROQ_API_KEY not found in environment variables")
         raise ValueError("GROQ_API_KEY is required")
-    
+
     logger.info(f"🤖 Initializing Groq LLM: {model_name}")
-    
-    llm = ChatGroq(
+
+    return ChatGroq(
         api_key=api_key,
         model=model_name,
-        temperature=temperature
+        temperature=temperature,
+        http_client=_get_http_client(),
+        http_async_client=_get_http_async_client(),
+        # LLMScheduler ເປັນຜູ້ retry ທັງ 429 (ລໍຖ້າຕາມ headers ແລະ ຢຸດທຸກ calls ຂອງ model ພ້ອມກັນ)
+        # ແລະ Error ຊົ່ວຄາວ (connection, timeout, 5xx); ເມື່ອປິດ Scheduler ໃຫ້ SDK retry ຄືເກົ່າ
+        max_retries=0 if llm_scheduler_enabled() else 2,
+        callbacks=[LLMUsageCallback()],
     )
-    
+
+
+def get_router_llm(
+    model_name: str | None = None,
+    temperature: float = 0.0,
+    tools: Sequence | None = None,
+    purpose: str = "sql",
+):
+    """
+    ດຶງ LLM ສຳລັບ Router/Agent ໂດຍໃຊ້ Groq (ໃຊ້ instance ຮ່ວມກັນ, thread-safe)
+
+    Instance ຖືກສ້າງຄັ້ງດຽວຕໍ່ (model_name, temperature, tools) ແລະ ໃຊ້ HTTP
+    connection pool ຮ່ວມກັນ, ຈຶ່ງບໍ່ຕ້ອງ handshake ໃໝ່ທຸກຄຳຖາມ.
+    ທຸກ call ຜ່ານ LLMScheduler (Rate limit ຕໍ່ model, ຄິວຕາມ priority, retry ເມື່ອຖືກ 429).
+
+    Args:
+        model_name: ຊື່ model (default: model ໃຫຍ່ຂອງ ModelRouter, LLM_SQL_LARGE_MODEL)
+        temperature: ຄວາມສຸ່ມຂອງ output (0.0 = deterministic)
+        tools: Tool schemas ທີ່ຕ້ອງການ bind ລ່ວງໜ້າ (ເຊັ່ນ: [FileGenerationSchema])
+        purpose: "sql" ຫຼື "chart" (SQL ໄດ້ຄິວກ່ອນ Chart ເມື່ອຕິດ Rate limit)
+
+    Returns:
+        ScheduledLLM: LLM instance (ຫຼື LLM ທີ່ bind tools ແລ້ວ) ທີ່ຜ່ານ Scheduler
+    """
+    model_name = model_name or large_model()
+    key = (model_name, float(temperature), _tools_key(tools), purpose)
+    llm = _llm_registry.get(key)
+    if llm is not None:
+        return llm
+
+    with _registry_lock:
+        llm = _llm_registry.get(key)
+        if llm is None:
+            base_key = (model_name, float(temperature), (), None)
+            base_llm = _llm_registry.get(base_key)
+            if base_llm is None:
+                base_llm = _create_llm(model_name, temperature)
+                _llm_registry[base_key] = base_llm
+
+            bound = base_llm.bind_tools(tools=list(tools)) if tools else base_llm
+            llm = ScheduledLLM(bound, model_name, purpose)
+            _llm_registry[key] = llm
+
     return llm
+
+
+def set_llm_factory(factory=None):
+    """
+    ປ່ຽນ function ສ້າງ LLM (ເຊັ່ນ: Fake chat model ສຳລັບ benchmarks/load tests)
+    ແລະ ລ້າງ registry; None = ກັບໄປໃຊ້ ChatGroq
+
+    Args:
+        factory: callable(model_name, temperature) → BaseChatModel
+    """
+    global _llm_factory
+    with _registry_lock:
+        _llm_factory = factory
+        _llm_registry.clear()
+
+
+def clear_llm_registry():
+    """
+    ລ້າງ LLM instances ທີ່ Cache ໄວ້ (ເຊັ່ນ: ຫຼັງຈາກປ່ຽນ GROQ_API_KEY)
+    """
+    with _registry_lock:
+        _llm_registry.clear()
@@ -0,0 +1,626 @@
+"""
+llm_scheduler.py - ຈັດຄິວ LLM calls ຕາມ Rate limit ຂອງ Groq (ຕໍ່ model)
+
+- ແຕ່ລະ model ມີ Token bucket 2 ອັນ: requests ຕໍ່ນາທີ (RPM) ແລະ tokens ຕໍ່ນາທີ (TPM)
+  ຄ່າເລີ່ມຕົ້ນຈາກ LLM_RPM_LIMIT/LLM_TPM_LIMIT ຫຼື LLM_RATE_LIMITS (JSON ຕໍ່ model),
+  ແລ້ວປັບຕາມ headers x-ratelimit-* ທີ່ Groq ສົ່ງກັບມາທຸກ response
+- Calls ທີ່ລໍຖ້າຢູ່ຖືກຈັດລຳດັບຕາມ priority: ຄຳຖາມຂອງຜູ້ໃຊ້ (interactive) ກ່ອນ batch,
+  ແລະ ການສ້າງ SQL ກ່ອນການສ້າງ Chart; priority ດຽວກັນມາກ່ອນໄດ້ກ່ອນ (FIFO)
+- 429 → ຢຸດທຸກ calls ຂອງ model ນັ້ນຕາມ retry-after/x-ratelimit-reset-* (+ jitter)
+  ແລ້ວລອງໃໝ່ (ສູງສຸດ LLM_RATE_LIMIT_MAX_RETRIES ຄັ້ງ) ແທນທີ່ຈະໃຫ້ Node ລົ້ມເຫຼວທັນທີ
+- Connection error, timeout, 408/409 ແລະ 5xx → ລອງໃໝ່ແບບ exponential backoff (ສູງສຸດ
+  LLM_TRANSIENT_MAX_RETRIES ຄັ້ງ) ແທນ retry ຂອງ Groq SDK (ປິດໄວ້ ເພື່ອບໍ່ໃຫ້ SDK retry 429 ເອງ)
+- Metrics: ຄວາມຍາວຄິວ ແລະ ເວລາລໍຖ້າ (scheduler.stats(), span attribute llm.queue_wait_ms)
+
+ປິດໄດ້ດ້ວຍ LLM_SCHEDULER_ENABLED=0
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import random
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import httpx
+from langchain_core.runnables import Runnable
+from loguru import logger
+
+from src.Tracing.tracer import add_metric, set_attribute
+
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+
+# ຄ່າໜ້ອຍ = ໄດ້ກ່ອນ
+_PRIORITY_RANK = {PRIORITY_INTERACTIVE: 0, PRIORITY_BATCH: 1}
+_PURPOSE_RANK = {"sql": 0, "chart": 1}
+
+_request_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "llm_request_priority", default=PRIORITY_INTERACTIVE
+)
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+class LLMQueueTimeout(TimeoutError):
+    """
+    ລໍຖ້າ Rate limit ເກີນ LLM_QUEUE_TIMEOUT ວິນາທີ
+    """
+
+
+def llm_scheduler_enabled() -> bool:
+    return os.getenv("LLM_SCHEDULER_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+@contextmanager
+def request_priority(priority: str):
+    """
+    ກຳນົດ priority ຂອງ LLM calls ທັງໝົດພາຍໃນ block (ສົ່ງຕໍ່ເຂົ້າ nodes ຜ່ານ contextvars)
+
+    Example:
+        with request_priority(PRIORITY_BATCH):
+            get_agent_app().invoke(state)
+    """
+    if priority not in _PRIORITY_RANK:
+        raise ValueError(f"Unknown LLM priority '{priority}' (choose from {', '.join(_PRIORITY_RANK)})")
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+def parse_duration(value: str | None) -> float | None:
+    """
+    ແປງເວລາຂອງ Groq headers ("7.66s", "2m59.56s", "1h2m", "450ms" ຫຼື "12") ເປັນວິນາທີ
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+def _error_response(error: Exception):
+    return getattr(error, "response", None)
+
+
+def _status_code(error: Exception) -> int | None:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(_error_response(error), "status_code", None)
+    return status
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    True ຖ້າ Exception ມາຈາກ HTTP 429 (groq.RateLimitError, httpx.HTTPStatusError, ...)
+    """
+    return _status_code(error) == 429
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    True ສຳລັບ Error ທີ່ລອງໃໝ່ແລ້ວອາດຜ່ານ (ຊຸດດຽວກັບທີ່ Groq SDK retry, ຍົກເວັ້ນ 429):
+    connection error, timeout (groq.APIConnectionError/APITimeoutError, httpx.TransportError),
+    HTTP 408, 409 ແລະ 5xx
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status in (408, 409) or status >= 500
+    if isinstance(error, httpx.TransportError):
+        return True
+    return any(cls.__name__ in ("APIConnectionError", "APITimeoutError") for cls in type(error).__mro__)
+
+
+def retry_after(error: Exception) -> float | None:
+    """
+    ເວລາທີ່ Groq ບອກໃຫ້ລໍຖ້າ (retry-after ຫຼື x-ratelimit-reset-*) ຈາກ Exception
+    """
+    headers = getattr(_error_response(error), "headers", None) or {}
+    for name in ("retry-after", "x-ratelimit-reset-tokens", "x-ratelimit-reset-requests"):
+        seconds = parse_duration(headers.get(name))
+        if seconds is not None:
+            return seconds
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket ທີ່ເຕີມຄືນແບບຕໍ່ເນື່ອງ (ບໍ່ thread-safe; ໃຊ້ພາຍໃຕ້ lock ຂອງ ModelLimiter)
+
+    level ຕິດລົບໄດ້ (ໃຊ້ tokens ເກີນທີ່ຄາດໄວ້) → calls ຕໍ່ໄປລໍຖ້າຈົນກວ່າຈະເຕີມຄືນ
+    """
+
+    def __init__(self, capacity: float, per_minute: float):
+        self.capacity = float(capacity)
+        self.rate = float(per_minute) / 60.0
+        self.level = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate > 0 else float("inf")
+
+    def consume(self, amount: float, now: float):
+        # amount ຕິດລົບ = ຄືນ tokens ທີ່ຈອງເກີນ
+        self._refill(now)
+        self.level = min(self.capacity, self.level - amount)
+
+    def sync(self, remaining: float, now: float):
+        # Server ຮູ້ດີກວ່າ (ມີ Process ອື່ນໃຊ້ API key ດຽວກັນ) → ເຊື່ອຄ່າທີ່ໜ້ອຍກວ່າ
+        self._refill(now)
+        self.level = min(self.level, float(remaining))
+
+    def resize(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.level = min(self.level, self.capacity)
+
+
+def _configured_limits(model_name: str) -> tuple[float, float]:
+    rpm = float(os.getenv("LLM_RPM_LIMIT", "60"))
+    tpm = float(os.getenv("LLM_TPM_LIMIT", "10000"))
+    raw = os.getenv("LLM_RATE_LIMITS")
+    if raw:
+        try:
+            overrides = json.loads(raw).get(model_name) or {}
+            rpm = float(overrides.get("rpm", rpm))
+            tpm = float(overrides.get("tpm", tpm))
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"⚠️ Invalid LLM_RATE_LIMITS, using defaults: {e}")
+    return rpm, tpm
+
+
+class ModelLimiter:
+    """
+    Rate limit, ຄິວ ແລະ Metrics ຂອງ model ດຽວ (thread-safe)
+    """
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        rpm, tpm = _configured_limits(model_name)
+        self.requests = TokenBucket(rpm, rpm)
+        self.tokens = TokenBucket(tpm, tpm)
+        self.paused_until = 0.0
+
+        self._cond = threading.Condition()
+        self._queue: list[tuple] = []
+        self._seq = itertools.count()
+        # ticket → (event loop, asyncio.Event) ຂອງ coroutines ທີ່ລໍຖ້າໃນ aacquire
+        self._async_waiters: dict[tuple, tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+
+        self._calls = 0
+        self._rate_limited = 0
+        self._max_depth = 0
+        self._waits_ms: deque[float] = deque(maxlen=1000)
+        self._wait_total_ms = 0.0
+
+    def _poll(self, ticket: tuple, tokens: int, started: float, timeout: float) -> tuple[float | None, float | None]:
+        """
+        ກວດ ticket ພາຍໃຕ້ self._cond: (ເວລາທີ່ລໍຖ້າ, None) ເມື່ອໄດ້ budget ແລ້ວ,
+        ບໍ່ດັ່ງນັ້ນ (None, ເວລາທີ່ຄວນລໍຖ້າກ່ອນກວດໃໝ່)
+
+        Raises:
+            LLMQueueTimeout: ລໍຖ້າເກີນ timeout
+        """
+        now = time.monotonic()
+        wait = None
+        if self._queue[0] == ticket:
+            wait = max(
+                self.paused_until - now,
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(tokens, now),
+            )
+            if wait <= 0:
+                heapq.heappop(self._queue)
+                self.requests.consume(1, now)
+                self.tokens.consume(min(tokens, self.tokens.capacity), now)
+                self._calls += 1
+                waited = now - started
+                self._waits_ms.append(waited * 1000)
+                self._wait_total_ms += waited * 1000
+                return waited, None
+        remaining = started + timeout - now
+        if remaining <= 0:
+            raise LLMQueueTimeout(
+                f"Waited {timeout:.0f}s for the {self.model_name} rate limit "
+                f"({len(self._queue)} calls queued)"
+            )
+        return None, remaining if wait is None else min(wait, remaining)
+
+    def _enqueue(self, rank: tuple) -> tuple:
+        ticket = (*rank, next(self._seq))
+        heapq.heappush(self._queue, ticket)
+        self._max_depth = max(self._max_depth, len(self._queue))
+        return ticket
+
+    def _leave(self, ticket: tuple):
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+        # ຄິວປ່ຽນ → ໃຫ້ຜູ້ທີ່ຢູ່ຫົວຄິວໃໝ່ກວດອີກຄັ້ງ
+        self._notify()
+
+    def _notify(self):
+        """
+        ປຸກທຸກຜູ້ທີ່ລໍຖ້າ (threads ຜ່ານ Condition, coroutines ຜ່ານ asyncio.Event ຂອງ loop ຂອງມັນ)
+        """
+        self._cond.notify_all()
+        for loop, event in self._async_waiters.values():
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # loop ປິດແລ້ວ
+                pass
+
+    def acquire(self, rank: tuple, tokens: int, timeout: float) -> float:
+        """
+        ລໍຖ້າຈົນເຖິງຄິວ ແລະ ມີ budget ພໍ (requests 1 + tokens ທີ່ຄາດໄວ້)
+
+        Returns:
+            float: ເວລາທີ່ລໍຖ້າ (ວິນາທີ)
+
+        Raises:
+            LLMQueueTimeout: ລໍຖ້າເກີນ timeout
+        """
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._enqueue(rank)
+            try:
+                while True:
+                    waited, wait = self._poll(ticket, tokens, started, timeout)
+                    if waited is not None:
+                        return waited
+                    self._cond.wait(wait)
+            finally:
+                self._leave(ticket)
+
+    async def aacquire(self, rank: tuple, tokens: int, timeout: float) -> float:
+        """
+        acquire ສຳລັບ coroutines: ລໍຖ້າດ້ວຍ asyncio (ບໍ່ຖື thread ຂອງ executor) ແລະ
+        ອອກຈາກຄິວທັນທີເມື່ອຖືກ cancel
+        """
+        started = time.monotonic()
+        event = asyncio.Event()
+        with self._cond:
+            ticket = self._enqueue(rank)
+            self._async_waiters[ticket] = (asyncio.get_running_loop(), event)
+        try:
+            while True:
+                with self._cond:
+                    event.clear()
+                    waited, wait = self._poll(ticket, tokens, started, timeout)
+                if waited is not None:
+                    return waited
+                try:
+                    await asyncio.wait_for(event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                self._async_waiters.pop(ticket, None)
+                self._leave(ticket)
+
+    def settle(self, estimated: int, actual: int | None):
+        """
+        ແກ້ tokens ທີ່ຄາດໄວ້ໃຫ້ເປັນຈຳນວນທີ່ໃຊ້ແທ້ (ຈາກ usage_metadata)
+        """
+        if actual is None:
+            return
+        with self._cond:
+            self.tokens.consume(actual - min(estimated, self.tokens.capacity), time.monotonic())
+            self._notify()
+
+    def on_rate_limited(self, wait_hint: float | None, attempt: int) -> float:
+        """
+        429: ຢຸດທຸກ calls ຂອງ model ນີ້ ແລະ ໝົດ budget ທີ່ເຫຼືອ (ເຕີມຄືນຕາມ rate ປົກກະຕິ)
+
+        Returns:
+            float: ເວລາທີ່ຢຸດ (ວິນາທີ)
+        """
+        base = float(os.getenv("LLM_RATE_LIMIT_BACKOFF", "1.0")) * 2 ** attempt
+        # Jitter: calls ທີ່ຖືກ 429 ພ້ອມກັນບໍ່ກັບມາພ້ອມກັນ
+        delay = (wait_hint if wait_hint is not None else base) + random.uniform(0, base)
+        with self._cond:
+            now = time.monotonic()
+            self._rate_limited += 1
+            self.paused_until = max(self.paused_until, now + delay)
+            self.requests.sync(0, now)
+            self.tokens.sync(0, now)
+            self._notify()
+        return delay
+
+    def observe_headers(self, headers):
+        """
+        ປັບ buckets ຕາມ x-ratelimit-* headers ຂອງ Groq
+
+        Groq: *-requests ແມ່ນຕໍ່ມື້ (RPD), *-tokens ແມ່ນຕໍ່ນາທີ (TPM)
+        """
+        def number(name: str) -> float | None:
+            try:
+                return float(headers[name])
+            except (KeyError, TypeError, ValueError):
+                return None
+
+        limit_tokens = number("x-ratelimit-limit-tokens")
+        remaining_tokens = number("x-ratelimit-remaining-tokens")
+        remaining_requests = number("x-ratelimit-remaining-requests")
+        with self._cond:
+            now = time.monotonic()
+            if limit_tokens and limit_tokens != self.tokens.capacity:
+                logger.info(f"🚦 {self.model_name}: TPM limit from Groq = {limit_tokens:.0f}")
+                self.tokens.resize(limit_tokens)
+            if remaining_tokens is not None:
+                self.tokens.sync(remaining_tokens, now)
+            if remaining_requests == 0:
+                reset = parse_duration(headers.get("x-ratelimit-reset-requests"))
+                if reset:
+                    self.paused_until = max(self.paused_until, now + reset)
+            self._notify()
+
+    def reset_stats(self):
+        """
+        ລ້າງ Metrics (calls, 429, ຄວາມຍາວຄິວສູງສຸດ, ເວລາລໍຖ້າ) ໂດຍບໍ່ແຕະ Rate limit buckets
+        """
+        with self._cond:
+            self._calls = 0
+            self._rate_limited = 0
+            self._max_depth = len(self._queue)
+            self._waits_ms.clear()
+            self._wait_total_ms = 0.0
+
+    def stats(self) -> dict:
+        with self._cond:
+            now = time.monotonic()
+            waits = list(self._waits_ms)
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_depth,
+                "calls": self._calls,
+                "rate_limited": self._rate_limited,
+                "mean_wait_ms": round(statistics.fmean(waits), 2) if waits else 0.0,
+                "p95_wait_ms": round(_p95(waits), 2),
+                "max_wait_ms": round(max(waits), 2) if waits else 0.0,
+                "total_wait_ms": round(self._wait_total_ms, 2),
+                "rpm_limit": self.requests.capacity,
+                "tpm_limit": self.tokens.capacity,
+                "tokens_available": round(max(self.tokens.level, 0.0)),
+                "paused_for_s": round(max(self.paused_until - now, 0.0), 2),
+            }
+
+
+def _p95(values: list[float]) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=20, method="inclusive")[-1]
+
+
+def estimate_tokens(value) -> int:
+    """
+    ປະມານ tokens ຂອງ prompt (ປະມານ 3 ຕົວອັກສອນຕໍ່ token) + tokens ຂອງຄຳຕອບ
+    """
+    if hasattr(value, "to_string"):
+        text = value.to_string()
+    elif isinstance(value, (list, tuple)):
+        text = "\n".join(str(getattr(item, "content", item)) for item in value)
+    else:
+        text = str(value)
+    return len(text) // 3 + int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", "512"))
+
+
+def _actual_tokens(response) -> int | None:
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return None
+    return int(usage.get("total_tokens") or 0) or None
+
+
+class LLMScheduler:
+    """
+    ModelLimiter ຂອງທຸກ models + retry ເມື່ອຖືກ 429 ຫຼື Error ຊົ່ວຄາວ
+    """
+
+    def __init__(self):
+        self._limiters: dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+        self.max_retries = int(os.getenv("LLM_RATE_LIMIT_MAX_RETRIES", "4"))
+        self.queue_timeout = float(os.getenv("LLM_QUEUE_TIMEOUT", "120"))
+        self.transient_retries = int(os.getenv("LLM_TRANSIENT_MAX_RETRIES", "2"))
+        self.transient_backoff = float(os.getenv("LLM_TRANSIENT_BACKOFF", "0.5"))
+
+    def limiter(self, model_name: str) -> ModelLimiter:
+        limiter = self._limiters.get(model_name)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.setdefault(model_name, ModelLimiter(model_name))
+        return limiter
+
+    def _rank(self, purpose: str) -> tuple:
+        priority = _request_priority.get()
+        set_attribute("llm.priority", f"{priority}/{purpose}")
+        return _PRIORITY_RANK[priority], _PURPOSE_RANK.get(purpose, len(_PURPOSE_RANK))
+
+    def _record_wait(self, waited: float):
+        add_metric("llm.queue_wait_ms", round(waited * 1000, 2))
+
+    def _backoff(self, limiter: ModelLimiter, error: Exception, tokens: int, attempts: dict) -> float | None:
+        """
+        ຕັດສິນວ່າຈະລອງ call ໃໝ່ບໍ
+
+        Returns:
+            float | None: ເວລາທີ່ຕ້ອງ sleep ກ່ອນລອງໃໝ່ (0 ສຳລັບ 429 ເພາະ limiter ຢຸດຄິວໃຫ້ແລ້ວ)
+                          ຫຼື None ຖ້າບໍ່ລອງໃໝ່
+        """
+        if is_rate_limit_error(error):
+            attempt = attempts["rate_limited"]
+            if attempt >= self.max_retries:
+                return None
+            attempts["rate_limited"] += 1
+            delay = limiter.on_rate_limited(retry_after(error), attempt)
+            add_metric("llm.rate_limited", 1)
+            logger.warning(
+                f"🚦 {limiter.model_name} rate limited (429), retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{self.max_retries})"
+            )
+            return 0.0
+        if is_transient_error(error):
+            attempt = attempts["transient"]
+            if attempt >= self.transient_retries:
+                return None
+            attempts["transient"] += 1
+            # Request ບໍ່ສຳເລັດ → ຄືນ tokens ທີ່ຈອງໄວ້
+            limiter.settle(tokens, 0)
+            delay = min(self.transient_backoff * 2 ** attempt, 8.0) * random.uniform(0.5, 1.5)
+            add_metric("llm.transient_retries", 1)
+            logger.warning(
+                f"🔁 {limiter.model_name} {type(error).__name__}, retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{self.transient_retries})"
+            )
+            return delay
+        return None
+
+    def run(self, model_name: str, purpose: str, tokens: int, call):
+        """
+        Run call() ເມື່ອເຖິງຄິວ; ຖ້າຖືກ 429 ຫຼື Error ຊົ່ວຄາວ ລໍຖ້າແລ້ວລອງໃໝ່
+        """
+        limiter = self.limiter(model_name)
+        rank = self._rank(purpose)
+        attempts = {"rate_limited": 0, "transient": 0}
+        while True:
+            self._record_wait(limiter.acquire(rank, tokens, self.queue_timeout))
+            try:
+                response = call()
+            except Exception as e:
+                delay = self._backoff(limiter, e, tokens, attempts)
+                if delay is None:
+                    raise
+                if delay:
+                    time.sleep(delay)
+                continue
+            limiter.settle(tokens, _actual_tokens(response))
+            return response
+
+    async def arun(self, model_name: str, purpose: str, tokens: int, call):
+        """
+        ຄືກັບ run() ສຳລັບ coroutine (ລໍຖ້າຄິວໃນ thread ເພື່ອບໍ່ block event loop)
+        """
+        limiter = self.limiter(model_name)
+        rank = self._rank(purpose)
+        attempts = {"rate_limited": 0, "transient": 0}
+        while True:
+            self._record_wait(await limiter.aacquire(rank, tokens, self.queue_timeout))
+            try:
+                response = await call()
+            except Exception as e:
+                delay = self._backoff(limiter, e, tokens, attempts)
+                if delay is None:
+                    raise
+                if delay:
+                    await asyncio.sleep(delay)
+                continue
+            limiter.settle(tokens, _actual_tokens(response))
+            return response
+
+    def observe_response(self, model_name: str, headers):
+        self.limiter(model_name).observe_headers(headers)
+
+    def reset_stats(self):
+        """
+        ລ້າງ Metrics ຂອງທຸກ models (ເຊັ່ນ: ຕໍ່ລະດັບຂອງ load test)
+        """
+        with self._lock:
+            limiters = list(self._limiters.values())
+        for limiter in limiters:
+            limiter.reset_stats()
+
+    def stats(self) -> dict:
+        """
+        Metrics ຂອງແຕ່ລະ model ແລະ ຄວາມຍາວຄິວລວມ
+        """
+        with self._lock:
+            limiters = list(self._limiters.values())
+        models = {limiter.model_name: limiter.stats() for limiter in limiters}
+        return {
+            "queue_depth": sum(m["queue_depth"] for m in models.values()),
+            "rate_limited": sum(m["rate_limited"] for m in models.values()),
+            "models": models,
+        }
+
+
+class ScheduledLLM(Runnable):
+    """
+    ຫໍ່ LLM (ຫຼື LLM ທີ່ bind tools ແລ້ວ) ໃຫ້ທຸກ invoke/ainvoke ຜ່ານ LLMScheduler
+
+    ໃຊ້ແທນ LLM ເດີມໄດ້ໂດຍກົງ (prompt | llm), callbacks/streaming ຖືກສົ່ງຕໍ່ໃຫ້ LLM ເດີມ
+    """
+
+    def __init__(self, llm, model_name: str, purpose: str = "sql"):
+        self.llm = llm
+        self.model_name = model_name
+        self.purpose = purpose
+
+    @property
+    def InputType(self):
+        return self.llm.InputType
+
+    @property
+    def OutputType(self):
+        return self.llm.OutputType
+
+    def invoke(self, input, config=None, **kwargs):
+        if not llm_scheduler_enabled():
+            return self.llm.invoke(input, config, **kwargs)
+        return get_llm_scheduler().run(
+            self.model_name, self.purpose, estimate_tokens(input),
+            lambda: self.llm.invoke(input, config, **kwargs),
+        )
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        if not llm_scheduler_enabled():
+            return await self.llm.ainvoke(input, config, **kwargs)
+        return await get_llm_scheduler().arun(
+            self.model_name, self.purpose, estimate_tokens(input),
+            lambda: self.llm.ainvoke(input, config, **kwargs),
+        )
+
+
+_scheduler: LLMScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """
+    ດຶງ LLMScheduler ທີ່ໃຊ້ຮ່ວມກັນທັງ Process
+
+    Returns:
+        LLMScheduler: Scheduler instance
+    """
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
@@ -0,0 +1,186 @@
+"""
+model_router.py - ເລືອກ model ສຳລັບການສ້າງ SQL ແບບເປັນຂັ້ນ (fast → large)
+
+- ຄຳຖາມທົ່ວໄປໃຊ້ model ນ້ອຍທີ່ໄວ ແລະ ຖືກກວ່າ (LLM_SQL_FAST_MODEL) ກ່ອນ
+- ໃຊ້ model ໃຫຍ່ (LLM_SQL_LARGE_MODEL) ເມື່ອ:
+    * Schema ໃນ Prompt ສັບຊ້ອນ (tables/tokens ເກີນ SQL_ROUTING_MAX_TABLES/SQL_ROUTING_MAX_SCHEMA_TOKENS)
+    * model ນ້ອຍສ້າງ SQL ບໍ່ໄດ້ (Error ຫຼື ຄຳຕອບ parse ບໍ່ໄດ້)
+    * SQL ບໍ່ຜ່ານ validation, Query Guard (EXPLAIN) ຫຼື execute ບໍ່ຜ່ານ → repair_sql ໃຊ້ model ໃຫຍ່
+- ເກັບສະຖິຕິຕໍ່ model (latency, SQL ທີ່ execute ຜ່ານ/ບໍ່ຜ່ານ ແຍກຕາມຂັ້ນ) ແລະ ເຫດຜົນຂອງການ escalate
+  ເພື່ອປັບ threshold ຈາກຂໍ້ມູນຈິງ
+
+ປິດໄດ້ດ້ວຍ SQL_MODEL_ROUTING=0 (ໃຊ້ model ໃຫຍ່ຕະຫຼອດ)
+"""
+
+import os
+import statistics
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass
+
+from loguru import logger
+
+from src.Tracing.tracer import set_attribute
+
+
+DEFAULT_LARGE_MODEL = "moonshotai/kimi-k2-instruct-0905"
+DEFAULT_FAST_MODEL = "openai/gpt-oss-20b"
+
+TIER_FAST = "fast"
+TIER_LARGE = "large"
+
+
+def model_routing_enabled() -> bool:
+    return os.getenv("SQL_MODEL_ROUTING", "1").lower() not in ("0", "false", "no")
+
+
+def large_model() -> str:
+    return os.getenv("LLM_SQL_LARGE_MODEL", DEFAULT_LARGE_MODEL)
+
+
+def fast_model() -> str:
+    return os.getenv("LLM_SQL_FAST_MODEL", DEFAULT_FAST_MODEL)
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    """
+    Model ທີ່ເລືອກ ແລະ ເຫດຜົນ
+
+    Attributes:
+        model_name: ຊື່ model ທີ່ໃຊ້
+        tier: "fast" ຫຼື "large"
+        reason: ເຫດຜົນ (ເຊັ່ນ "simple_schema", "complex_schema", "validation")
+    """
+    model_name: str
+    tier: str
+    reason: str
+
+
+def _p95(values: list[float]) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=20, method="inclusive")[-1]
+
+
+class _ModelStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.succeeded = 0
+        self.failed: Counter[str] = Counter()
+        self.latencies_ms: deque[float] = deque(maxlen=1000)
+
+    def as_dict(self) -> dict:
+        latencies = list(self.latencies_ms)
+        outcomes = self.succeeded + sum(self.failed.values())
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "succeeded": self.succeeded,
+            "failed": dict(self.failed),
+            "success_rate": round(self.succeeded / outcomes, 4) if outcomes else None,
+            "mean_latency_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            "p95_latency_ms": round(_p95(latencies), 2),
+        }
+
+
+class ModelRouter:
+    """
+    ເລືອກ model ຂອງ SQL Agent ແລະ ເກັບສະຖິຕິ (thread-safe)
+    """
+
+    def __init__(self):
+        self.max_tables = int(os.getenv("SQL_ROUTING_MAX_TABLES", "6"))
+        self.max_schema_tokens = int(os.getenv("SQL_ROUTING_MAX_SCHEMA_TOKENS", "3000"))
+        self._lock = threading.Lock()
+        self._models: dict[str, _ModelStats] = {}
+        self._decisions: Counter[str] = Counter()
+
+    def _stats(self, model_name: str) -> _ModelStats:
+        stats = self._models.get(model_name)
+        if stats is None:
+            stats = self._models.setdefault(model_name, _ModelStats())
+        return stats
+
+    def _decide(self, decision: RoutingDecision) -> RoutingDecision:
+        with self._lock:
+            self._decisions[f"{decision.tier}:{decision.reason}"] += 1
+        set_attribute("llm.sql_tier", decision.tier)
+        set_attribute("llm.sql_route_reason", decision.reason)
+        if decision.tier == TIER_LARGE and decision.reason != "routing_disabled":
+            logger.info(f"⬆️ Using large SQL model {decision.model_name} ({decision.reason})")
+        return decision
+
+    def route_sql(self, table_count: int, schema_tokens: int) -> RoutingDecision:
+        """
+        ເລືອກ model ສຳລັບການສ້າງ SQL ຄັ້ງທຳອິດ
+
+        Args:
+            table_count: ຈຳນວນ tables ໃນ Schema ທີ່ສົ່ງໃຫ້ LLM
+            schema_tokens: tokens ໂດຍປະມານຂອງ Schema ນັ້ນ
+        """
+        if not model_routing_enabled() or fast_model() == large_model():
+            return self._decide(RoutingDecision(large_model(), TIER_LARGE, "routing_disabled"))
+        if table_count > self.max_tables or schema_tokens > self.max_schema_tokens:
+            return self._decide(RoutingDecision(large_model(), TIER_LARGE, "complex_schema"))
+        return self._decide(RoutingDecision(fast_model(), TIER_FAST, "simple_schema"))
+
+    def escalate(self, reason: str) -> RoutingDecision:
+        """
+        ໃຊ້ model ໃຫຍ່ຫຼັງ model ກ່ອນໜ້າລົ້ມເຫຼວ (reason: generation_error, validation, guard, execution)
+        """
+        return self._decide(RoutingDecision(large_model(), TIER_LARGE, reason))
+
+    def record_call(self, model_name: str, latency_ms: float, ok: bool = True):
+        """
+        ບັນທຶກ LLM call ຂອງການສ້າງ/ແກ້ SQL (ok=False ເມື່ອ call error ຫຼື ຄຳຕອບໃຊ້ບໍ່ໄດ້)
+        """
+        with self._lock:
+            stats = self._stats(model_name)
+            stats.calls += 1
+            stats.latencies_ms.append(latency_ms)
+            if not ok:
+                stats.errors += 1
+
+    def record_outcome(self, model_name: str, ok: bool, stage: str | None = None):
+        """
+        ບັນທຶກຜົນຂອງ SQL ທີ່ model ສ້າງ (stage: validation, guard ຫຼື execution ເມື່ອບໍ່ຜ່ານ)
+        """
+        with self._lock:
+            stats = self._stats(model_name)
+            if ok:
+                stats.succeeded += 1
+            else:
+                stats.failed[stage or "execution"] += 1
+
+    def stats(self) -> dict:
+        """
+        ສະຖິຕິຂອງແຕ່ລະ model ແລະ ຈຳນວນການເລືອກແຕ່ລະແບບ (tier:reason)
+        """
+        with self._lock:
+            return {
+                "fast_model": fast_model(),
+                "large_model": large_model(),
+                "decisions": dict(self._decisions),
+                "models": {name: stats.as_dict() for name, stats in self._models.items()},
+            }
+
+
+_router: ModelRouter | None = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """
+    ດຶງ ModelRouter ທີ່ໃຊ້ຮ່ວມກັນທັງ Process
+
+    Returns:
+        ModelRouter: Router instance
+    """
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+    return _router
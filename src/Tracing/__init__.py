@@ -0,0 +1 @@
+# Tracing Package
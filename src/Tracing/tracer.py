@@ -0,0 +1,305 @@
+"""
+tracer.py - Tracing ແບບເບົາ (OpenTelemetry-compatible) ສຳລັບ Workflow
+
+- Span ຖືກສົ່ງຕໍ່ຜ່ານ contextvars ຈຶ່ງໃຊ້ໄດ້ທັງ sync, async ແລະ thread pool
+  (LangGraph ສຳເນົາ context ເຂົ້າ executor ໃຫ້ແລ້ວ)
+- Nodes ບັນທຶກ metrics ໃສ່ span ປັດຈຸບັນດ້ວຍ add_metric()/set_attribute():
+  db.round_trips, db.rows, db.bytes, llm.prompt_tokens, llm.completion_tokens, cache.*
+- ເມື່ອ trace ຈົບ ຈະ export ເປັນ OTLP JSON (resourceSpans) ໜຶ່ງແຖວຕໍ່ trace
+  ໄປທີ່ TRACE_EXPORT_PATH ແລະ ເກັບ trace ຫຼ້າສຸດໄວ້ໃນ memory ສຳລັບ UI
+
+ປິດໄດ້ດ້ວຍ TRACING_ENABLED=0
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler
+from loguru import logger
+
+
+DEFAULT_EXPORT_PATH = Path(__file__).resolve().parents[2] / ".cache" / "traces.jsonl"
+SERVICE_NAME = "pupe-chart-agent"
+
+
+@dataclass
+class Span:
+    """
+    ໜ່ວຍວັດເວລາໜຶ່ງ (node, DB query, LLM call, ...)
+    """
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+
+@dataclass
+class Trace:
+    """
+    Spans ທັງໝົດຂອງ request ໜຶ່ງ (span ທຳອິດແມ່ນ root)
+    """
+    trace_id: str
+    spans: list[Span] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def root(self) -> Span:
+        return self.spans[0]
+
+
+_current_trace: contextvars.ContextVar[Trace | None] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+
+_recent_traces: "OrderedDict[str, Trace]" = OrderedDict()
+_recent_lock = threading.Lock()
+_export_lock = threading.Lock()
+
+
+def tracing_enabled() -> bool:
+    return os.getenv("TRACING_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    ເປີດ span ໃໝ່ (ຖ້າບໍ່ມີ trace ຢູ່ ຈະເລີ່ມ trace ໃໝ່ ແລະ export ເມື່ອຈົບ)
+
+    Example:
+        with span("execute_sql", sql_length=len(sql)):
+            ...
+    """
+    if not tracing_enabled():
+        yield None
+        return
+
+    trace = _current_trace.get()
+    parent = _current_span.get()
+    is_root = trace is None
+    if is_root:
+        trace = Trace(trace_id=uuid.uuid4().hex)
+
+    current = Span(
+        name=name,
+        trace_id=trace.trace_id,
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent is not None and not is_root else None,
+        start_ns=time.time_ns(),
+        attributes=dict(attributes),
+    )
+    with trace.lock:
+        trace.spans.append(current)
+
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        if is_root:
+            _finish_trace(trace)
+
+
+def current_trace_id() -> str | None:
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+def set_attribute(key: str, value):
+    """
+    ຕັ້ງຄ່າ attribute ຂອງ span ປັດຈຸບັນ
+    """
+    current = _current_span.get()
+    if current is not None:
+        current.attributes[key] = value
+
+
+def add_metric(key: str, amount: int | float = 1):
+    """
+    ບວກຄ່າ metric ເຂົ້າ span ປັດຈຸບັນ (ເຊັ່ນ db.round_trips, db.rows)
+    """
+    current = _current_span.get()
+    if current is not None:
+        current.attributes[key] = current.attributes.get(key, 0) + amount
+
+
+def record_llm_usage(usage: dict | None, model_name: str | None = None):
+    """
+    ບັນທຶກ tokens ຂອງ LLM call ໃສ່ span ປັດຈຸບັນ
+    """
+    if not usage:
+        return
+    add_metric("llm.calls", 1)
+    add_metric("llm.prompt_tokens", int(usage.get("input_tokens") or usage.get("prompt_tokens") or 0))
+    add_metric("llm.completion_tokens", int(usage.get("output_tokens") or usage.get("completion_tokens") or 0))
+    if model_name:
+        set_attribute("llm.model", model_name)
+
+
+class LLMUsageCallback(BaseCallbackHandler):
+    """
+    LangChain callback ທີ່ບັນທຶກ token usage ຂອງທຸກ LLM call ໃສ່ span ປັດຈຸບັນ
+    """
+
+    def on_llm_end(self, response, **kwargs):
+        usage = None
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None) or usage
+        if usage is None and response.llm_output:
+            usage = response.llm_output.get("token_usage")
+        model_name = (response.llm_output or {}).get("model_name")
+        record_llm_usage(usage, model_name)
+
+
+def traced_node(name: str, node):
+    """
+    ຫໍ່ node (sync ຫຼື async) ໃຫ້ສ້າງ span ແລະ ບັນທຶກສະຫຼຸບຜົນລັບຂອງ node
+    """
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(state, *args, **kwargs):
+            with span(f"node.{name}"):
+                result = await node(state, *args, **kwargs)
+                _record_node_result(result)
+                return result
+        return async_wrapper
+
+    @functools.wraps(node)
+    def wrapper(state, *args, **kwargs):
+        with span(f"node.{name}"):
+            result = node(state, *args, **kwargs)
+            _record_node_result(result)
+            return result
+    return wrapper
+
+
+def _record_node_result(result):
+    if not isinstance(result, dict):
+        return
+    if "sql_cache_hit" in result:
+        set_attribute("cache.sql_hit", bool(result["sql_cache_hit"]))
+    sql_result = result.get("sql_result")
+    if isinstance(sql_result, dict):
+        set_attribute("result.rows", sql_result.get("row_count", 0))
+        set_attribute("result.truncated", bool(sql_result.get("truncated")))
+        if sql_result.get("error"):
+            set_attribute("error", str(sql_result["error"])[:500])
+    if "schema_tokens_saved" in result:
+        set_attribute("schema.tokens_saved", result["schema_tokens_saved"])
+
+
+# ===========================
+# Export
+# ===========================
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace: Trace) -> dict:
+    """
+    ແປງ Trace ເປັນ OTLP JSON (ຮູບແບບດຽວກັບ OTLP/HTTP JSON exporter)
+    """
+    spans = []
+    for item in trace.spans:
+        otlp_span = {
+            "traceId": item.trace_id,
+            "spanId": item.span_id,
+            "name": item.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(item.start_ns),
+            "endTimeUnixNano": str(item.end_ns or item.start_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in item.attributes.items()
+            ],
+            "status": {"code": 2, "message": item.error} if item.error else {"code": 1},
+        }
+        if item.parent_id:
+            otlp_span["parentSpanId"] = item.parent_id
+        spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "src.Tracing.tracer"}, "spans": spans}],
+        }]
+    }
+
+
+def _finish_trace(trace: Trace):
+    max_recent = int(os.getenv("TRACE_RECENT_MAX", "200"))
+    with _recent_lock:
+        _recent_traces[trace.trace_id] = trace
+        while len(_recent_traces) > max_recent:
+            _recent_traces.popitem(last=False)
+
+    path = Path(os.getenv("TRACE_EXPORT_PATH", str(DEFAULT_EXPORT_PATH)))
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(to_otlp(trace), ensure_ascii=False)
+        with _export_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        logger.warning(f"⚠️ Could not export trace {trace.trace_id}: {e}")
+
+    logger.debug(f"🧭 Trace {trace.root.name} finished in {trace.root.duration_ms:.1f} ms ({len(trace.spans)} spans)")
+
+
+def get_trace(trace_id: str) -> Trace | None:
+    """
+    ດຶງ trace ທີ່ຈົບແລ້ວຈາກ memory (ສຳລັບສະແດງ waterfall)
+    """
+    with _recent_lock:
+        return _recent_traces.get(trace_id)
+
+
+def waterfall_rows(trace: Trace) -> list[dict]:
+    """
+    ແປງ trace ເປັນແຖວສຳລັບ waterfall chart (ເວລາເປັນ ms ນັບຈາກ root span)
+    """
+    origin = trace.root.start_ns
+    depth = {}
+    rows = []
+    for item in trace.spans:
+        depth[item.span_id] = depth.get(item.parent_id, -1) + 1 if item.parent_id else 0
+        rows.append({
+            "span": f"{'  ' * depth[item.span_id]}{item.name}",
+            "start_ms": round((item.start_ns - origin) / 1e6, 2),
+            "end_ms": round(((item.end_ns or item.start_ns) - origin) / 1e6, 2),
+            "duration_ms": round(item.duration_ms, 2),
+            "attributes": ", ".join(f"{k}={v}" for k, v in item.attributes.items()),
+            "error": item.error or "",
+        })
+    return rows